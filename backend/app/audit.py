@@ -0,0 +1,286 @@
+"""
+Asynchronous, batched audit-log writer.
+
+Audit rows are normally written in the same transaction as the request
+change, by the database functions of database/migrations/. Where those are
+not installed, the Supabase repository writes the request on its own and
+hands the audit rows to ``audit_sink`` without waiting for the database. A
+background task drains the bounded queue and writes multi-row inserts
+whenever a batch fills up or the flush interval elapses.
+
+- Backpressure: when the queue is full, ``submit`` waits up to
+  AUDIT_ENQUEUE_TIMEOUT_SECONDS for room before spilling the row to disk.
+- Retries: failed flushes are retried with exponential backoff; a batch that
+  still fails is appended to the spill file (JSON lines) instead of dropped.
+- Recovery: spilled rows are replayed when the sink starts. Inserts ignore
+  duplicate ids, so a replayed or retried row is never written twice.
+- Shutdown: ``stop`` flushes everything still queued.
+
+Each process spills to its own file, AUDIT_SPILL_PATH with the pid before
+the extension (``audit_spill.1234.jsonl``), so workers never write to or
+replay the same file at once. On start a worker takes over the spill files
+of processes that are gone (and its own, as pids repeat across container
+restarts) by renaming them, and deletes each only once its rows are written
+or spilled again. Errors in the writer are logged, never fatal to it.
+"""
+
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from app.config import settings
+from app.repositories import get_repository
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+async def _insert_rows(rows: list[dict]) -> None:
+    await get_repository().insert_audit_logs(rows)
+
+
+class AuditSink:
+    def __init__(
+        self,
+        *,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+        max_retries: int,
+        enqueue_timeout: float,
+        spill_path: str,
+        insert: Callable[[list[dict]], Awaitable[None]] = _insert_rows,
+    ):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.enqueue_timeout = enqueue_timeout
+        # Absolute, so a later chdir doesn't move it; one file per process
+        self.spill_base = os.path.abspath(spill_path)
+        root, ext = os.path.splitext(self.spill_base)
+        self.spill_path = f"{root}.{os.getpid()}{ext}"
+        self._insert = insert
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.spilled = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self.flushes = 0
+        self._flush_seconds_total = 0.0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "AuditSink":
+        return cls(
+            max_queue=settings.AUDIT_QUEUE_MAX,
+            batch_size=settings.AUDIT_BATCH_SIZE,
+            flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+            max_retries=settings.AUDIT_MAX_RETRIES,
+            enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+            spill_path=settings.AUDIT_SPILL_PATH,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._closing
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting rows, flush the queue and wait for the writer."""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, entry: dict) -> None:
+        await self.submit_many([entry])
+
+    async def submit_many(self, entries: list[dict]) -> None:
+        if not self.running:
+            # No background writer (scripts, shutdown): write through
+            await self._flush(entries)
+            return
+        for entry in entries:
+            try:
+                await asyncio.wait_for(self._queue.put(entry), self.enqueue_timeout)
+                self.enqueued += 1
+            except asyncio.TimeoutError:
+                self._spill([entry])
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_max": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "spilled": self.spilled,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._flush_seconds_total / self.flushes * 1000, 2)
+            if self.flushes
+            else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        try:
+            await self._replay_spill()
+        except Exception:
+            logger.exception("Replaying spilled audit rows failed")
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self._flush(batch)
+            except Exception:
+                # Failures are spilled inside _flush; this is a bug, not a bad row
+                self.dropped += len(batch)
+                logger.exception("Dropped %d audit rows", len(batch))
+
+    async def _flush(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                await self._insert(batch)
+            except Exception as exc:
+                self.failed_flushes += 1
+                logger.warning(
+                    "Audit flush of %d rows failed (attempt %d): %s",
+                    len(batch), attempt + 1, exc,
+                )
+                if attempt < self.max_retries:
+                    await asyncio.sleep(min(0.2 * 2 ** attempt, 5.0))
+                continue
+            elapsed = time.perf_counter() - started
+            self.flushes += 1
+            self.written += len(batch)
+            self._flush_seconds_total += elapsed
+            self.last_flush_ms = elapsed * 1000
+            self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+            return
+
+        if len(batch) == 1:
+            self._spill(batch)
+            return
+        # One bad row (e.g. a dangling request_id) must not sink the batch
+        for row in batch:
+            try:
+                await self._insert([row])
+                self.written += 1
+            except Exception:
+                self._spill([row])
+
+    def _spill(self, rows: list[dict]) -> None:
+        try:
+            with open(self.spill_path, "a", encoding="utf-8") as fh:
+                for row in rows:
+                    fh.write(json.dumps(row, default=str) + "\n")
+        except OSError:
+            self.dropped += len(rows)
+            logger.exception("Dropped %d audit rows: cannot write %s", len(rows), self.spill_path)
+            return
+        self.spilled += len(rows)
+        logger.error("Spilled %d audit rows to %s", len(rows), self.spill_path)
+
+    async def _replay_spill(self) -> None:
+        for path in self._claim_spill_files():
+            rows = []
+            with open(path, encoding="utf-8") as fh:
+                for number, line in enumerate(fh, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError:
+                        logger.error("Skipping unreadable line %d of %s", number, path)
+            logger.info("Replaying %d spilled audit rows from %s", len(rows), path)
+            for i in range(0, len(rows), self.batch_size):
+                # A failing batch is spilled again and retried on next start
+                await self._flush(rows[i:i + self.batch_size])
+            # Only now: a crash above leaves the file to be replayed again
+            os.remove(path)
+
+    def _claim_spill_files(self) -> list[str]:
+        """
+        Rename the spill files of gone processes (and this one) to replay
+        files owned by this process; return those, with earlier leftovers.
+        """
+        root, ext = os.path.splitext(self.spill_base)
+        claimed = []
+        # The pre-per-process name, then audit_spill.<pid>[.<id>.replay].jsonl
+        candidates = [self.spill_base] + sorted(glob.glob(f"{glob.escape(root)}.*{ext}"))
+        for path in candidates:
+            owner = path[len(root) + 1:len(path) - len(ext)].split(".")[0]
+            if path != self.spill_base and not (
+                owner.isdigit() and _owner_gone(int(owner))
+            ):
+                continue
+            replay_path = f"{root}.{os.getpid()}.{uuid.uuid4().hex[:12]}.replay{ext}"
+            try:
+                # Atomic: if two workers race for a file, one gets it
+                os.replace(path, replay_path)
+            except FileNotFoundError:
+                continue
+            claimed.append(replay_path)
+        return claimed
+
+
+def _owner_gone(pid: int) -> bool:
+    """Whether no process (other than this one) holds this pid now."""
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        # os.kill would terminate the process there; leave its files alone
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        # Exists but owned by another user
+        return False
+    return False
+
+
+audit_sink = AuditSink.from_settings()
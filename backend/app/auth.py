@@ -1,10 +1,30 @@
+import time
+
+import httpx
 from fastapi import HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import JWTError, jwt
+from app.cache import TTLCache
+from app.config import settings
+from app.metrics import track
 from app.database import get_supabase_admin
 from app.models import UserProfile
+from app.repositories import get_repository
 
 security = HTTPBearer(auto_error=False)
 
+# Profiles keyed by user id; roles change rarely, so a short TTL is enough.
+# Changes made through the API invalidate the entry; others (e.g. a role
+# edited in the database) apply within PROFILE_CACHE_TTL_SECONDS.
+profile_cache = TTLCache(
+    maxsize=settings.PROFILE_CACHE_SIZE,
+    ttl=settings.PROFILE_CACHE_TTL_SECONDS,
+)
+
+_JWKS_TTL_SECONDS = 3600
+_jwks: dict | None = None
+_jwks_fetched_at = 0.0
+
 
 async def get_current_user(request: Request) -> UserProfile:
     """Dependency: require authenticated user. Raises 401 if missing/invalid."""
@@ -15,7 +35,25 @@ async def get_current_user(request: Request) -> UserProfile:
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return await _resolve_user(credentials.credentials)
+    with track("auth"):
+        return await _resolve_user(credentials.credentials)
+
+
+async def get_stream_user(request: Request, token: str | None = None) -> UserProfile:
+    """
+    Dependency for EventSource clients, which cannot set headers: accepts
+    the JWT as ``?token=`` as well as in the Authorization header.
+    """
+    credentials: HTTPAuthorizationCredentials | None = await security(request)
+    token = credentials.credentials if credentials else token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    with track("auth"):
+        return await _resolve_user(token)
 
 
 async def get_optional_user(request: Request) -> UserProfile | None:
@@ -40,41 +78,91 @@ async def get_admin_user(request: Request) -> UserProfile:
     return user
 
 
+def invalidate_cached_profile(user_id: str) -> None:
+    """Drop a cached profile, e.g. after its role or name changed."""
+    profile_cache.invalidate(user_id)
+
+
 async def _resolve_user(token: str) -> UserProfile:
-    """Verify token with Supabase and return enriched profile."""
-    admin_client = get_supabase_admin()
+    """Verify token and return enriched profile (cached per user id)."""
+    if settings.jwt_verify_locally:
+        claims = await _decode_token(token)
+        user_id, email = claims["sub"], claims.get("email")
+    else:
+        user_id, email = await _verify_token_remotely(token)
+
+    cached = profile_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    profile_data = await _fetch_profile_row(user_id)
+    row = profile_data or {}
+    profile = UserProfile(
+        id=user_id,
+        email=email or row.get("email", ""),
+        full_name=row.get("full_name"),
+        role=row.get("role", "user"),
+        created_at=row.get("created_at"),
+    )
+    # Don't pin a fallback "user" role in the cache after a failed lookup
+    if profile_data is not None:
+        profile_cache.set(user_id, profile)
+    return profile
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired token",
+    )
+
+
+async def _decode_token(token: str) -> dict:
+    """Validate signature, expiry and audience without a network round trip."""
     try:
-        response = admin_client.auth.get_user(token)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
+        key = await _get_jwks() if settings.JWT_JWKS_URL else settings.JWT_SECRET
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=settings.jwt_algorithms_list,
+            audience=settings.JWT_AUDIENCE or None,
         )
+    except (JWTError, httpx.HTTPError):
+        raise _invalid_token()
+
+    if not claims.get("sub"):
+        raise _invalid_token()
+    return claims
+
+
+async def _get_jwks() -> dict:
+    global _jwks, _jwks_fetched_at
+    if _jwks is None or time.monotonic() - _jwks_fetched_at > _JWKS_TTL_SECONDS:
+        async with httpx.AsyncClient(timeout=5) as client:
+            resp = await client.get(settings.JWT_JWKS_URL)
+            resp.raise_for_status()
+        _jwks = resp.json()
+        _jwks_fetched_at = time.monotonic()
+    return _jwks
+
+
+async def _verify_token_remotely(token: str) -> tuple[str, str | None]:
+    """Ask Supabase Auth to validate the token (used when local checks are off)."""
+    try:
+        response = await get_supabase_admin().auth.get_user(token)
+    except Exception:
+        raise _invalid_token()
 
     if not response or not response.user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-        )
+        raise _invalid_token()
+    return response.user.id, response.user.email
+
 
-    supabase_user = response.user
-    # Fetch extended profile (role, full_name)
+async def _fetch_profile_row(user_id: str) -> dict | None:
+    """Fetch extended profile (role, full_name); None if the lookup failed."""
     try:
-        profile_resp = (
-            admin_client.table("profiles")
-            .select("*")
-            .eq("id", supabase_user.id)
-            .single()
-            .execute()
-        )
-        profile_data = profile_resp.data or {}
+        return await get_repository().get_profile(user_id)
     except Exception:
-        profile_data = {}
-
-    return UserProfile(
-        id=supabase_user.id,
-        email=supabase_user.email or profile_data.get("email", ""),
-        full_name=profile_data.get("full_name"),
-        role=profile_data.get("role", "user"),
-        created_at=profile_data.get("created_at"),
-    )
+        return None
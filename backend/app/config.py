@@ -1,19 +1,123 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Tuple
 
 
 class Settings(BaseSettings):
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_KEY: str = ""
-    JWT_SECRET: str = "dev-secret"
+    # Supabase JWT secret; no default, so a token can't be forged with one
+    JWT_SECRET: str = ""
+    # Verify access tokens locally instead of calling Supabase Auth per request.
+    # Needs JWT_SECRET or JWT_JWKS_URL; without either, tokens are checked
+    # remotely as before (see jwt_verify_locally).
+    JWT_VERIFY_LOCALLY: bool = True
+    JWT_ALGORITHMS: str = "HS256"
+    JWT_AUDIENCE: str = "authenticated"
+    # Optional JWKS endpoint for projects using asymmetric signing keys.
+    JWT_JWKS_URL: str = ""
+    PROFILE_CACHE_SIZE: int = 1024
+    # Also the longest a role change made outside the API (e.g. demoting an
+    # admin in the database) takes to apply
+    PROFILE_CACHE_TTL_SECONDS: float = 60.0
+    # Completed creates remembered for Idempotency-Key replays (per worker)
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
     ENVIRONMENT: str = "development"
+    # "supabase", or "sqlite" to run without a Supabase project (load tests)
+    STORAGE_BACKEND: str = "supabase"
+    SQLITE_PATH: str = ":memory:"
+    # Shared keep-alive HTTP pool for PostgREST calls (per worker)
+    DB_POOL_MAX_CONNECTIONS: int = 100
+    DB_POOL_MAX_KEEPALIVE: int = 20
+    DB_POOL_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    DB_TIMEOUT_SECONDS: float = 10.0
+    DB_HTTP2: bool = True
+    # Background audit-log writer, for audit rows of writes made without the
+    # database functions in database/migrations/ (see app/audit.py)
+    AUDIT_QUEUE_MAX: int = 10000
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.5
+    AUDIT_MAX_RETRIES: int = 3
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 1.0
+    # Per process: the pid is added before the extension
+    AUDIT_SPILL_PATH: str = "audit_spill.jsonl"
+    # Request instrumentation: /metrics, Server-Timing headers, slow-request log
+    METRICS_ENABLED: bool = True
+    METRICS_SERVER_TIMING: bool = False
+    # /metrics is only served when set, to "Authorization: Bearer <token>"
+    METRICS_TOKEN: str = ""
+    SLOW_REQUEST_MS: float = 1000.0
+    # Server-Sent Events (/events/stream), per worker process
+    EVENTS_MAX_SUBSCRIBERS: int = 10000
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_REPLAY_SIZE: int = 1000
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_MAX_STREAM_SECONDS: float = 300.0
+    # Keyset-paginated list endpoints (used when limit/cursor is passed)
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 200
+    # Full-text search ranks at most this many of the newest matches
+    SEARCH_WINDOW: int = 1000
+    # Rows fetched per query by the streaming exports
+    EXPORT_CHUNK_SIZE: int = 1000
+    # POST /requests/batch: items per call, and rows per multi-row insert
+    BATCH_MAX_ITEMS: int = 1000
+    BATCH_CHUNK_SIZE: int = 200
+    # Auto-decide escalated requests that are near-copies of admin decisions
+    # (app/precedents.py); per-worker index of at most PRECEDENT_INDEX_SIZE.
+    # Decisions carry over across users, except for the comma-separated
+    # PRECEDENT_PER_REQUESTER_TYPES, where only the same requester's count.
+    PRECEDENTS_ENABLED: bool = False
+    PRECEDENT_MIN_SIMILARITY: float = 0.85
+    PRECEDENT_INDEX_SIZE: int = 10000
+    PRECEDENT_PER_REQUESTER_TYPES: str = "access_permission"
+    # Per-user token buckets (app/throttling.py): "name=requests/seconds",
+    # comma-separated; empty disables. Per worker, like the caches.
+    RATE_LIMITS: str = (
+        "submit=60/60,batch=10/60,list=120/60,search=60/60,logs=120/60,export=10/60"
+    )
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # Requests in progress per worker before shedding with 503 (0 disables);
+    # the last ADMIN_RESERVED_SLOTS are only used by /admin routes
+    MAX_CONCURRENT_REQUESTS: int = 200
+    ADMIN_RESERVED_SLOTS: int = 20
+    SHED_RETRY_AFTER_SECONDS: int = 1
+    # JSON risk rules file; empty uses the built-in rules in risk_engine.py.
+    RISK_RULES_PATH: str = ""
+    # How often to check the rules file for changes (negative disables).
+    RISK_RULES_RELOAD_SECONDS: float = 5.0
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
 
     @property
     def allowed_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def jwt_verify_locally(self) -> bool:
+        """Local verification is only possible with a key to verify against."""
+        return self.JWT_VERIFY_LOCALLY and bool(self.JWT_SECRET or self.JWT_JWKS_URL)
+
+    @property
+    def jwt_algorithms_list(self) -> List[str]:
+        return [alg.strip() for alg in self.JWT_ALGORITHMS.split(",") if alg.strip()]
+
+    @property
+    def precedent_per_requester_types_list(self) -> List[str]:
+        return [t.strip() for t in self.PRECEDENT_PER_REQUESTER_TYPES.split(",") if t.strip()]
+
+    @property
+    def rate_limits(self) -> Dict[str, Tuple[int, float]]:
+        """RATE_LIMITS as {name: (requests, seconds)}."""
+        limits = {}
+        for entry in self.RATE_LIMITS.split(","):
+            if not entry.strip():
+                continue
+            name, _, rule = entry.partition("=")
+            count, _, seconds = rule.partition("/")
+            limits[name.strip()] = (int(count), float(seconds))
+        return limits
+
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 
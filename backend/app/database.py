@@ -1,22 +1,77 @@
-from supabase import create_client, Client
+import httpx
+from gotrue import AsyncMemoryStorage
+from postgrest import AsyncPostgrestClient
+from supabase import AClient, AClientOptions
 from app.config import settings
 
-_supabase_client: Client | None = None
-_supabase_admin_client: Client | None = None
+_supabase_client: AClient | None = None
+_supabase_admin_client: AClient | None = None
 
 
-def get_supabase() -> Client:
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    """PostgREST client whose HTTP session uses the configured pool limits."""
+
+    def create_session(self, base_url, headers, timeout, verify=True):
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            follow_redirects=True,
+            http2=settings.DB_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.DB_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DB_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.DB_POOL_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+
+
+class _PooledClient(AClient):
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout):
+        return _PooledPostgrestClient(
+            rest_url, headers=headers, schema=schema, timeout=timeout
+        )
+
+
+def _client_options() -> AClientOptions:
+    # Server-side clients never hold a user session of their own
+    return AClientOptions(
+        storage=AsyncMemoryStorage(),
+        auto_refresh_token=False,
+        persist_session=False,
+        postgrest_client_timeout=settings.DB_TIMEOUT_SECONDS,
+    )
+
+
+def get_supabase() -> AClient:
     global _supabase_client
     if _supabase_client is None:
-        _supabase_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        _supabase_client = _PooledClient(
+            settings.SUPABASE_URL, settings.SUPABASE_KEY, _client_options()
+        )
     return _supabase_client
 
 
-def get_supabase_admin() -> Client:
-    """Returns a Supabase client using the service role key (bypasses RLS)."""
+def get_supabase_admin() -> AClient:
+    """Returns an async Supabase client using the service role key (bypasses RLS).
+
+    Queries share one keep-alive HTTP pool per worker; await ``.execute()``.
+    """
     global _supabase_admin_client
     if _supabase_admin_client is None:
-        _supabase_admin_client = create_client(
-            settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY
+        _supabase_admin_client = _PooledClient(
+            settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY, _client_options()
         )
     return _supabase_admin_client
+
+
+async def close_supabase_clients() -> None:
+    """Release pooled connections; called on application shutdown."""
+    global _supabase_client, _supabase_admin_client
+    for client in (_supabase_client, _supabase_admin_client):
+        if client is not None and client._postgrest is not None:
+            await client.postgrest.aclose()
+    _supabase_client = None
+    _supabase_admin_client = None
@@ -0,0 +1,65 @@
+"""
+Conditional GETs for the list endpoints.
+
+GET /requests/, GET /admin/requests and GET /logs/ send a weak ETag made of
+the change counter of the rows they list (``change_versions``, kept by the
+triggers of database/migrations/008_change_versions.sql) and a digest of
+that scope and the query string. A request whose ``If-None-Match`` holds the
+current tag gets 304 after that one counter lookup, before any rows are read
+or encoded.
+
+The counter is read before the rows, so a write landing in between can only
+make the tag older than the body (one extra refetch later), never newer.
+Without migration 008 no ETag is sent and lists behave as before.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.repositories import get_repository
+
+# Part of every tag: bump when the body of a list response changes shape, so
+# clients don't keep bodies cached by an older version of the API
+_FORMAT = 1
+
+
+def requests_scope(requester_id: Optional[str] = None) -> str:
+    """All requests, or one requester's."""
+    return "requests" if requester_id is None else f"requests:{requester_id}"
+
+
+def audit_logs_scope(requester_id: Optional[str] = None) -> str:
+    """All audit logs, or the logs of one requester's requests."""
+    return "audit_logs" if requester_id is None else f"audit_logs:{requester_id}"
+
+
+async def list_etag(request: Request, scope: str) -> Optional[str]:
+    """Weak ETag for listing ``scope`` as ``request`` asks; None if untracked."""
+    version = await get_repository().change_version(scope)
+    if version is None:
+        return None
+    digest = hashlib.blake2b(
+        f"{_FORMAT} {scope}?{request.url.query}".encode(), digest_size=8
+    ).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """A 304 response if ``If-None-Match`` holds ``etag`` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if etag is None or header is None:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return with_etag(Response(status_code=304), etag)
+    return None
+
+
+def with_etag(response: Response, etag: Optional[str]) -> Response:
+    if etag is not None:
+        response.headers["ETag"] = etag
+        # Browsers may store the body but must check back before reusing it
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
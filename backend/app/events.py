@@ -0,0 +1,219 @@
+"""
+In-process fan-out of request change events to Server-Sent Events clients.
+
+Handlers call ``publish_request`` after a request row is created or
+decided. ``event_broker`` encodes each event once and hands the same bytes
+to every subscriber allowed to see it: admins receive every event, other
+users only events for their own requests. Subscribers are indexed by user,
+so publishing costs nothing per idle connection that isn't a recipient.
+
+- Backpressure: each subscriber buffers at most EVENTS_QUEUE_SIZE events.
+  A client that falls further behind (slow network, paused tab) has its
+  buffer dropped and receives a single ``resync`` event, telling it to
+  reload instead of applying deltas.
+- Reconnects: event ids are ``<epoch>:<seq>``. A client reconnecting with
+  ``Last-Event-ID`` gets the missed events from the last EVENTS_REPLAY_SIZE,
+  or ``resync`` if they are gone or the id is from another process.
+- Heartbeats: idle streams get a comment line every EVENTS_HEARTBEAT_SECONDS
+  so proxies keep them open and dead clients are noticed.
+- Lifetime: streams end after EVENTS_MAX_STREAM_SECONDS. EventSource
+  reconnects on its own (replaying via ``Last-Event-ID``), which re-checks
+  the token and keeps open streams from holding up a graceful shutdown.
+
+Like the caches, the broker is per worker process: with several workers,
+a client only sees changes made through the worker it is connected to.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+
+from app.config import settings
+
+# Columns sent with each event; clients merge them into rows they hold
+_EVENT_FIELDS = (
+    "id", "title", "request_type", "requester_id", "requester_email", "status",
+    "risk_level", "risk_score", "risk_factors", "decision_reason", "decided_by",
+    "created_at", "updated_at",
+)
+
+_RESYNC = b"event: resync\ndata: {}\n\n"
+_HEARTBEAT = b": ping\n\n"
+
+
+class Subscriber:
+    __slots__ = ("user_id", "is_admin", "max_pending", "pending", "overflowed", "wakeup")
+
+    def __init__(self, user_id: str, is_admin: bool, max_pending: int):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.max_pending = max_pending
+        self.pending: deque = deque()
+        self.overflowed = False
+        self.wakeup = asyncio.Event()
+
+    def deliver(self, frame: bytes) -> bool:
+        """Buffer an encoded event; False if this overflowed the buffer."""
+        if self.overflowed:
+            return True
+        if len(self.pending) >= self.max_pending:
+            self.pending.clear()
+            self.overflowed = True
+            self.wakeup.set()
+            return False
+        self.pending.append(frame)
+        self.wakeup.set()
+        return True
+
+
+class EventBroker:
+    def __init__(
+        self,
+        *,
+        max_subscribers: int,
+        queue_size: int,
+        replay_size: int,
+        heartbeat: float,
+        max_stream_seconds: float,
+    ):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_stream_seconds = max_stream_seconds
+        self._epoch = format(int(time.time() * 1000), "x")
+        self._seq = itertools.count(1)
+        self._admins: set = set()
+        self._by_user: dict[str, set] = {}
+        self._count = 0
+        # (seq, requester_id, frame) for Last-Event-ID replay
+        self._recent: deque = deque(maxlen=replay_size)
+
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    @classmethod
+    def from_settings(cls) -> "EventBroker":
+        return cls(
+            max_subscribers=settings.EVENTS_MAX_SUBSCRIBERS,
+            queue_size=settings.EVENTS_QUEUE_SIZE,
+            replay_size=settings.EVENTS_REPLAY_SIZE,
+            heartbeat=settings.EVENTS_HEARTBEAT_SECONDS,
+            max_stream_seconds=settings.EVENTS_MAX_STREAM_SECONDS,
+        )
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.max_subscribers
+
+    def publish(self, event_type: str, requester_id: str, payload: dict) -> None:
+        """Send an event to admins and to subscribers who are ``requester_id``."""
+        seq = next(self._seq)
+        frame = (
+            f"id: {self._epoch}:{seq}\nevent: {event_type}\n"
+            f"data: {json.dumps(payload, separators=(',', ':'), default=str)}\n\n"
+        ).encode()
+        self._recent.append((seq, requester_id, frame))
+        self.published += 1
+        for group in (self._admins, self._by_user.get(requester_id, ())):
+            for subscriber in group:
+                if subscriber.deliver(frame):
+                    self.delivered += 1
+                else:
+                    self.overflows += 1
+
+    def subscribe(
+        self, user_id: str, is_admin: bool, last_event_id: Optional[str] = None
+    ) -> Subscriber:
+        subscriber = Subscriber(user_id, is_admin, self.queue_size)
+        if last_event_id:
+            self._replay(subscriber, last_event_id)
+        if is_admin:
+            self._admins.add(subscriber)
+        else:
+            self._by_user.setdefault(user_id, set()).add(subscriber)
+        self._count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        if subscriber.is_admin:
+            self._admins.discard(subscriber)
+        else:
+            group = self._by_user.get(subscriber.user_id)
+            if group is not None:
+                group.discard(subscriber)
+                if not group:
+                    del self._by_user[subscriber.user_id]
+        self._count -= 1
+
+    async def stream(
+        self, user_id: str, is_admin: bool, last_event_id: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        SSE body for one client. Subscribes once the response starts and
+        unsubscribes when the client goes away or the lifetime is up.
+        """
+        subscriber = self.subscribe(user_id, is_admin, last_event_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_stream_seconds
+        try:
+            # Reconnect delay for EventSource, and flushes the headers
+            yield b"retry: 3000\n\n"
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                if not subscriber.pending and not subscriber.overflowed:
+                    subscriber.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(
+                            subscriber.wakeup.wait(), min(self.heartbeat, remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        yield _HEARTBEAT
+                        continue
+                if subscriber.overflowed:
+                    subscriber.overflowed = False
+                    yield _RESYNC
+                    continue
+                # Everything buffered goes out as one chunk
+                frames = b"".join(subscriber.pending)
+                subscriber.pending.clear()
+                yield frames
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self._count,
+            "admin_subscribers": len(self._admins),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+    def _replay(self, subscriber: Subscriber, last_event_id: str) -> None:
+        epoch, _, seq = last_event_id.partition(":")
+        try:
+            after = int(seq)
+        except ValueError:
+            after = -1
+        oldest = self._recent[0][0] if self._recent else None
+        if epoch != self._epoch or after < 0 or (oldest is not None and after < oldest - 1):
+            subscriber.overflowed = True
+            return
+        for seq_no, requester_id, frame in self._recent:
+            if seq_no > after and (subscriber.is_admin or requester_id == subscriber.user_id):
+                subscriber.deliver(frame)
+
+
+event_broker = EventBroker.from_settings()
+
+
+def publish_request(event_type: str, row: dict) -> None:
+    """Publish ``request.created`` / ``request.updated`` for a request row."""
+    payload = {name: row.get(name) for name in _EVENT_FIELDS}
+    event_broker.publish(event_type, row["requester_id"], payload)
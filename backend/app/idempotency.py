@@ -0,0 +1,107 @@
+"""
+``Idempotency-Key`` support for create endpoints.
+
+Clients that retry ``POST /requests/`` after a timeout send the same key
+with each attempt. ``idempotency_store`` makes those attempts resolve to one
+result:
+
+- Replays: the response of a completed create is kept for
+  IDEMPOTENCY_TTL_SECONDS (at most IDEMPOTENCY_CACHE_SIZE keys, LRU) and
+  returned again without classifying or touching the database.
+- Concurrent duplicates: while the first attempt is still running, later
+  ones await the same task instead of starting their own insert. The task
+  is shielded, so a client that disconnects mid-create doesn't cancel the
+  insert its retry is waiting on.
+- Failures are not remembered: once the attempt finishes with an error,
+  the next retry runs again.
+
+Keys are scoped to the user and bound to a fingerprint of the payload;
+reusing a key with a different body raises ``IdempotencyKeyReused``.
+
+Like the other caches the store is per worker process, so duplicates that
+land on different workers are not deduplicated.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.cache import TTLCache
+from app.config import settings
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different payload."""
+
+
+def fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, maxsize: int, ttl: float):
+        # key -> (fingerprint, result) for completed creates
+        self._done = TTLCache(maxsize=maxsize, ttl=ttl)
+        # key -> (fingerprint, task) for creates still running
+        self._in_flight: dict[Hashable, tuple[str, asyncio.Task]] = {}
+        self.replayed = 0
+        self.coalesced = 0
+        self.conflicts = 0
+
+    @classmethod
+    def from_settings(cls) -> "IdempotencyStore":
+        return cls(
+            maxsize=settings.IDEMPOTENCY_CACHE_SIZE,
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        )
+
+    async def run(
+        self,
+        key: Hashable,
+        body_fingerprint: str,
+        create: Callable[[], Awaitable[Any]],
+    ) -> tuple[Any, bool]:
+        """
+        Return ``(result, replayed)`` for ``key``, calling ``create`` only if
+        no attempt with this key has completed or is in flight.
+        """
+        done = self._done.get(key)
+        if done is not None:
+            self._check(done[0], body_fingerprint)
+            self.replayed += 1
+            return done[1], True
+
+        running = self._in_flight.get(key)
+        if running is not None:
+            self._check(running[0], body_fingerprint)
+            self.coalesced += 1
+            return await asyncio.shield(running[1]), True
+
+        task = asyncio.ensure_future(create())
+        self._in_flight[key] = (body_fingerprint, task)
+        task.add_done_callback(lambda t: self._finish(key, body_fingerprint, t))
+        return await asyncio.shield(task), False
+
+    def stats(self) -> dict:
+        return {
+            **self._done.stats(),
+            "in_flight": len(self._in_flight),
+            "replayed": self.replayed,
+            "coalesced": self.coalesced,
+            "conflicts": self.conflicts,
+        }
+
+    def _check(self, stored: str, body_fingerprint: str) -> None:
+        if stored != body_fingerprint:
+            self.conflicts += 1
+            raise IdempotencyKeyReused()
+
+    def _finish(self, key: Hashable, body_fingerprint: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        # exception() also marks it retrieved when every caller went away
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._done.set(key, (body_fingerprint, task.result()))
+
+
+idempotency_store = IdempotencyStore.from_settings()
@@ -0,0 +1,181 @@
+"""
+Re-score historical requests against the current risk rules.
+
+Streams the ``requests`` table in keyset-paginated chunks (ordered by id),
+classifies each chunk across a process pool and writes a CSV diff of every
+row whose risk level, score or factors would change. With ``--write`` the
+new values are stored back with one bulk update per chunk; request status
+and decisions are never touched.
+
+    cd backend
+    python -m app.jobs.reclassify --report diff.csv [--rules rules.json] [--write]
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.config import settings
+from app.repositories import Repository, close_repository, get_repository
+from app.risk_engine import BUILTIN_RULESET, RuleSet, classify_risk, load_ruleset
+
+_COLUMNS = "id,title,description,request_type,risk_level,risk_score,risk_factors"
+_REPORT_FIELDS = [
+    "id", "request_type", "old_risk_level", "new_risk_level",
+    "old_risk_score", "new_risk_score", "new_risk_factors",
+]
+
+_worker_ruleset: RuleSet = BUILTIN_RULESET
+
+
+def _load(rules_path: Optional[str]) -> RuleSet:
+    return load_ruleset(rules_path) if rules_path else BUILTIN_RULESET
+
+
+def _init_worker(rules_path: Optional[str]) -> None:
+    global _worker_ruleset
+    _worker_ruleset = _load(rules_path)
+
+
+def _classify_rows(rows: list[tuple]) -> list[tuple]:
+    """Worker entry point: (id, title, description, type) -> new risk fields."""
+    results = []
+    for request_id, title, description, request_type in rows:
+        risk = classify_risk(title, description, request_type, _worker_ruleset)
+        results.append(
+            (request_id, risk.risk_level.value, risk.risk_score, risk.risk_factors)
+        )
+    return results
+
+
+async def _write_back(repo: Repository, rows: list[dict], changes: list[tuple]) -> None:
+    by_id = {row["id"]: row for row in rows}
+    await repo.update_risk([
+        {**by_id[request_id], "risk_level": level, "risk_score": score, "risk_factors": factors}
+        for request_id, level, score, factors in changes
+    ])
+
+
+async def run(
+    report_path: str,
+    rules_path: Optional[str],
+    chunk_size: int,
+    workers: int,
+    write: bool,
+) -> dict:
+    ruleset = _load(rules_path)
+    repo = get_repository()
+    transitions: Counter = Counter()
+    scanned = changed = 0
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(rules_path,)
+    ) as pool, open(report_path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=_REPORT_FIELDS)
+        writer.writeheader()
+
+        rows = await repo.scan_requests(_COLUMNS, None, chunk_size)
+        while rows:
+            # Prefetch the next page while this one is being classified
+            next_rows = asyncio.create_task(
+                repo.scan_requests(_COLUMNS, rows[-1]["id"], chunk_size)
+            )
+            slices = [
+                [(r["id"], r["title"], r["description"], r["request_type"])
+                 for r in rows[i::workers]]
+                for i in range(workers)
+            ]
+            results = await asyncio.gather(
+                *(loop.run_in_executor(pool, _classify_rows, s) for s in slices if s)
+            )
+
+            old = {r["id"]: r for r in rows}
+            changes = []
+            for request_id, level, score, factors in (r for batch in results for r in batch):
+                before = old[request_id]
+                if (
+                    level == before["risk_level"]
+                    and score == before["risk_score"]
+                    and factors == (before["risk_factors"] or [])
+                ):
+                    continue
+                changes.append((request_id, level, score, factors))
+                transitions[(before["risk_level"], level)] += 1
+                writer.writerow({
+                    "id": request_id,
+                    "request_type": before["request_type"],
+                    "old_risk_level": before["risk_level"],
+                    "new_risk_level": level,
+                    "old_risk_score": before["risk_score"],
+                    "new_risk_score": score,
+                    "new_risk_factors": "|".join(factors),
+                })
+
+            if write and changes:
+                await _write_back(repo, rows, changes)
+
+            scanned += len(rows)
+            changed += len(changes)
+            elapsed = time.perf_counter() - started
+            print(
+                f"scanned={scanned} changed={changed} "
+                f"rows/s={scanned / elapsed:,.0f}",
+                file=sys.stderr,
+            )
+            rows = await next_rows
+
+    elapsed = time.perf_counter() - started
+    return {
+        "ruleset_version": ruleset.version,
+        "scanned": scanned,
+        "changed": changed,
+        "level_flips": {
+            f"{old}->{new}": count
+            for (old, new), count in sorted(transitions.items())
+            if old != new
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "rows_per_second": round(scanned / elapsed, 1) if elapsed else 0.0,
+        "written": write,
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        summary = await run(
+            report_path=args.report,
+            rules_path=args.rules,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            write=args.write,
+        )
+    finally:
+        await close_repository()
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--report", default="reclassify_diff.csv", help="CSV diff output path")
+    parser.add_argument(
+        "--rules",
+        default=settings.RISK_RULES_PATH or None,
+        help="Rules file to score with (default: RISK_RULES_PATH, else built-in rules)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--write", action="store_true", help="Store the new scores")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+In-process request instrumentation and Prometheus text exposition.
+
+``MetricsMiddleware`` times every request and keeps a per-request breakdown
+of the spans recorded with ``track()`` (storage calls, auth resolution,
+risk classification). That breakdown feeds the process-wide histograms
+below, the optional ``Server-Timing`` response header and the slow-request
+log. ``render()`` produces the ``/metrics`` payload.
+
+Metrics are per worker process, like the caches they report on.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-millisecond cache hits up to slow upstream calls
+_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50)
+# Stats keys that only ever grow (per worker); rendered as counters so
+# rate() works on them, every other numeric stat as a gauge
+_CUMULATIVE_STATS = frozenset({
+    "hits", "misses", "evictions",
+    "enqueued", "written", "spilled", "dropped", "flushes", "failed_flushes",
+    "published", "delivered", "overflows",
+    "replayed", "coalesced", "conflicts",
+    "lookups", "matches",
+    "throttled", "shed", "shed_admin",
+})
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _label_str(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict = {}
+
+    def inc(self, *label_values, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            lines.append(f"{self.name}{self._label_str(values)} {_num(total)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple = _BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = buckets
+        # label values -> [bucket counts..., count, sum]
+        self._series: dict = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for values, series in items:
+            for bound, count in zip(self.buckets, series):
+                labels = self._label_str(values, f'le="{_num(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = self._label_str(values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {series[-2]}")
+            lines.append(f"{self.name}_count{self._label_str(values)} {series[-2]}")
+            lines.append(f"{self.name}_sum{self._label_str(values)} {_num(series[-1])}")
+        return lines
+
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+)
+http_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+http_upstream_calls = Histogram(
+    "http_request_upstream_calls",
+    "Storage calls made while handling one HTTP request.",
+    ("method", "route"),
+    buckets=_COUNT_BUCKETS,
+)
+upstream_duration = Histogram(
+    "upstream_call_duration_seconds", "Storage call latency by operation.", ("operation",)
+)
+upstream_errors = Counter(
+    "upstream_call_errors_total", "Storage calls that raised, by operation.", ("operation",)
+)
+span_duration = Histogram(
+    "app_span_duration_seconds",
+    "Time spent in instrumented in-process steps (auth, classify_risk).",
+    ("span",),
+)
+
+_REGISTRY = [
+    http_requests, http_duration, http_upstream_calls,
+    upstream_duration, upstream_errors, span_duration,
+]
+
+
+# ── Per-request breakdown ─────────────────────────────────────────────────────
+
+class RequestTimings:
+    """Spans recorded while handling one request: name -> [calls, seconds]."""
+
+    __slots__ = ("spans",)
+
+    def __init__(self):
+        self.spans: dict = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [1, seconds]
+        else:
+            span[0] += 1
+            span[1] += seconds
+
+    def total(self, name: str) -> tuple[int, float]:
+        calls, seconds = self.spans.get(name, (0, 0.0))
+        return calls, seconds
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def track(span: str):
+    """Time a block as ``span`` (e.g. "auth", "classify_risk")."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        span_duration.observe(elapsed, span)
+        timings = _current.get()
+        if timings is not None:
+            timings.add(span, elapsed)
+
+
+def record_upstream(operation: str, seconds: float, failed: bool = False) -> None:
+    upstream_duration.observe(seconds, operation)
+    if failed:
+        upstream_errors.inc(operation)
+    timings = _current.get()
+    if timings is not None:
+        timings.add("db", seconds)
+
+
+class InstrumentedRepository:
+    """Delegates to a repository, recording each call as an upstream call."""
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = await attr(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                record_upstream(name, time.perf_counter() - started, failed)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
+
+
+# ── Middleware ────────────────────────────────────────────────────────────────
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no per-request task) that times HTTP requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+        event_stream = False
+
+        async def send_wrapper(message):
+            nonlocal status_code, event_stream
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                event_stream = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", ())
+                )
+                if settings.METRICS_SERVER_TIMING:
+                    header = _server_timing(timings, time.perf_counter() - started)
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"server-timing", header.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            # Route templates keep label cardinality bounded
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method, path, str(status_code))
+            if not event_stream:
+                # Event streams stay open for minutes by design; they would
+                # swamp the latency histograms and the slow-request log
+                _observe(scope, path, status_code, elapsed, timings)
+
+
+def _observe(scope, path: str, status_code: int, elapsed: float, timings: RequestTimings) -> None:
+    method = scope["method"]
+    http_duration.observe(elapsed, method, path)
+    db_calls, _ = timings.total("db")
+    http_upstream_calls.observe(db_calls, method, path)
+    threshold = settings.SLOW_REQUEST_MS
+    if threshold > 0 and elapsed * 1000 >= threshold:
+        logger.warning(
+            "Slow request %s %s -> %s in %.1f ms (%s)",
+            method, scope["path"], status_code, elapsed * 1000,
+            _breakdown(timings),
+        )
+
+
+def _server_timing(timings: RequestTimings, elapsed: float) -> str:
+    parts = [
+        f'{name};dur={seconds * 1000:.2f};desc="{calls}x"'
+        for name, (calls, seconds) in timings.spans.items()
+    ]
+    parts.append(f"total;dur={elapsed * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def _breakdown(timings: RequestTimings) -> str:
+    if not timings.spans:
+        return "no spans"
+    return ", ".join(
+        f"{name}={seconds * 1000:.1f}ms/{calls}"
+        for name, (calls, seconds) in timings.spans.items()
+    )
+
+
+# ── Exposition ────────────────────────────────────────────────────────────────
+
+def render(stats_by_prefix: dict[str, dict]) -> str:
+    """
+    Prometheus text format for all metrics plus in-process stats.
+
+    ``stats_by_prefix`` maps a prefix to a stats dict (e.g.
+    ``TTLCache.stats()``). Each numeric entry becomes a ``<prefix>_<key>_total``
+    counter if it is cumulative, a ``<prefix>_<key>`` gauge otherwise.
+    """
+    lines: list[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    for prefix, stats in stats_by_prefix.items():
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if _is_cumulative(key):
+                name, kind = f"{prefix}_{key}_total", "counter"
+            else:
+                name, kind = f"{prefix}_{key}", "gauge"
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_num(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _is_cumulative(key: str) -> bool:
+    # throttled_<limit> is one counter per configured rate limit
+    return key in _CUMULATIVE_STATS or key.startswith("throttled_")
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Any
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Any, Dict, Literal, Union
+from datetime import date, datetime
 from uuid import UUID
 from enum import Enum
 
@@ -30,6 +30,7 @@ class RiskLevel(str, Enum):
 class AuditAction(str, Enum):
     SUBMITTED = "SUBMITTED"
     AUTO_APPROVED = "AUTO_APPROVED"
+    AUTO_REJECTED = "AUTO_REJECTED"
     ESCALATED = "ESCALATED"
     APPROVED = "APPROVED"
     REJECTED = "REJECTED"
@@ -81,10 +82,53 @@ class RequestResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class RequestSummary(BaseModel):
+    """List projection of a request without its large text columns."""
+    id: str
+    title: str
+    request_type: str
+    requester_id: str
+    requester_email: str
+    status: str
+    risk_level: str
+    risk_score: int
+    risk_factors: List[str]
+    decided_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class RequestPage(BaseModel):
+    items: List[Union[RequestResponse, RequestSummary]]
+    next_cursor: Optional[str] = None
+
+
 class RiskAnalysis(BaseModel):
     risk_level: RiskLevel
     risk_score: int
     risk_factors: List[str]
+    ruleset_version: str = "builtin"
+
+
+class BatchItemOutcome(str, Enum):
+    created = "created"
+    invalid = "invalid"
+    failed = "failed"
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    outcome: BatchItemOutcome
+    id: Optional[str] = None
+    status: Optional[str] = None
+    risk_level: Optional[str] = None
+    risk_score: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchCreateResponse(BaseModel):
+    created: int
+    results: List[BatchItemResult]
 
 
 # ── Approval Models ───────────────────────────────────────────────────────────
@@ -97,6 +141,41 @@ class RejectionAction(BaseModel):
     reason: str = Field(..., min_length=5)
 
 
+class BulkDecisionOutcome(str, Enum):
+    applied = "applied"
+    not_found = "not_found"
+    wrong_state = "wrong_state"
+
+
+class BulkDecisionAction(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=500)
+    action: Literal["approve", "reject"]
+    reason: Optional[str] = None
+
+    @field_validator("ids")
+    @classmethod
+    def ids_must_be_uuids(cls, ids: List[str]) -> List[str]:
+        # Dedupe while keeping order; a malformed id would fail the whole query
+        return [str(UUID(i)) for i in dict.fromkeys(ids)]
+
+    @model_validator(mode="after")
+    def reject_needs_reason(self) -> "BulkDecisionAction":
+        if self.action == "reject" and len((self.reason or "").strip()) < 5:
+            raise ValueError("A rejection reason of at least 5 characters is required")
+        return self
+
+
+class BulkDecisionResult(BaseModel):
+    id: str
+    outcome: BulkDecisionOutcome
+    status: Optional[str] = None
+
+
+class BulkDecisionResponse(BaseModel):
+    applied: int
+    results: List[BulkDecisionResult]
+
+
 # ── Audit Log Models ──────────────────────────────────────────────────────────
 
 class AuditLogResponse(BaseModel):
@@ -107,3 +186,24 @@ class AuditLogResponse(BaseModel):
     performed_by_role: str
     details: Optional[Any] = None
     created_at: Optional[datetime] = None
+
+
+class AuditLogPage(BaseModel):
+    items: List[AuditLogResponse]
+    next_cursor: Optional[str] = None
+
+
+# ── Stats Models ──────────────────────────────────────────────────────────────
+
+class DailyCount(BaseModel):
+    day: date
+    count: int
+
+
+class RequestStats(BaseModel):
+    scope: Literal["me", "global"]
+    total: int
+    by_status: Dict[str, int]
+    by_risk_level: Dict[str, int]
+    by_request_type: Dict[str, int]
+    daily: List[DailyCount] = []
@@ -0,0 +1,217 @@
+"""
+Keyset pagination and list filters shared by the list endpoints.
+
+Pages are ordered newest first by (created_at, id). The cursor is an opaque,
+URL-safe token holding the last row's sort key, so fetching page N costs the
+same as page 1 (no OFFSET scans). Search results are ordered by
+(search_rank, created_at, id) instead, with a cursor holding all three.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Literal, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Query
+
+from app.config import settings
+from app.models import RequestStatus, RequestType, RiskLevel
+
+ListView = Literal["full", "summary"]
+
+
+def encode_cursor(row: dict) -> str:
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        created_at, row_id = _decode_token(cursor)
+        datetime.fromisoformat(created_at)
+        return created_at, _row_id(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_search_cursor(row: dict) -> str:
+    raw = json.dumps(
+        [row["search_rank"], row["created_at"], row["id"]], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, str, str]:
+    try:
+        rank, created_at, row_id = _decode_token(cursor)
+        datetime.fromisoformat(created_at)
+        return float(rank), created_at, _row_id(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _decode_token(cursor: str):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def _row_id(row_id) -> str:
+    # Ends up quoted inside a PostgREST or=(...) filter, so only a UUID may pass
+    if not isinstance(row_id, str):
+        raise TypeError("cursor id must be a string")
+    return str(UUID(row_id))
+
+
+class PageParams:
+    """``limit``/``cursor`` query params; either one switches to paged mode."""
+
+    def __init__(self, limit: Optional[int] = None, cursor: Optional[str] = None):
+        self.paged = limit is not None or cursor is not None
+        self.size = min(limit or settings.DEFAULT_PAGE_SIZE, settings.MAX_PAGE_SIZE)
+        self.after = decode_cursor(cursor) if cursor else None
+
+    @classmethod
+    def chunk(cls, size: int, after: Optional[tuple[str, str]] = None) -> "PageParams":
+        """Paged params for internal scans (exports), not capped at MAX_PAGE_SIZE."""
+        page = cls(limit=1)
+        page.size = size
+        page.after = after
+        return page
+
+    def apply(self, query):
+        """Order newest first, start after the cursor, fetch one extra row."""
+        if self.after is not None:
+            created_at, row_id = self.after
+            # The lte is implied by the or_, but unlike the OR it becomes an
+            # index range bound; without it deep pages scan every newer row
+            query = query.lte("created_at", created_at).or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+            )
+        return (
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(self.size + 1)
+        )
+
+    def split(self, rows: list[dict]) -> tuple[list[dict], Optional[str]]:
+        """Trim the look-ahead row and build the next cursor, if any."""
+        if len(rows) <= self.size:
+            return rows, None
+        rows = rows[: self.size]
+        return rows, encode_cursor(rows[-1])
+
+
+class SearchParams:
+    """``q``/``limit``/``cursor`` for ranked full-text search; always paged."""
+
+    paged = True
+
+    def __init__(self, q: str, limit: Optional[int] = None, cursor: Optional[str] = None):
+        self.q = q
+        self.size = min(limit or settings.DEFAULT_PAGE_SIZE, settings.MAX_PAGE_SIZE)
+        self.after = decode_search_cursor(cursor) if cursor else None
+
+    def split(self, rows: list[dict]) -> tuple[list[dict], Optional[str]]:
+        """Trim the look-ahead row and build the next cursor, if any."""
+        if len(rows) <= self.size:
+            return rows, None
+        rows = rows[: self.size]
+        return rows, encode_search_cursor(rows[-1])
+
+
+def _apply_date_range(query, created_from, created_to):
+    if created_from is not None:
+        query = query.gte("created_at", created_from.isoformat())
+    if created_to is not None:
+        query = query.lt("created_at", created_to.isoformat())
+    return query
+
+
+class RequestFilters:
+    """Server-side filters for request lists."""
+
+    def __init__(
+        self,
+        status: Optional[List[RequestStatus]] = None,
+        risk_level: Optional[List[RiskLevel]] = None,
+        request_type: Optional[List[RequestType]] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ):
+        self.status = [s.value for s in status] if status else None
+        self.risk_level = [r.value for r in risk_level] if risk_level else None
+        self.request_type = [t.value for t in request_type] if request_type else None
+        self.created_from = created_from
+        self.created_to = created_to
+
+    def apply(self, query):
+        if self.status:
+            query = query.in_("status", self.status)
+        if self.risk_level:
+            query = query.in_("risk_level", self.risk_level)
+        if self.request_type:
+            query = query.in_("request_type", self.request_type)
+        return _apply_date_range(query, self.created_from, self.created_to)
+
+
+class AuditLogFilters:
+    """Server-side filters for audit log lists."""
+
+    def __init__(
+        self,
+        action: Optional[List[str]] = None,
+        request_id: Optional[UUID] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ):
+        self.action = action
+        self.request_id = str(request_id) if request_id else None
+        self.created_from = created_from
+        self.created_to = created_to
+
+    def apply(self, query):
+        if self.action:
+            query = query.in_("action", self.action)
+        if self.request_id:
+            query = query.eq("request_id", self.request_id)
+        return _apply_date_range(query, self.created_from, self.created_to)
+
+
+# ── Dependencies ──────────────────────────────────────────────────────────────
+# Async on purpose: FastAPI runs sync dependencies (including classes) in a
+# worker thread, and that hand-off dominated list latency under load.
+
+async def page_params(
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+) -> PageParams:
+    return PageParams(limit, cursor)
+
+
+async def search_params(
+    q: str = Query(..., min_length=1, max_length=200, description="Search words"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+) -> SearchParams:
+    return SearchParams(q, limit, cursor)
+
+
+async def request_filters(
+    status: Optional[List[RequestStatus]] = Query(None),
+    risk_level: Optional[List[RiskLevel]] = Query(None),
+    request_type: Optional[List[RequestType]] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+) -> RequestFilters:
+    return RequestFilters(status, risk_level, request_type, created_from, created_to)
+
+
+async def audit_log_filters(
+    action: Optional[List[str]] = Query(None),
+    request_id: Optional[UUID] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+) -> AuditLogFilters:
+    return AuditLogFilters(action, request_id, created_from, created_to)
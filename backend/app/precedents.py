@@ -0,0 +1,291 @@
+"""
+Auto-decisions from precedent: requests that are near-copies of one an
+admin already decided get the same decision.
+
+``precedent_index`` holds the admin-decided requests of this worker in a
+MinHash/LSH index per request type. Text (title + description) is reduced
+to a set of word-pair shingles (numbers all alike); a 32-value MinHash signature, cut into 8
+bands of 4, files the request under 8 buckets. A lookup hashes the new
+request the same way, takes the requests sharing a bucket as candidates
+(near-certain above 0.8 similarity) and checks the most promising of them
+by the exact Jaccard similarity of the shingle sets. The work per lookup
+is bounded, so it stays well under a millisecond at any index size.
+
+A submission that would be escalated takes the decision of its closest
+precedent with similarity >= PRECEDENT_MIN_SIMILARITY:
+
+- Approvals only carry over to requests scored no riskier than the one the
+  admin approved.
+- Requests decided this way (by "system") never become precedents
+  themselves, so one admin decision can't spread by chains of near-copies.
+- Precedents apply across requesters, except for the request types in
+  PRECEDENT_PER_REQUESTER_TYPES (access permissions by default): there a
+  decision only carries over to the same requester's requests, since
+  granting user A access says nothing about user B.
+
+The index is filled from the newest admin decisions when the app starts
+and updated as admins approve or reject. It is bounded at
+PRECEDENT_INDEX_SIZE requests (oldest decisions are dropped) and, like the
+caches, kept per worker process: a worker learns decisions made through
+other workers when it next starts. Disabled unless PRECEDENTS_ENABLED.
+"""
+
+import asyncio
+import logging
+import random
+import re
+import zlib
+from array import array
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config import settings
+from app.models import RequestStatus, RiskLevel
+from app.pagination import PageParams, RequestFilters
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+_BANDS = 8
+_ROWS = 4
+# One MinHash per mask: XOR permutes the 32-bit shingle hashes, and
+# min(map(mask.__xor__, ...)) runs at C speed. The fixed seed keeps
+# signatures reproducible across runs.
+_rng = random.Random(20240601)
+_MASKS = [_rng.getrandbits(32) for _ in range(_BANDS * _ROWS)]
+# Below this many shingles one changed word moves the similarity too far
+_MIN_SHINGLES = 4
+# Per lookup: ids read from the buckets, most selective bucket first (a
+# bucket shared by thousands of requests only says they use one template),
+# and candidates checked exactly, those sharing the most bands first
+_MAX_SCANNED = 1000
+_MAX_CANDIDATES = 50
+_COLUMNS = (
+    "id,title,description,request_type,requester_id,status,risk_score,decided_by,"
+    "created_at,updated_at"
+)
+
+
+def shingles(title: str, description: str) -> frozenset[int]:
+    """
+    Hashed lower-cased word pairs of title and description. Numbers count
+    as one word, so a recurring request matches whatever its dates are.
+    """
+    words = [
+        "#" if word.isdigit() else word
+        for word in _WORD_RE.findall(f"{title} {description}".lower())
+    ]
+    return frozenset(
+        zlib.crc32(f"{a} {b}".encode()) for a, b in zip(words, words[1:])
+    )
+
+
+def _band_keys(scope: str, shingle_set: frozenset[int]) -> list[int]:
+    signature = [min(map(mask.__xor__, shingle_set)) for mask in _MASKS]
+    return [
+        hash((scope, band, *signature[band * _ROWS:(band + 1) * _ROWS]))
+        for band in range(_BANDS)
+    ]
+
+
+@dataclass(frozen=True)
+class Precedent:
+    id: str
+    # Request type, plus the requester for per-requester types
+    scope: str
+    status: str
+    risk_score: int
+    decided_by: str
+    decided_at: str
+    shingles: array
+
+
+@dataclass(frozen=True)
+class PrecedentMatch:
+    precedent: Precedent
+    similarity: float
+
+
+class PrecedentIndex:
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        min_similarity: float,
+        maxsize: int,
+        per_requester_types: frozenset[str] = frozenset(),
+    ):
+        self.enabled = enabled
+        self.min_similarity = min_similarity
+        self.maxsize = maxsize
+        self.per_requester_types = per_requester_types
+        # Oldest decision first, for eviction
+        self._entries: OrderedDict[str, Precedent] = OrderedDict()
+        # (scope, shingles) -> id: identical requests keep one entry
+        self._by_text: dict[tuple[str, bytes], str] = {}
+        self._buckets: dict[int, list[str]] = {}
+        self._warm_task: Optional[asyncio.Task] = None
+        self.lookups = 0
+        self.matches = 0
+
+    @classmethod
+    def from_settings(cls) -> "PrecedentIndex":
+        return cls(
+            enabled=settings.PRECEDENTS_ENABLED,
+            min_similarity=settings.PRECEDENT_MIN_SIMILARITY,
+            maxsize=settings.PRECEDENT_INDEX_SIZE,
+            per_requester_types=frozenset(settings.precedent_per_requester_types_list),
+        )
+
+    def add(self, row: dict, *, oldest: bool = False) -> None:
+        """
+        Index a request an admin approved or rejected; other rows are
+        ignored. It replaces an earlier decision on an identical request.
+        ``oldest`` files it behind everything already indexed (startup
+        backfill, newest first) and skips it when the index is full or
+        already has a decision on the same request.
+        """
+        if not self.enabled or row.get("decided_by") in (None, "system"):
+            return
+        if row.get("status") not in (RequestStatus.APPROVED.value, RequestStatus.REJECTED.value):
+            return
+        shingle_set = shingles(row["title"], row["description"])
+        if len(shingle_set) < _MIN_SHINGLES or row["id"] in self._entries:
+            return
+        packed = array("I", sorted(shingle_set))
+        scope = self._scope(row["request_type"], row.get("requester_id"))
+        text_key = (scope, packed.tobytes())
+        if oldest and (len(self._entries) >= self.maxsize or text_key in self._by_text):
+            return
+        if text_key in self._by_text:
+            self._remove(self._by_text[text_key])
+
+        precedent = Precedent(
+            id=row["id"],
+            scope=scope,
+            status=row["status"],
+            risk_score=row["risk_score"],
+            decided_by=row["decided_by"],
+            decided_at=row.get("updated_at") or "",
+            shingles=packed,
+        )
+        self._entries[precedent.id] = precedent
+        self._by_text[text_key] = precedent.id
+        if oldest:
+            self._entries.move_to_end(precedent.id, last=False)
+        for key in _band_keys(precedent.scope, shingle_set):
+            self._buckets.setdefault(key, []).append(precedent.id)
+
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def match(
+        self,
+        title: str,
+        description: str,
+        request_type: str,
+        risk_score: int,
+        requester_id: Optional[str] = None,
+    ) -> Optional[PrecedentMatch]:
+        """The closest applicable precedent, if one is similar enough."""
+        if not self.enabled or not self._entries:
+            return None
+        shingle_set = shingles(title, description)
+        if len(shingle_set) < _MIN_SHINGLES:
+            return None
+        self.lookups += 1
+
+        scope = self._scope(request_type, requester_id)
+        buckets = sorted(
+            (self._buckets.get(key, ()) for key in _band_keys(scope, shingle_set)),
+            key=len,
+        )
+        shared: Counter = Counter()
+        budget = _MAX_SCANNED
+        for bucket in buckets:
+            if budget <= 0:
+                break
+            # Latest additions are at the end
+            shared.update(bucket[-budget:])
+            budget -= len(bucket)
+        best: Optional[PrecedentMatch] = None
+        for precedent_id, _ in shared.most_common(_MAX_CANDIDATES):
+            precedent = self._entries[precedent_id]
+            if precedent.scope != scope:
+                continue
+            if precedent.status == RequestStatus.APPROVED.value and risk_score > precedent.risk_score:
+                continue
+            common = len(shingle_set.intersection(precedent.shingles))
+            similarity = common / (len(shingle_set) + len(precedent.shingles) - common)
+            if similarity < self.min_similarity:
+                continue
+            if best is None or (similarity, precedent.decided_at) > (
+                best.similarity, best.precedent.decided_at
+            ):
+                best = PrecedentMatch(precedent, similarity)
+        if best is not None:
+            self.matches += 1
+        return best
+
+    async def start(self, repository) -> None:
+        """Backfill from the newest decisions in the background."""
+        if self.enabled and self._warm_task is None:
+            self._warm_task = asyncio.create_task(self._warm(repository))
+
+    async def stop(self) -> None:
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            await asyncio.gather(self._warm_task, return_exceptions=True)
+            self._warm_task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "buckets": len(self._buckets),
+            "lookups": self.lookups,
+            "matches": self.matches,
+        }
+
+    def _scope(self, request_type: str, requester_id: Optional[str]) -> str:
+        if request_type in self.per_requester_types:
+            return f"{request_type}:{requester_id}"
+        return request_type
+
+    def _remove(self, precedent_id: str) -> None:
+        precedent = self._entries.pop(precedent_id)
+        del self._by_text[(precedent.scope, precedent.shingles.tobytes())]
+        for key in _band_keys(precedent.scope, frozenset(precedent.shingles)):
+            bucket = self._buckets[key]
+            bucket.remove(precedent_id)
+            if not bucket:
+                del self._buckets[key]
+
+    async def _warm(self, repository) -> None:
+        # LOW risk requests are approved by the system, so admin decisions
+        # are among the MEDIUM/HIGH ones
+        filters = RequestFilters(
+            status=[RequestStatus.APPROVED, RequestStatus.REJECTED],
+            risk_level=[RiskLevel.MEDIUM, RiskLevel.HIGH],
+        )
+        size = settings.EXPORT_CHUNK_SIZE
+        after, read = None, 0
+        try:
+            while len(self._entries) < self.maxsize:
+                rows = await repository.list_requests(
+                    filters, PageParams.chunk(size, after), columns=_COLUMNS
+                )
+                for row in rows[:size]:
+                    self.add(row, oldest=True)
+                read += len(rows[:size])
+                if len(rows) <= size:
+                    break
+                after = (rows[size - 1]["created_at"], rows[size - 1]["id"])
+        except Exception as exc:
+            logger.warning("Precedent backfill stopped after %d requests: %s", read, exc)
+            return
+        logger.info("Indexed %d precedents from %d decided requests", len(self._entries), read)
+
+
+precedent_index = PrecedentIndex.from_settings()
@@ -0,0 +1,59 @@
+"""
+Storage backends behind a common interface.
+
+STORAGE_BACKEND selects the implementation: "supabase" (default) for the
+real database, or "sqlite" (file at SQLITE_PATH, ":memory:" by default) to
+run the API with no network, e.g. for load tests and profiling.
+"""
+
+from typing import Optional
+
+from app.config import settings
+from app.metrics import InstrumentedRepository
+from app.repositories.base import OPEN_STATUSES, Repository, utc_now
+
+_repository: Optional[Repository] = None
+
+
+def get_repository() -> Repository:
+    global _repository
+    if _repository is None:
+        _repository = _create(settings.STORAGE_BACKEND)
+        if settings.METRICS_ENABLED:
+            _repository = InstrumentedRepository(_repository)
+    return _repository
+
+
+def set_repository(repository: Optional[Repository]) -> None:
+    """Install a specific repository (None resets to STORAGE_BACKEND)."""
+    global _repository
+    _repository = repository
+
+
+async def close_repository() -> None:
+    global _repository
+    if _repository is not None:
+        await _repository.close()
+    _repository = None
+
+
+def _create(backend: str) -> Repository:
+    if backend == "supabase":
+        from app.repositories.supabase import SupabaseRepository
+
+        return SupabaseRepository()
+    if backend == "sqlite":
+        from app.repositories.sqlite import SQLiteRepository
+
+        return SQLiteRepository(settings.SQLITE_PATH)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend!r}")
+
+
+__all__ = [
+    "OPEN_STATUSES",
+    "Repository",
+    "close_repository",
+    "get_repository",
+    "set_repository",
+    "utc_now",
+]
@@ -0,0 +1,199 @@
+"""
+Storage interface used by the routers, auth and background jobs.
+
+Rows are plain dicts shaped like the PostgREST responses (ISO timestamp
+strings, JSON columns decoded). Backends raise on storage errors; routers
+turn those into HTTP errors.
+"""
+
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from app.models import RequestStatus
+from app.pagination import AuditLogFilters, PageParams, RequestFilters, SearchParams
+
+OPEN_STATUSES = [RequestStatus.PENDING.value, RequestStatus.ESCALATED.value]
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def summarize_stats(rows: list[dict], since: Optional[date]) -> dict:
+    """
+    Build the ``request_stats`` result from request rows.
+
+    For backends without rollup counters. With ``since``, rows also need
+    ``created_at`` and a per-day series from that UTC day on is included.
+    """
+    by = {name: Counter() for name in ("status", "risk_level", "request_type")}
+    daily: Counter = Counter()
+    for row in rows:
+        for name, counts in by.items():
+            counts[row[name]] += 1
+        if since is not None:
+            created = datetime.fromisoformat(row["created_at"]).astimezone(timezone.utc)
+            if created.date() >= since:
+                daily[created.date().isoformat()] += 1
+    return {
+        "total": len(rows),
+        "by_status": dict(by["status"]),
+        "by_risk_level": dict(by["risk_level"]),
+        "by_request_type": dict(by["request_type"]),
+        "daily": [{"day": day, "count": n} for day, n in sorted(daily.items())],
+    }
+
+
+class Repository(ABC):
+    # ── Profiles ──────────────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def get_profile(self, user_id: str) -> Optional[dict]:
+        """Profile row, or None if there is none."""
+
+    @abstractmethod
+    async def upsert_profile(self, profile: dict) -> None:
+        """Insert a profile or overwrite the given columns of an existing one."""
+
+    # ── Requests ──────────────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def create_request(self, request: dict, audit_entries: list[dict]) -> dict:
+        """Insert a request and its audit rows; return the created row."""
+
+    @abstractmethod
+    async def create_requests(self, requests: list[dict], audit_entries: list[dict]) -> None:
+        """
+        Insert many complete request rows and their audit rows in one
+        transaction, as multi-row inserts. Rows must all have the same keys.
+        """
+
+    @abstractmethod
+    async def get_request(self, request_id: str) -> Optional[dict]:
+        """Request row, or None if there is none."""
+
+    @abstractmethod
+    async def list_requests(
+        self,
+        filters: RequestFilters,
+        page: PageParams,
+        *,
+        columns: str = "*",
+        requester_id: Optional[str] = None,
+    ) -> list[dict]:
+        """
+        Requests newest first, optionally limited to one requester.
+
+        In paged mode, starts after ``page.after`` and returns up to
+        ``page.size + 1`` rows (see ``PageParams.split``).
+        """
+
+    @abstractmethod
+    async def search_requests(
+        self,
+        search: SearchParams,
+        filters: RequestFilters,
+        *,
+        summary: bool = False,
+        requester_id: Optional[str] = None,
+    ) -> list[dict]:
+        """
+        Requests matching ``search.q`` in their title or description, best
+        match first, optionally limited to one requester.
+
+        Only the newest SEARCH_WINDOW matches are ranked. Rows carry a
+        ``search_rank`` and, with ``summary``, no description. Starts after
+        ``search.after`` and returns up to ``search.size + 1`` rows.
+        """
+
+    @abstractmethod
+    async def decide_request(
+        self,
+        request_id: str,
+        status: str,
+        decided_by: str,
+        reason: Optional[str],
+        audit_details: dict,
+    ) -> dict:
+        """
+        Move an open request to ``status`` and write its audit row.
+
+        Returns {"outcome": "applied", "request": row}, {"outcome": "not_found"}
+        or {"outcome": "wrong_state", "status": current_status}.
+        """
+
+    @abstractmethod
+    async def decide_requests(
+        self,
+        request_ids: list[str],
+        status: str,
+        decided_by: str,
+        reason: Optional[str],
+        audit_details: dict,
+    ) -> tuple[dict, dict]:
+        """
+        Move every still-open request in ``request_ids`` to ``status`` and
+        write an audit row for each.
+
+        Returns ``{id: updated row}`` for the requests that were updated and
+        ``{id: status}`` for the other ids that exist.
+        """
+
+    @abstractmethod
+    async def scan_requests(
+        self, columns: str, after_id: Optional[str], limit: int
+    ) -> list[dict]:
+        """Up to ``limit`` requests ordered by id, starting after ``after_id``."""
+
+    @abstractmethod
+    async def update_risk(self, rows: list[dict]) -> None:
+        """
+        Store new risk_level/risk_score/risk_factors for existing requests.
+
+        ``rows`` are request rows as returned by ``scan_requests`` carrying
+        the new risk fields; no other column is changed, and ids that no
+        longer exist are skipped.
+        """
+
+    # ── Audit logs ────────────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def insert_audit_logs(self, rows: list[dict]) -> None:
+        """Insert audit rows, skipping ids that already exist."""
+
+    @abstractmethod
+    async def list_audit_logs(
+        self,
+        filters: AuditLogFilters,
+        page: PageParams,
+        *,
+        columns: str = "*",
+        requester_id: Optional[str] = None,
+    ) -> list[dict]:
+        """Audit logs newest first, optionally only for one requester's requests."""
+
+    # ── Stats ─────────────────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def request_stats(self, requester_id: Optional[str], days: int) -> dict:
+        """
+        Request counts from the rollup counters, for one requester or global.
+
+        Returns {"total", "by_status", "by_risk_level", "by_request_type",
+        "daily"}; ``daily`` lists {"day", "count"} for the last ``days`` UTC
+        days and is only filled in for global stats.
+        """
+
+    # ── Change versions ───────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def change_version(self, scope: str) -> Optional[int]:
+        """
+        Counter bumped by every write to ``scope`` (see ``app.etags``), 0
+        before the first one; None if the backend doesn't keep them.
+        """
+
+    async def close(self) -> None:
+        """Release connections; called on application shutdown."""
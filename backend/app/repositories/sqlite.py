@@ -0,0 +1,607 @@
+"""
+Repository backed by SQLite, for load tests and profiling without Supabase.
+
+Mirrors database/schema.sql (constraints, cascades, ordering) and the
+semantics of the database functions in database/migrations/, so the API
+behaves as it does against Postgres. Queries run on the event loop thread:
+they take microseconds on a local file or ``:memory:`` and keep the
+measurement free of thread hand-offs. Row-level security does not apply;
+the API uses the service role, which bypasses it as well.
+"""
+
+import json
+import re
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import settings
+from app.pagination import AuditLogFilters, PageParams, RequestFilters, SearchParams
+from app.repositories.base import OPEN_STATUSES, Repository, utc_now
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+  id TEXT PRIMARY KEY,
+  email TEXT UNIQUE NOT NULL,
+  full_name TEXT,
+  role TEXT NOT NULL DEFAULT 'user' CHECK (role IN ('user', 'admin')),
+  created_at TEXT,
+  updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS requests (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  description TEXT NOT NULL,
+  request_type TEXT NOT NULL CHECK (request_type IN ('room_booking', 'access_permission', 'equipment_checkout', 'other')),
+  requester_id TEXT NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  requester_email TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'PENDING' CHECK (status IN ('PENDING', 'APPROVED', 'REJECTED', 'ESCALATED')),
+  risk_level TEXT NOT NULL DEFAULT 'LOW' CHECK (risk_level IN ('LOW', 'MEDIUM', 'HIGH')),
+  risk_score INTEGER NOT NULL DEFAULT 0 CHECK (risk_score >= 0 AND risk_score <= 100),
+  risk_factors TEXT DEFAULT '[]',
+  decision_reason TEXT,
+  decided_by TEXT,
+  created_at TEXT,
+  updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS audit_logs (
+  id TEXT PRIMARY KEY,
+  request_id TEXT NOT NULL REFERENCES requests(id) ON DELETE CASCADE,
+  action TEXT NOT NULL,
+  performed_by TEXT NOT NULL,
+  performed_by_role TEXT NOT NULL DEFAULT 'user',
+  details TEXT,
+  created_at TEXT,
+  requester_id TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_requests_requester_created
+  ON requests (requester_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_requests_status_created
+  ON requests (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_request_created
+  ON audit_logs (request_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created
+  ON audit_logs (created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_requester_created
+  ON audit_logs (requester_id, created_at DESC, id DESC);
+
+-- audit_logs.requester_id is filled from the request, as in migration 005
+CREATE TRIGGER IF NOT EXISTS audit_logs_set_requester AFTER INSERT ON audit_logs
+WHEN NEW.requester_id IS NULL
+BEGIN
+  UPDATE audit_logs
+     SET requester_id = (SELECT requester_id FROM requests WHERE id = NEW.request_id)
+   WHERE rowid = NEW.rowid;
+END;
+
+CREATE TABLE IF NOT EXISTS request_stats_totals (
+  status TEXT NOT NULL,
+  risk_level TEXT NOT NULL,
+  request_type TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (status, risk_level, request_type)
+);
+
+CREATE TABLE IF NOT EXISTS request_stats_daily (
+  day TEXT NOT NULL,
+  status TEXT NOT NULL,
+  risk_level TEXT NOT NULL,
+  request_type TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, status, risk_level, request_type)
+);
+
+CREATE TABLE IF NOT EXISTS request_stats_by_user (
+  requester_id TEXT NOT NULL,
+  status TEXT NOT NULL,
+  risk_level TEXT NOT NULL,
+  request_type TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (requester_id, status, risk_level, request_type)
+);
+"""
+
+# Row triggers keeping the counters current, as migration 004 does in
+# Postgres. {row} is NEW or OLD, {delta} 1 or -1.
+_STATS_BUMP = """
+  INSERT INTO request_stats_totals (status, risk_level, request_type, count)
+  VALUES ({row}.status, {row}.risk_level, {row}.request_type, {delta})
+  ON CONFLICT DO UPDATE SET count = count + excluded.count;
+  INSERT INTO request_stats_daily (day, status, risk_level, request_type, count)
+  VALUES (date({row}.created_at), {row}.status, {row}.risk_level, {row}.request_type, {delta})
+  ON CONFLICT DO UPDATE SET count = count + excluded.count;
+  INSERT INTO request_stats_by_user (requester_id, status, risk_level, request_type, count)
+  VALUES ({row}.requester_id, {row}.status, {row}.risk_level, {row}.request_type, {delta})
+  ON CONFLICT DO UPDATE SET count = count + excluded.count;
+"""
+_STATS_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS request_stats_inserted AFTER INSERT ON requests
+BEGIN {_STATS_BUMP.format(row="NEW", delta=1)} END;
+
+CREATE TRIGGER IF NOT EXISTS request_stats_deleted AFTER DELETE ON requests
+BEGIN {_STATS_BUMP.format(row="OLD", delta=-1)} END;
+
+CREATE TRIGGER IF NOT EXISTS request_stats_updated
+AFTER UPDATE OF status, risk_level, request_type, requester_id, created_at ON requests
+WHEN (OLD.status, OLD.risk_level, OLD.request_type, OLD.requester_id, date(OLD.created_at))
+  IS NOT (NEW.status, NEW.risk_level, NEW.request_type, NEW.requester_id, date(NEW.created_at))
+BEGIN
+  {_STATS_BUMP.format(row="OLD", delta=-1)}
+  {_STATS_BUMP.format(row="NEW", delta=1)}
+END;
+"""
+
+# Full-text index over title/description, standing in for migration 007's
+# tsvector side table. It reads the text from requests (external content)
+# and is keyed by the requests rowid.
+_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS request_search USING fts5(
+  title, description, content='requests', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS request_search_inserted AFTER INSERT ON requests
+BEGIN
+  INSERT INTO request_search (rowid, title, description)
+  VALUES (NEW.rowid, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS request_search_deleted AFTER DELETE ON requests
+BEGIN
+  INSERT INTO request_search (request_search, rowid, title, description)
+  VALUES ('delete', OLD.rowid, OLD.title, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS request_search_updated
+AFTER UPDATE OF title, description ON requests
+BEGIN
+  INSERT INTO request_search (request_search, rowid, title, description)
+  VALUES ('delete', OLD.rowid, OLD.title, OLD.description);
+  INSERT INTO request_search (rowid, title, description)
+  VALUES (NEW.rowid, NEW.title, NEW.description);
+END;
+"""
+
+# Change counters for conditional GETs, as migration 008 keeps them in
+# Postgres (there per statement; here per row, which only bumps them faster).
+# {requester_id} is the written row's owner (from NEW or OLD).
+_VERSION_BUMP = """
+  INSERT INTO change_versions (scope, version)
+  VALUES ('{table}', 1), ('{table}:' || {requester_id}, 1)
+  ON CONFLICT DO UPDATE SET version = version + 1;
+"""
+_VERSION_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS change_versions (
+  scope TEXT PRIMARY KEY,
+  version INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS requests_version_inserted AFTER INSERT ON requests
+BEGIN {_VERSION_BUMP.format(table="requests", requester_id="NEW.requester_id")} END;
+
+CREATE TRIGGER IF NOT EXISTS requests_version_updated AFTER UPDATE ON requests
+BEGIN {_VERSION_BUMP.format(table="requests", requester_id="NEW.requester_id")} END;
+
+CREATE TRIGGER IF NOT EXISTS requests_version_deleted AFTER DELETE ON requests
+BEGIN {_VERSION_BUMP.format(table="requests", requester_id="OLD.requester_id")} END;
+
+-- requester_id may not be filled in yet (audit_logs_set_requester)
+CREATE TRIGGER IF NOT EXISTS audit_logs_version_inserted AFTER INSERT ON audit_logs
+BEGIN {_VERSION_BUMP.format(
+    table="audit_logs",
+    requester_id="COALESCE(NEW.requester_id, "
+                 "(SELECT requester_id FROM requests WHERE id = NEW.request_id))",
+)} END;
+"""
+
+_COLUMNS = {
+    "profiles": ("id", "email", "full_name", "role", "created_at", "updated_at"),
+    "requests": (
+        "id", "title", "description", "request_type", "requester_id",
+        "requester_email", "status", "risk_level", "risk_score", "risk_factors",
+        "decision_reason", "decided_by", "created_at", "updated_at",
+    ),
+    "audit_logs": (
+        "id", "request_id", "action", "performed_by", "performed_by_role",
+        "details", "created_at", "requester_id",
+    ),
+}
+_JSON_COLUMNS = {"risk_factors", "details"}
+_SEARCH_SUMMARY_COLUMNS = ", ".join(
+    f"r.{name}" for name in _COLUMNS["requests"] if name != "description"
+)
+
+
+class SQLiteRepository(Repository):
+    def __init__(self, path: str = ":memory:"):
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db.executescript(_STATS_TRIGGERS)
+        self._db.executescript(_VERSION_SCHEMA)
+        indexed = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'request_search'"
+        ).fetchone()
+        self._db.executescript(_SEARCH_SCHEMA)
+        if not indexed:
+            # Requests stored before the index existed
+            self._db.execute("INSERT INTO request_search (request_search) VALUES ('rebuild')")
+
+    # ── Profiles ──────────────────────────────────────────────────────────────
+
+    async def get_profile(self, user_id: str) -> Optional[dict]:
+        return self._one("SELECT * FROM profiles WHERE id = ?", (user_id,))
+
+    async def upsert_profile(self, profile: dict) -> None:
+        profile = {"created_at": utc_now(), "updated_at": utc_now(), **profile}
+        names = _checked_columns("profiles", profile)
+        updates = ", ".join(
+            f"{n} = excluded.{n}" for n in names if n not in ("id", "created_at")
+        )
+        self._db.execute(
+            f"INSERT INTO profiles ({', '.join(names)}) VALUES ({_marks(names)}) "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}",
+            [profile[n] for n in names],
+        )
+
+    # ── Requests ──────────────────────────────────────────────────────────────
+
+    async def create_request(self, request: dict, audit_entries: list[dict]) -> dict:
+        row = {
+            "id": str(uuid.uuid4()),
+            "risk_factors": [],
+            "created_at": utc_now(),
+            "updated_at": utc_now(),
+            **request,
+        }
+        with self._transaction():
+            self._insert("requests", [row])
+            self._insert_audit(
+                [{**entry, "request_id": row["id"]} for entry in audit_entries]
+            )
+        return await self.get_request(row["id"])
+
+    async def create_requests(self, requests: list[dict], audit_entries: list[dict]) -> None:
+        with self._transaction():
+            self._insert("requests", requests)
+            self._insert_audit(audit_entries)
+
+    async def get_request(self, request_id: str) -> Optional[dict]:
+        return self._one("SELECT * FROM requests WHERE id = ?", (request_id,))
+
+    async def list_requests(
+        self,
+        filters: RequestFilters,
+        page: PageParams,
+        *,
+        columns: str = "*",
+        requester_id: Optional[str] = None,
+    ) -> list[dict]:
+        where, params = _request_filters(filters)
+        if requester_id is not None:
+            where.append("requester_id = ?")
+            params.append(requester_id)
+        return self._listing("requests", columns, where, params, page)
+
+    async def search_requests(
+        self,
+        search: SearchParams,
+        filters: RequestFilters,
+        *,
+        summary: bool = False,
+        requester_id: Optional[str] = None,
+    ) -> list[dict]:
+        # Every word must match (stemmed); quoting keeps FTS5 syntax out
+        words = re.findall(r"\w+", search.q)
+        if not words:
+            return []
+        where, params = _request_filters(filters)
+        where.insert(0, "request_search MATCH ?")
+        params.insert(0, " ".join(f'"{w}"' for w in words))
+        if requester_id is not None:
+            where.append("requester_id = ?")
+            params.append(requester_id)
+
+        # Rank the newest SEARCH_WINDOW matches, as search_requests does;
+        # bm25 is lower for better matches and weighs the title double
+        columns = _SEARCH_SUMMARY_COLUMNS if summary else "r.*"
+        sql = (
+            f"SELECT {columns}, -bm25(request_search, 2.0, 1.0) AS search_rank "
+            "FROM request_search JOIN requests r ON r.rowid = request_search.rowid "
+            f"{_where(where)} ORDER BY r.created_at DESC, r.id DESC LIMIT ?"
+        )
+        params.append(settings.SEARCH_WINDOW)
+        sql = f"SELECT * FROM ({sql})"
+        if search.after is not None:
+            sql += " WHERE (search_rank, created_at, id) < (?, ?, ?)"
+            params += list(search.after)
+        sql += " ORDER BY search_rank DESC, created_at DESC, id DESC LIMIT ?"
+        params.append(search.size + 1)
+        return self._all(sql, params)
+
+    async def decide_request(
+        self,
+        request_id: str,
+        status: str,
+        decided_by: str,
+        reason: Optional[str],
+        audit_details: dict,
+    ) -> dict:
+        with self._transaction():
+            rows = self._update_open([request_id], status, decided_by, reason)
+            if not rows:
+                current = self._one("SELECT status FROM requests WHERE id = ?", (request_id,))
+                if current is None:
+                    return {"outcome": "not_found"}
+                return {"outcome": "wrong_state", "status": current["status"]}
+            self._insert_audit([{
+                "request_id": request_id,
+                "action": status,
+                "performed_by": decided_by,
+                "performed_by_role": "admin",
+                "details": audit_details,
+            }])
+        return {"outcome": "applied", "request": rows[0]}
+
+    async def decide_requests(
+        self,
+        request_ids: list[str],
+        status: str,
+        decided_by: str,
+        reason: Optional[str],
+        audit_details: dict,
+    ) -> tuple[dict, dict]:
+        with self._transaction():
+            applied = {
+                row["id"]: row
+                for row in self._update_open(request_ids, status, decided_by, reason)
+            }
+            self._insert_audit([
+                {
+                    "request_id": request_id,
+                    "action": status,
+                    "performed_by": decided_by,
+                    "performed_by_role": "admin",
+                    "details": audit_details,
+                }
+                for request_id in request_ids
+                if request_id in applied
+            ])
+        remaining = [i for i in request_ids if i not in applied]
+        current_status: dict = {}
+        if remaining:
+            current_status = {
+                row["id"]: row["status"]
+                for row in self._all(
+                    f"SELECT id, status FROM requests WHERE id IN ({_marks(remaining)})",
+                    remaining,
+                )
+            }
+        return applied, current_status
+
+    async def scan_requests(
+        self, columns: str, after_id: Optional[str], limit: int
+    ) -> list[dict]:
+        where, params = ([], []) if after_id is None else (["id > ?"], [after_id])
+        return self._all(
+            f"SELECT {_select_list('requests', columns)} FROM requests "
+            f"{_where(where)} ORDER BY id LIMIT ?",
+            params + [limit],
+        )
+
+    async def update_risk(self, rows: list[dict]) -> None:
+        with self._transaction():
+            self._db.executemany(
+                "UPDATE requests SET risk_level = ?, risk_score = ?, risk_factors = ? "
+                "WHERE id = ?",
+                [
+                    (r["risk_level"], r["risk_score"], json.dumps(r["risk_factors"]), r["id"])
+                    for r in rows
+                ],
+            )
+
+    # ── Audit logs ────────────────────────────────────────────────────────────
+
+    async def insert_audit_logs(self, rows: list[dict]) -> None:
+        with self._transaction():
+            self._insert_audit(rows)
+
+    async def list_audit_logs(
+        self,
+        filters: AuditLogFilters,
+        page: PageParams,
+        *,
+        columns: str = "*",
+        requester_id: Optional[str] = None,
+    ) -> list[dict]:
+        where, params = _audit_filters(filters)
+        if requester_id is not None:
+            where.append("requester_id = ?")
+            params.append(requester_id)
+        return self._listing("audit_logs", columns, where, params, page)
+
+    # ── Stats ─────────────────────────────────────────────────────────────────
+
+    async def request_stats(self, requester_id: Optional[str], days: int) -> dict:
+        if requester_id is not None:
+            table, where, params = "request_stats_by_user", "WHERE requester_id = ?", [requester_id]
+        else:
+            table, where, params = "request_stats_totals", "", []
+        counts = self._db.execute(
+            f"SELECT status, risk_level, request_type, count FROM {table} {where}", params
+        ).fetchall()
+        stats: dict = {"total": 0, "by_status": {}, "by_risk_level": {}, "by_request_type": {}}
+        for row in counts:
+            stats["total"] += row["count"]
+            for name in ("status", "risk_level", "request_type"):
+                bucket = stats[f"by_{name}"]
+                bucket[row[name]] = bucket.get(row[name], 0) + row["count"]
+        for name in ("status", "risk_level", "request_type"):
+            stats[f"by_{name}"] = {k: n for k, n in stats[f"by_{name}"].items() if n > 0}
+
+        stats["daily"] = []
+        if requester_id is None:
+            stats["daily"] = [
+                {"day": row["day"], "count": row["n"]}
+                for row in self._db.execute(
+                    "SELECT day, SUM(count) AS n FROM request_stats_daily "
+                    "WHERE day > date('now', ?) GROUP BY day HAVING n > 0 ORDER BY day",
+                    (f"-{days} days",),
+                )
+            ]
+        return stats
+
+    # ── Change versions ───────────────────────────────────────────────────────
+
+    async def change_version(self, scope: str) -> Optional[int]:
+        row = self._db.execute(
+            "SELECT version FROM change_versions WHERE scope = ?", (scope,)
+        ).fetchone()
+        return row[0] if row is not None else 0
+
+    async def close(self) -> None:
+        self._db.close()
+
+    # ── Helpers ───────────────────────────────────────────────────────────────
+
+    def _transaction(self):
+        # sqlite3 in autocommit mode: the connection context manager commits
+        # or rolls back the explicit BEGIN below
+        self._db.execute("BEGIN IMMEDIATE")
+        return self._db
+
+    def _one(self, sql: str, params) -> Optional[dict]:
+        row = self._db.execute(sql, params).fetchone()
+        return _decode(row) if row is not None else None
+
+    def _all(self, sql: str, params) -> list[dict]:
+        return [_decode(row) for row in self._db.execute(sql, params).fetchall()]
+
+    def _insert(self, table: str, rows: list[dict], on_conflict: str = "") -> None:
+        if not rows:
+            return
+        names = _checked_columns(table, rows[0])
+        self._db.executemany(
+            f"INSERT INTO {table} ({', '.join(names)}) VALUES ({_marks(names)}) {on_conflict}",
+            [[_encode(n, row.get(n)) for n in names] for row in rows],
+        )
+
+    def _insert_audit(self, rows: list[dict]) -> None:
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "performed_by_role": "user",
+                "created_at": utc_now(),
+                **row,
+            }
+            for row in rows
+        ]
+        self._insert("audit_logs", rows, on_conflict="ON CONFLICT (id) DO NOTHING")
+
+    def _update_open(self, request_ids, status, decided_by, reason) -> list[dict]:
+        return self._all(
+            "UPDATE requests SET status = ?, decided_by = ?, decision_reason = ?, "
+            f"updated_at = ? WHERE id IN ({_marks(request_ids)}) "
+            f"AND status IN ({_marks(OPEN_STATUSES)}) RETURNING *",
+            [status, decided_by, reason, utc_now(), *request_ids, *OPEN_STATUSES],
+        )
+
+    def _listing(self, table, columns, where, params, page: PageParams) -> list[dict]:
+        sql = f"SELECT {_select_list(table, columns)} FROM {table}"
+        if page.paged:
+            if page.after is not None:
+                created_at, row_id = page.after
+                where.append("created_at <= ? AND (created_at < ? OR (created_at = ? AND id < ?))")
+                params += [created_at, created_at, created_at, row_id]
+            sql += f" {_where(where)} ORDER BY created_at DESC, id DESC LIMIT ?"
+            params.append(page.size + 1)
+        else:
+            sql += f" {_where(where)} ORDER BY created_at DESC"
+        return self._all(sql, params)
+
+
+def _request_filters(filters: RequestFilters) -> tuple[list, list]:
+    where, params = [], []
+    for column in ("status", "risk_level", "request_type"):
+        values = getattr(filters, column)
+        if values:
+            where.append(f"{column} IN ({_marks(values)})")
+            params += values
+    _date_range(filters, where, params)
+    return where, params
+
+
+def _audit_filters(filters: AuditLogFilters) -> tuple[list, list]:
+    where, params = [], []
+    if filters.action:
+        where.append(f"action IN ({_marks(filters.action)})")
+        params += filters.action
+    if filters.request_id:
+        where.append("request_id = ?")
+        params.append(filters.request_id)
+    _date_range(filters, where, params)
+    return where, params
+
+
+def _date_range(filters, where: list, params: list) -> None:
+    if filters.created_from is not None:
+        where.append("created_at >= ?")
+        params.append(_as_utc(filters.created_from))
+    if filters.created_to is not None:
+        where.append("created_at < ?")
+        params.append(_as_utc(filters.created_to))
+
+
+def _as_utc(value: datetime) -> str:
+    # Stored timestamps are UTC isoformat strings, so they compare as text
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _select_list(table: str, columns: str) -> str:
+    if columns == "*":
+        return "*"
+    names = [c.strip() for c in columns.split(",")]
+    unknown = set(names) - set(_COLUMNS[table])
+    if unknown:
+        raise ValueError(f"unknown {table} columns: {sorted(unknown)}")
+    return ", ".join(names)
+
+
+def _checked_columns(table: str, row: dict) -> list[str]:
+    names = list(row)
+    unknown = set(names) - set(_COLUMNS[table])
+    if unknown:
+        raise ValueError(f"unknown {table} columns: {sorted(unknown)}")
+    return names
+
+
+def _where(clauses: list[str]) -> str:
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def _marks(values) -> str:
+    return ", ".join("?" * len(values))
+
+
+def _encode(column: str, value):
+    if column in _JSON_COLUMNS and value is not None:
+        return json.dumps(value)
+    return value
+
+
+def _decode(row: sqlite3.Row) -> dict:
+    data = dict(row)
+    for column in _JSON_COLUMNS.intersection(data):
+        if data[column] is not None:
+            data[column] = json.loads(data[column])
+    return data
@@ -0,0 +1,421 @@
+"""Repository backed by Supabase (PostgREST) using the service-role client."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from postgrest import APIError
+from postgrest.types import ReturnMethod
+
+from app.audit import audit_sink
+from app.config import settings
+from app.database import close_supabase_clients, get_supabase_admin
+from app.pagination import AuditLogFilters, PageParams, RequestFilters, SearchParams
+from app.repositories.base import (
+    OPEN_STATUSES,
+    Repository,
+    summarize_stats,
+    utc_now,
+)
+
+# PostgREST error code for "function not found in the schema cache"
+_FUNCTION_NOT_FOUND = "PGRST202"
+# Ids per id=in.(...) filter when bulk decisions fall back to plain queries;
+# 100 UUIDs keep the query string under 4 KB
+_IN_CHUNK = 100
+# Per-row updates in flight when update_risk falls back to plain queries
+_UPDATE_CONCURRENCY = 20
+# Postgres undefined_column, e.g. audit_logs.requester_id before migration 005
+_UNDEFINED_COLUMN = "42703"
+# Table missing, e.g. change_versions before migration 008 (Postgres
+# undefined_table, or PostgREST's "not in the schema cache")
+_UNDEFINED_TABLE = ("42P01", "PGRST205")
+
+_RISK_COLUMNS = ("risk_level", "risk_score", "risk_factors")
+
+
+class SupabaseRepository(Repository):
+    def __init__(self):
+        # Database functions and columns from database/migrations/ are used
+        # when installed; each is probed once per worker, then the multi-call
+        # fallback is used if it is missing. Fallbacks can't write audit rows
+        # in the same transaction as the request, so they queue them on
+        # audit_sink, which retries and spills rather than losing them.
+        self._rpc_available = {
+            "create_request_with_audit": True,
+            "create_requests_with_audit": True,
+            "decide_request": True,
+            "decide_requests": True,
+            "request_stats_summary": True,
+            "search_requests": True,
+            "update_request_risk": True,
+        }
+        self._audit_requester_column = True
+        self._change_versions = True
+
+    @property
+    def _client(self):
+        return get_supabase_admin()
+
+    # ── Profiles ──────────────────────────────────────────────────────────────
+
+    async def get_profile(self, user_id: str) -> Optional[dict]:
+        resp = await (
+            self._client.table("profiles").select("*").eq("id", user_id).limit(1).execute()
+        )
+        return resp.data[0] if resp.data else None
+
+    async def upsert_profile(self, profile: dict) -> None:
+        await self._client.table("profiles").upsert(profile).execute()
+
+    # ── Requests ──────────────────────────────────────────────────────────────
+
+    async def create_request(self, request: dict, audit_entries: list[dict]) -> dict:
+        created = await self._rpc(
+            "create_request_with_audit",
+            {"p_request": request, "p_audit_logs": audit_entries},
+        )
+        if created is not None:
+            return created
+
+        resp = await self._client.table("requests").insert(request).execute()
+        await audit_sink.submit_many(audit_entries)
+        return resp.data[0]
+
+    async def create_requests(self, requests: list[dict], audit_entries: list[dict]) -> None:
+        created = await self._rpc(
+            "create_requests_with_audit",
+            {"p_requests": requests, "p_audit_logs": audit_entries},
+        )
+        if created is not None:
+            return
+
+        await (
+            self._client.table("requests")
+            .insert(requests, returning=ReturnMethod.minimal)
+            .execute()
+        )
+        await audit_sink.submit_many(audit_entries)
+
+    async def get_request(self, request_id: str) -> Optional[dict]:
+        resp = await (
+            self._client.table("requests").select("*").eq("id", request_id).limit(1).execute()
+        )
+        return resp.data[0] if resp.data else None
+
+    async def list_requests(
+        self,
+        filters: RequestFilters,
+        page: PageParams,
+        *,
+        columns: str = "*",
+        requester_id: Optional[str] = None,
+    ) -> list[dict]:
+        query = self._client.table("requests").select(columns)
+        if requester_id is not None:
+            query = query.eq("requester_id", requester_id)
+        return await _run_listing(filters.apply(query), page)
+
+    async def search_requests(
+        self,
+        search: SearchParams,
+        filters: RequestFilters,
+        *,
+        summary: bool = False,
+        requester_id: Optional[str] = None,
+    ) -> list[dict]:
+        after_rank, after_created_at, after_id = search.after or (None, None, None)
+        rows = await self._rpc(
+            "search_requests",
+            {
+                "p_query": search.q,
+                "p_requester_id": requester_id,
+                "p_status": filters.status,
+                "p_risk_level": filters.risk_level,
+                "p_request_type": filters.request_type,
+                "p_created_from": _isoformat(filters.created_from),
+                "p_created_to": _isoformat(filters.created_to),
+                "p_after_rank": after_rank,
+                "p_after_created_at": after_created_at,
+                "p_after_id": after_id,
+                "p_limit": search.size + 1,
+                "p_window": settings.SEARCH_WINDOW,
+                "p_summary": summary,
+            },
+        )
+        # No fallback: without the index, searching means reading every row
+        if rows is None:
+            raise RuntimeError(
+                "Search needs database/migrations/007_request_search.sql"
+            )
+        return rows
+
+    async def decide_request(
+        self,
+        request_id: str,
+        status: str,
+        decided_by: str,
+        reason: Optional[str],
+        audit_details: dict,
+    ) -> dict:
+        result = await self._rpc(
+            "decide_request",
+            {
+                "p_request_id": request_id,
+                "p_status": status,
+                "p_decided_by": decided_by,
+                "p_reason": reason,
+                "p_audit_details": audit_details,
+            },
+        )
+        if result is not None:
+            return result
+
+        resp = await (
+            self._client.table("requests")
+            .update(_decision(status, decided_by, reason))
+            .eq("id", request_id)
+            .in_("status", OPEN_STATUSES)
+            .execute()
+        )
+        if not resp.data:
+            # Only the failure path needs a second look to pick 404 vs 409
+            resp = await (
+                self._client.table("requests").select("status").eq("id", request_id).execute()
+            )
+            if not resp.data:
+                return {"outcome": "not_found"}
+            return {"outcome": "wrong_state", "status": resp.data[0]["status"]}
+
+        await audit_sink.submit_many([{
+            "id": str(uuid.uuid4()),
+            "request_id": request_id,
+            "action": status,
+            "performed_by": decided_by,
+            "performed_by_role": "admin",
+            "details": audit_details,
+            "created_at": utc_now(),
+        }])
+        return {"outcome": "applied", "request": resp.data[0]}
+
+    async def decide_requests(
+        self,
+        request_ids: list[str],
+        status: str,
+        decided_by: str,
+        reason: Optional[str],
+        audit_details: dict,
+    ) -> tuple[dict, dict]:
+        result = await self._rpc(
+            "decide_requests",
+            {
+                "p_request_ids": request_ids,
+                "p_status": status,
+                "p_decided_by": decided_by,
+                "p_reason": reason,
+                "p_audit_details": audit_details,
+            },
+        )
+        if result is not None:
+            return {row["id"]: row for row in result["applied"]}, result["current"]
+
+        # The status filter makes the transition atomic per row: rows already
+        # decided (or decided concurrently) are simply not returned.
+        applied: dict = {}
+        for chunk in _chunks(request_ids, _IN_CHUNK):
+            resp = await (
+                self._client.table("requests")
+                .update(_decision(status, decided_by, reason))
+                .in_("id", chunk)
+                .in_("status", OPEN_STATUSES)
+                .execute()
+            )
+            applied.update((row["id"], row) for row in (resp.data or []))
+        await audit_sink.submit_many([
+            {
+                "id": str(uuid.uuid4()),
+                "request_id": request_id,
+                "action": status,
+                "performed_by": decided_by,
+                "performed_by_role": "admin",
+                "details": audit_details,
+                "created_at": utc_now(),
+            }
+            for request_id in request_ids
+            if request_id in applied
+        ])
+
+        remaining = [i for i in request_ids if i not in applied]
+        current_status: dict = {}
+        for chunk in _chunks(remaining, _IN_CHUNK):
+            resp = await (
+                self._client.table("requests")
+                .select("id,status")
+                .in_("id", chunk)
+                .execute()
+            )
+            current_status.update((row["id"], row["status"]) for row in (resp.data or []))
+        return applied, current_status
+
+    async def scan_requests(
+        self, columns: str, after_id: Optional[str], limit: int
+    ) -> list[dict]:
+        query = self._client.table("requests").select(columns).order("id").limit(limit)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        resp = await query.execute()
+        return resp.data or []
+
+    async def update_risk(self, rows: list[dict]) -> None:
+        # Updates only, never an upsert: a request deleted since the scan
+        # must not come back, nor edits made since be overwritten
+        payload = [
+            {"id": row["id"], **{name: row[name] for name in _RISK_COLUMNS}}
+            for row in rows
+        ]
+        if await self._rpc("update_request_risk", {"p_rows": payload}) is not None:
+            return
+
+        for chunk in _chunks(rows, _UPDATE_CONCURRENCY):
+            await asyncio.gather(*(
+                self._client.table("requests")
+                .update(
+                    {name: row[name] for name in _RISK_COLUMNS},
+                    returning=ReturnMethod.minimal,
+                )
+                .eq("id", row["id"])
+                .execute()
+                for row in chunk
+            ))
+
+    # ── Audit logs ────────────────────────────────────────────────────────────
+
+    async def insert_audit_logs(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        await (
+            self._client.table("audit_logs")
+            .upsert(rows, ignore_duplicates=True, returning=ReturnMethod.minimal)
+            .execute()
+        )
+
+    async def list_audit_logs(
+        self,
+        filters: AuditLogFilters,
+        page: PageParams,
+        *,
+        columns: str = "*",
+        requester_id: Optional[str] = None,
+    ) -> list[dict]:
+        query = self._client.table("audit_logs").select(columns)
+        if requester_id is None:
+            return await _run_listing(filters.apply(query), page)
+
+        if self._audit_requester_column:
+            try:
+                return await _run_listing(
+                    filters.apply(query.eq("requester_id", requester_id)), page
+                )
+            except APIError as exc:
+                if exc.code != _UNDEFINED_COLUMN:
+                    raise
+                self._audit_requester_column = False
+
+        # Before migration 005: logs for the ids of requests this user owns
+        requests_resp = await (
+            self._client.table("requests")
+            .select("id")
+            .eq("requester_id", requester_id)
+            .execute()
+        )
+        request_ids = [r["id"] for r in (requests_resp.data or [])]
+        if not request_ids:
+            return []
+        query = self._client.table("audit_logs").select(columns).in_("request_id", request_ids)
+        return await _run_listing(filters.apply(query), page)
+
+    # ── Stats ─────────────────────────────────────────────────────────────────
+
+    async def request_stats(self, requester_id: Optional[str], days: int) -> dict:
+        stats = await self._rpc(
+            "request_stats_summary",
+            {"p_requester_id": requester_id, "p_days": days},
+        )
+        if stats is not None:
+            return stats
+
+        # Without migration 004 the counts have to come from the rows
+        columns = "status,risk_level,request_type"
+        query = self._client.table("requests")
+        if requester_id is not None:
+            resp = await query.select(columns).eq("requester_id", requester_id).execute()
+            return summarize_stats(resp.data or [], None)
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).date()
+        resp = await query.select(f"{columns},created_at").execute()
+        return summarize_stats(resp.data or [], since)
+
+    # ── Change versions ───────────────────────────────────────────────────────
+
+    async def change_version(self, scope: str) -> Optional[int]:
+        if not self._change_versions:
+            return None
+        try:
+            resp = await (
+                self._client.table("change_versions")
+                .select("version")
+                .eq("scope", scope)
+                .limit(1)
+                .execute()
+            )
+        except APIError as exc:
+            if exc.code not in _UNDEFINED_TABLE:
+                raise
+            self._change_versions = False
+            return None
+        return resp.data[0]["version"] if resp.data else 0
+
+    async def close(self) -> None:
+        await close_supabase_clients()
+
+    # ── Helpers ───────────────────────────────────────────────────────────────
+
+    async def _rpc(self, name: str, params: dict):
+        """Call a database function; None if it isn't installed."""
+        if not self._rpc_available[name]:
+            return None
+        try:
+            resp = await self._client.rpc(name, params).execute()
+        except APIError as exc:
+            if exc.code != _FUNCTION_NOT_FOUND:
+                raise
+            self._rpc_available[name] = False
+            return None
+        return resp.data
+
+
+def _decision(status: str, decided_by: str, reason: Optional[str]) -> dict:
+    return {
+        "status": status,
+        "decided_by": decided_by,
+        "decision_reason": reason,
+        "updated_at": utc_now(),
+    }
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+async def _run_listing(query, page: PageParams) -> list[dict]:
+    if page.paged:
+        query = page.apply(query)
+    else:
+        query = query.order("created_at", desc=True)
+    resp = await query.execute()
+    return resp.data or []
@@ -3,10 +3,29 @@ Rule-based risk classification engine.
 
 Analyzes request title + description for risk keywords and returns a
 RiskAnalysis result used to drive the approval workflow.
+
+Rules live in an immutable, versioned RuleSet. The built-in rules below are
+used unless RISK_RULES_PATH points at a JSON rules file (see
+risk_rules.example.json); that file is re-read when it changes and swapped
+in atomically, so in-flight classifications finish on the rules they
+started with.
 """
 
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from app.config import settings
 from app.models import RiskAnalysis, RiskLevel
 
+logger = logging.getLogger(__name__)
+
 HIGH_RISK_KEYWORDS = [
     "urgent", "emergency", "override", "bypass", "admin", "root",
     "privilege", "escalate", "unrestricted", "sensitive", "confidential",
@@ -19,33 +38,203 @@ MEDIUM_RISK_KEYWORDS = [
     "overnight", "weekend", "special", "exception",
 ]
 
+HIGH_RISK_WEIGHT = 20
+MEDIUM_RISK_WEIGHT = 10
+HIGH_THRESHOLD = 60
+MEDIUM_THRESHOLD = 20
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class KeywordMatcher:
+    """
+    Finds whole-word keyword occurrences in one pass over the text.
+
+    Single-word keywords are matched by intersecting the text's tokens with a
+    hash set, so cost depends on text length rather than keyword count.
+    Phrase keywords ("all users", "system-wide") are few; each is checked
+    with a substring test before its word-boundary regex is run.
+    """
+
+    def __init__(self, keywords: list[str]):
+        words = {kw for kw in keywords if _WORD_RE.fullmatch(kw)}
+        self._words = frozenset(words)
+        self._phrases = [
+            (phrase, re.compile(rf"\b{re.escape(phrase)}\b"))
+            for phrase in sorted(set(keywords) - words)
+        ]
+
+    def findall(self, text: str) -> set[str]:
+        found = set(_WORD_RE.findall(text))
+        found.intersection_update(self._words)
+        for phrase, pattern in self._phrases:
+            if phrase in text and pattern.search(text):
+                found.add(phrase)
+        return found
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """A compiled, read-only set of risk rules identified by ``version``."""
+
+    version: str
+    weights: Mapping[str, int]
+    high_keywords: frozenset
+    # request_type -> (high threshold, medium threshold); "default" is required
+    thresholds: Mapping[str, tuple]
+    matcher: KeywordMatcher
+    rank: Mapping[str, int]
+
+    @classmethod
+    def build(
+        cls,
+        version: str,
+        high: Mapping[str, int],
+        medium: Mapping[str, int],
+        thresholds: Mapping[str, tuple],
+    ) -> "RuleSet":
+        if "default" not in thresholds:
+            raise ValueError("thresholds must define a 'default' entry")
+        for name, (high_thr, medium_thr) in thresholds.items():
+            # A medium threshold of 0 would make every request at least MEDIUM
+            if not 1 <= medium_thr <= high_thr <= 100:
+                raise ValueError(f"invalid thresholds for {name!r}")
+        # Matching is case-insensitive, so keywords are compared lowercased
+        high = _lowercased(high, "high")
+        medium = _lowercased(medium, "medium")
+        overlap = high.keys() & medium.keys()
+        if overlap:
+            raise ValueError(f"keywords listed as both high and medium: {sorted(overlap)}")
+
+        keywords = list(high) + list(medium)
+        return cls(
+            version=str(version),
+            weights=MappingProxyType({**high, **medium}),
+            high_keywords=frozenset(high),
+            thresholds=MappingProxyType(
+                {name: (int(h), int(m)) for name, (h, m) in thresholds.items()}
+            ),
+            matcher=KeywordMatcher(keywords),
+            rank=MappingProxyType({kw: i for i, kw in enumerate(keywords)}),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RuleSet":
+        keywords = data.get("keywords", {})
+        return cls.build(
+            version=data["version"],
+            high=keywords.get("high", {}),
+            medium=keywords.get("medium", {}),
+            thresholds={
+                name: (t["high"], t["medium"])
+                for name, t in data.get("thresholds", {}).items()
+            },
+        )
+
+    def thresholds_for(self, request_type: Optional[str]) -> tuple:
+        return self.thresholds.get(request_type or "default", self.thresholds["default"])
+
 
-def classify_risk(title: str, description: str) -> RiskAnalysis:
+def _lowercased(keywords: Mapping[str, int], tier: str) -> dict:
+    lowered: dict = {}
+    for kw, weight in keywords.items():
+        key = kw.lower()
+        if key in lowered:
+            raise ValueError(f"{tier} keyword listed twice (ignoring case): {key!r}")
+        lowered[key] = int(weight)
+    return lowered
+
+
+BUILTIN_RULESET = RuleSet.build(
+    version="builtin",
+    high={kw: HIGH_RISK_WEIGHT for kw in HIGH_RISK_KEYWORDS},
+    medium={kw: MEDIUM_RISK_WEIGHT for kw in MEDIUM_RISK_KEYWORDS},
+    thresholds={"default": (HIGH_THRESHOLD, MEDIUM_THRESHOLD)},
+)
+
+_active_ruleset: RuleSet = BUILTIN_RULESET
+_rules_mtime: Optional[float] = None
+_next_reload_check = 0.0
+_reload_lock = threading.Lock()
+
+
+def load_ruleset(path: str) -> RuleSet:
+    with open(path, encoding="utf-8") as fh:
+        return RuleSet.from_dict(json.load(fh))
+
+
+def reload_rules() -> RuleSet:
+    """
+    Load RISK_RULES_PATH and make it the active ruleset.
+
+    Raises on an unreadable or invalid file, leaving the current rules active.
+    """
+    global _active_ruleset, _rules_mtime
+    with _reload_lock:
+        if not settings.RISK_RULES_PATH:
+            _active_ruleset, _rules_mtime = BUILTIN_RULESET, None
+            return _active_ruleset
+        mtime = os.stat(settings.RISK_RULES_PATH).st_mtime
+        ruleset = load_ruleset(settings.RISK_RULES_PATH)
+        # Single reference assignment: readers see either the old or new set
+        _active_ruleset, _rules_mtime = ruleset, mtime
+        logger.info("Loaded risk ruleset %s", ruleset.version)
+        return ruleset
+
+
+def get_ruleset() -> RuleSet:
+    """Return the active ruleset, picking up rules-file changes periodically."""
+    global _next_reload_check
+    if settings.RISK_RULES_PATH and settings.RISK_RULES_RELOAD_SECONDS >= 0:
+        now = time.monotonic()
+        if now >= _next_reload_check:
+            _next_reload_check = now + settings.RISK_RULES_RELOAD_SECONDS
+            try:
+                if os.stat(settings.RISK_RULES_PATH).st_mtime != _rules_mtime:
+                    reload_rules()
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                logger.warning("Keeping risk ruleset %s: %s", _active_ruleset.version, exc)
+    return _active_ruleset
+
+
+def classify_risk(
+    title: str,
+    description: str,
+    request_type: Optional[str] = None,
+    ruleset: Optional[RuleSet] = None,
+) -> RiskAnalysis:
     """
     Classify a request by scanning title and description for risk keywords.
 
-    Scoring:
+    Keywords match whole words only ("admin" does not hit "administration").
+
+    Scoring (built-in rules):
       - Each HIGH keyword match adds 20 points (capped at 100).
       - Each MEDIUM keyword match adds 10 points.
-    Final level: HIGH >= 60, MEDIUM >= 20, else LOW.
+    Final level: HIGH >= 60, MEDIUM >= 20, else LOW. A rules file can change
+    the per-keyword weights and set thresholds per request type.
     """
+    rules = ruleset or get_ruleset()
     combined = f"{title} {description}".lower()
 
-    matched_high = [kw for kw in HIGH_RISK_KEYWORDS if kw in combined]
-    matched_medium = [kw for kw in MEDIUM_RISK_KEYWORDS if kw in combined]
+    found = sorted(rules.matcher.findall(combined), key=rules.rank.__getitem__)
+    matched_high = [kw for kw in found if kw in rules.high_keywords]
+    matched_medium = [kw for kw in found if kw not in rules.high_keywords]
 
-    score = min(len(matched_high) * 20 + len(matched_medium) * 10, 100)
+    score = min(sum(rules.weights[kw] for kw in found), 100)
     risk_factors = matched_high + matched_medium
+    high_threshold, medium_threshold = rules.thresholds_for(request_type)
 
-    if score >= 60 or matched_high:
+    if score >= high_threshold or matched_high:
         level = RiskLevel.HIGH
         # Ensure score reflects high risk even on a single keyword match
-        if score < 60:
-            score = 60
-    elif score >= 20 or matched_medium:
+        if score < high_threshold:
+            score = high_threshold
+    elif score >= medium_threshold or matched_medium:
         level = RiskLevel.MEDIUM
-        if score < 20:
-            score = 20
+        if score < medium_threshold:
+            score = medium_threshold
     else:
         level = RiskLevel.LOW
 
@@ -53,4 +242,28 @@ def classify_risk(title: str, description: str) -> RiskAnalysis:
         risk_level=level,
         risk_score=score,
         risk_factors=risk_factors,
+        ruleset_version=rules.version,
     )
+
+
+def classify_many(
+    items: list[tuple[str, str, Optional[str]]],
+    ruleset: Optional[RuleSet] = None,
+) -> list[RiskAnalysis]:
+    """
+    Classify ``(title, description, request_type)`` items in one pass.
+
+    The whole batch uses one ruleset, even if the rules file changes
+    midway. Identical items (e.g. many checkouts of the same equipment) are
+    scored once, and they share the resulting RiskAnalysis, so treat it as
+    read-only.
+    """
+    rules = ruleset or get_ruleset()
+    seen: dict[tuple, RiskAnalysis] = {}
+    results = []
+    for item in items:
+        risk = seen.get(item)
+        if risk is None:
+            risk = seen[item] = classify_risk(*item, ruleset=rules)
+        results.append(risk)
+    return results
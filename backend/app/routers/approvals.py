@@ -1,79 +1,159 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from app.database import get_supabase_admin
+from typing import Union
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from app.models import (
     RequestResponse,
+    RequestPage,
     ApprovalAction,
     RejectionAction,
     UserProfile,
-    AuditAction,
     RequestStatus,
+    BulkDecisionAction,
+    BulkDecisionOutcome,
+    BulkDecisionResponse,
+    BulkDecisionResult,
+)
+from app.audit import audit_sink
+from app.etags import list_etag, not_modified, requests_scope, with_etag
+from app.auth import get_admin_user, profile_cache
+from app.events import event_broker, publish_request
+from app.idempotency import idempotency_store
+from app.precedents import precedent_index
+from app.risk_engine import get_ruleset, reload_rules
+from app.throttling import throttle_stats
+from app.pagination import (
+    ListView,
+    PageParams,
+    RequestFilters,
+    SearchParams,
+    page_params,
+    request_filters,
+    search_params,
+)
+from app.repositories import OPEN_STATUSES, get_repository
+from app.routers.requests import (
+    _list_response,
+    _select_columns,
+    _serialize,
 )
-from app.auth import get_admin_user
-from app.routers.requests import _serialize, _write_audit_log, _now
-import uuid
 
 router = APIRouter()
 
 
-@router.get("/requests", response_model=list[RequestResponse])
+@router.get("/requests", response_model=Union[list[RequestResponse], RequestPage])
 async def list_pending_requests(
+    request: Request,
+    filters: RequestFilters = Depends(request_filters),
+    page: PageParams = Depends(page_params),
+    view: ListView = "full",
     current_admin: UserProfile = Depends(get_admin_user),
 ):
-    """Return all requests that are PENDING or ESCALATED (admin only)."""
-    admin_client = get_supabase_admin()
+    """Return requests that are PENDING or ESCALATED (admin only).
+
+    Pagination, filters and ``view`` behave as for ``GET /requests/``; a
+    ``status`` filter can only narrow the queue to one of the open statuses.
+    Conditional GETs work as for ``GET /requests/``.
+    """
+    if filters.status:
+        filters.status = [s for s in filters.status if s in OPEN_STATUSES]
+        if not filters.status:
+            return RequestPage(items=[]) if page.paged else []
+    else:
+        filters.status = OPEN_STATUSES
+
     try:
-        resp = (
-            admin_client.table("requests")
-            .select("*")
-            .in_("status", ["PENDING", "ESCALATED"])
-            .order("created_at", desc=True)
-            .execute()
+        etag = await list_etag(request, requests_scope())
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        rows = await get_repository().list_requests(
+            filters, page, columns=_select_columns(page, view)
         )
-        return [_serialize(r) for r in (resp.data or [])]
+        return with_etag(_list_response(rows, page, view), etag)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
 
-@router.put("/requests/{request_id}/approve", response_model=RequestResponse)
-async def approve_request(
-    request_id: str,
-    payload: ApprovalAction,
+@router.get("/requests/search", response_model=RequestPage)
+async def search_requests(
+    search: SearchParams = Depends(search_params),
+    filters: RequestFilters = Depends(request_filters),
+    view: ListView = "full",
     current_admin: UserProfile = Depends(get_admin_user),
 ):
-    admin_client = get_supabase_admin()
-    row = _fetch_or_404(admin_client, request_id)
+    """Full-text search of all requests, best match first (admin only).
 
-    if row["status"] not in ("PENDING", "ESCALATED"):
-        raise HTTPException(
-            status_code=400, detail="Only PENDING or ESCALATED requests can be approved"
+    Unlike the queue this covers decided requests too; narrow it with the
+    usual filters, e.g. ``status=PENDING``. Always paged.
+    """
+    try:
+        rows = await get_repository().search_requests(
+            search, filters, summary=view == "summary"
         )
+        return _list_response(rows, search, view)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@router.put("/requests/bulk", response_model=BulkDecisionResponse)
+async def bulk_decide_requests(
+    payload: BulkDecisionAction,
+    current_admin: UserProfile = Depends(get_admin_user),
+):
+    """Approve or reject many open requests, with their audit rows, in one transaction."""
+    if payload.action == "approve":
+        new_status = RequestStatus.APPROVED
+        reason = payload.reason or "Approved by admin"
+    else:
+        new_status = RequestStatus.REJECTED
+        reason = payload.reason
 
-    update_data = {
-        "status": RequestStatus.APPROVED.value,
-        "decided_by": current_admin.email,
-        "decision_reason": payload.reason or "Approved by admin",
-        "updated_at": _now(),
-    }
     try:
-        resp = (
-            admin_client.table("requests")
-            .update(update_data)
-            .eq("id", request_id)
-            .execute()
+        applied, current_status = await get_repository().decide_requests(
+            payload.ids,
+            new_status.value,
+            current_admin.email,
+            reason,
+            audit_details={"reason": payload.reason, "bulk": True},
         )
-        updated = resp.data[0]
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
-    _write_audit_log(
-        admin_client,
-        request_id=request_id,
-        action=AuditAction.APPROVED.value,
-        performed_by=current_admin.email,
-        performed_by_role="admin",
+    for row in applied.values():
+        publish_request("request.updated", row)
+        precedent_index.add(row)
+
+    results = []
+    for request_id in payload.ids:
+        if request_id in applied:
+            results.append(BulkDecisionResult(
+                id=request_id, outcome=BulkDecisionOutcome.applied, status=new_status.value
+            ))
+        elif request_id in current_status:
+            results.append(BulkDecisionResult(
+                id=request_id,
+                outcome=BulkDecisionOutcome.wrong_state,
+                status=current_status[request_id],
+            ))
+        else:
+            results.append(BulkDecisionResult(id=request_id, outcome=BulkDecisionOutcome.not_found))
+    return BulkDecisionResponse(applied=len(applied), results=results)
+
+
+@router.put("/requests/{request_id}/approve", response_model=RequestResponse)
+async def approve_request(
+    request_id: str,
+    payload: ApprovalAction,
+    current_admin: UserProfile = Depends(get_admin_user),
+):
+    updated = await _decide(
+        request_id,
+        RequestStatus.APPROVED,
+        current_admin,
+        reason=payload.reason or "Approved by admin",
         details={"reason": payload.reason},
     )
-
     return _serialize(updated)
 
 
@@ -83,58 +163,91 @@ async def reject_request(
     payload: RejectionAction,
     current_admin: UserProfile = Depends(get_admin_user),
 ):
-    admin_client = get_supabase_admin()
-    row = _fetch_or_404(admin_client, request_id)
+    updated = await _decide(
+        request_id,
+        RequestStatus.REJECTED,
+        current_admin,
+        reason=payload.reason,
+        details={"reason": payload.reason},
+    )
+    return _serialize(updated)
 
-    if row["status"] not in ("PENDING", "ESCALATED"):
-        raise HTTPException(
-            status_code=400, detail="Only PENDING or ESCALATED requests can be rejected"
-        )
 
-    update_data = {
-        "status": RequestStatus.REJECTED.value,
-        "decided_by": current_admin.email,
-        "decision_reason": payload.reason,
-        "updated_at": _now(),
+@router.get("/diagnostics")
+async def diagnostics(current_admin: UserProfile = Depends(get_admin_user)):
+    """Return this worker's in-process counters (admin only)."""
+    return {
+        "profile_cache": profile_cache.stats(),
+        "audit_sink": audit_sink.stats(),
+        "events": event_broker.stats(),
+        "idempotency": idempotency_store.stats(),
+        "precedents": precedent_index.stats(),
+        "throttling": throttle_stats(),
     }
-    try:
-        resp = (
-            admin_client.table("requests")
-            .update(update_data)
-            .eq("id", request_id)
-            .execute()
-        )
-        updated = resp.data[0]
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
 
-    _write_audit_log(
-        admin_client,
-        request_id=request_id,
-        action=AuditAction.REJECTED.value,
-        performed_by=current_admin.email,
-        performed_by_role="admin",
-        details={"reason": payload.reason},
-    )
 
-    return _serialize(updated)
+@router.get("/risk-rules")
+async def get_risk_rules(current_admin: UserProfile = Depends(get_admin_user)):
+    """Describe the risk ruleset currently active in this worker."""
+    return _describe_ruleset(get_ruleset())
+
+
+@router.post("/risk-rules/reload")
+async def reload_risk_rules(current_admin: UserProfile = Depends(get_admin_user)):
+    """Re-read RISK_RULES_PATH now instead of waiting for the change check."""
+    try:
+        ruleset = reload_rules()
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(status_code=422, detail=f"Invalid risk rules: {exc}")
+    return _describe_ruleset(ruleset)
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def _fetch_or_404(client, request_id: str) -> dict:
+async def _decide(
+    request_id: str,
+    new_status: RequestStatus,
+    admin: UserProfile,
+    *,
+    reason: str | None,
+    details: dict,
+) -> dict:
+    """
+    Move an open request to APPROVED/REJECTED and audit it.
+
+    The repository does both in one transaction where the backend supports
+    it. Raises 404 for unknown ids and 409 if the request was already decided.
+    """
+    try:
+        UUID(request_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Request not found")
+
     try:
-        resp = (
-            client.table("requests")
-            .select("*")
-            .eq("id", request_id)
-            .single()
-            .execute()
+        result = await get_repository().decide_request(
+            request_id, new_status.value, admin.email, reason, details
         )
-        if not resp.data:
-            raise HTTPException(status_code=404, detail="Request not found")
-        return resp.data
-    except HTTPException:
-        raise
-    except Exception:
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    if result["outcome"] == "not_found":
         raise HTTPException(status_code=404, detail="Request not found")
+    if result["outcome"] == "wrong_state":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Only PENDING or ESCALATED requests can be decided (status is {result['status']})",
+        )
+    publish_request("request.updated", result["request"])
+    precedent_index.add(result["request"])
+    return result["request"]
+
+
+def _describe_ruleset(ruleset) -> dict:
+    return {
+        "version": ruleset.version,
+        "keywords": len(ruleset.weights),
+        "thresholds": {
+            name: {"high": high, "medium": medium}
+            for name, (high, medium) in ruleset.thresholds.items()
+        },
+    }
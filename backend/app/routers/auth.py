@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Request, status, Depends
-from app.database import get_supabase, get_supabase_admin
+from app.database import get_supabase
 from app.models import RegisterRequest, LoginRequest, UserProfile
-from app.auth import get_current_user
+from app.auth import get_current_user, invalidate_cached_profile
+from app.repositories import get_repository
 
 router = APIRouter()
 
@@ -9,10 +10,9 @@ router = APIRouter()
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 async def register(payload: RegisterRequest):
     supabase = get_supabase()
-    admin_client = get_supabase_admin()
 
     try:
-        auth_resp = supabase.auth.sign_up(
+        auth_resp = await supabase.auth.sign_up(
             {"email": payload.email, "password": payload.password}
         )
     except Exception as exc:
@@ -24,16 +24,17 @@ async def register(payload: RegisterRequest):
     user_id = auth_resp.user.id
     # Upsert profile row (created by trigger or manually)
     try:
-        admin_client.table("profiles").upsert(
+        await get_repository().upsert_profile(
             {
                 "id": user_id,
                 "email": payload.email,
                 "full_name": payload.full_name,
                 "role": "user",
             }
-        ).execute()
+        )
     except Exception:
         pass  # Profile may already exist via DB trigger
+    invalidate_cached_profile(user_id)
 
     return {
         "message": "Registration successful. Please check your email to confirm.",
@@ -45,7 +46,7 @@ async def register(payload: RegisterRequest):
 async def login(payload: LoginRequest):
     supabase = get_supabase()
     try:
-        auth_resp = supabase.auth.sign_in_with_password(
+        auth_resp = await supabase.auth.sign_in_with_password(
             {"email": payload.email, "password": payload.password}
         )
     except Exception as exc:
@@ -55,16 +56,8 @@ async def login(payload: LoginRequest):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     session = auth_resp.session
-    admin_client = get_supabase_admin()
     try:
-        profile_resp = (
-            admin_client.table("profiles")
-            .select("*")
-            .eq("id", auth_resp.user.id)
-            .single()
-            .execute()
-        )
-        profile = profile_resp.data or {}
+        profile = await get_repository().get_profile(auth_resp.user.id) or {}
     except Exception:
         profile = {}
 
@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.auth import get_stream_user
+from app.events import event_broker
+from app.models import UserProfile
+
+router = APIRouter()
+
+
+@router.get("/stream")
+async def stream_events(
+    current_user: UserProfile = Depends(get_stream_user),
+    last_event_id: Optional[str] = Header(None),
+    since: Optional[str] = Query(None, description="Last event id, for clients that reconnect by hand"),
+):
+    """
+    Server-Sent Events feed of request changes.
+
+    Emits ``request.created`` and ``request.updated`` with the changed
+    request's fields (no description): every request for admins, own
+    requests otherwise. ``resync`` means events were missed and the client
+    should reload its lists. Missed events are replayed from the
+    ``Last-Event-ID`` header or ``since``.
+    """
+    if event_broker.full:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many event streams",
+            headers={"Retry-After": "30"},
+        )
+    return StreamingResponse(
+        event_broker.stream(
+            current_user.id, current_user.role == "admin", last_event_id or since
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,52 +1,194 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.database import get_supabase_admin
-from app.models import AuditLogResponse, UserProfile
-from app.auth import get_current_user
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Literal, Optional, Union
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.models import AuditLogPage, AuditLogResponse, UserProfile
+from app.auth import get_admin_user
+from app.etags import audit_logs_scope, list_etag, not_modified, with_etag
+from app.pagination import (
+    AuditLogFilters,
+    ListView,
+    PageParams,
+    audit_log_filters,
+    page_params,
+)
+from app.repositories import get_repository
+from app.serialization import ListEncoder
+from app.throttling import rate_limit
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_SUMMARY_COLUMNS = ",".join(
+    name for name in AuditLogResponse.model_fields if name != "details"
+)
+# Lists are returned pre-encoded, skipping FastAPI's response_model pass
+_ENCODER = ListEncoder(AuditLogResponse, free_form=("details",))
+
+
+@router.get("/", response_model=Union[list[AuditLogResponse], AuditLogPage])
+async def get_logs(
+    request: Request,
+    filters: AuditLogFilters = Depends(audit_log_filters),
+    page: PageParams = Depends(page_params),
+    view: ListView = "full",
+    current_user: UserProfile = Depends(rate_limit("logs")),
+):
+    """
+    Audit logs, newest first: all for admins, own requests' logs otherwise.
 
-@router.get("/", response_model=list[AuditLogResponse])
-async def get_logs(current_user: UserProfile = Depends(get_current_user)):
-    admin_client = get_supabase_admin()
+    Without ``limit``/``cursor`` the full list is returned as before; with
+    either, a capped page plus ``next_cursor`` is returned, and
+    ``view=summary`` leaves out ``details``. Answers 304 to an
+    ``If-None-Match`` holding the current ETag (see ``app.etags``).
+    """
+    columns = _SUMMARY_COLUMNS if page.paged and view == "summary" else "*"
+    # Non-admins only see logs for requests they own
+    requester_id = None if current_user.role == "admin" else current_user.id
     try:
-        if current_user.role == "admin":
-            resp = (
-                admin_client.table("audit_logs")
-                .select("*")
-                .order("created_at", desc=True)
-                .execute()
-            )
+        etag = await list_etag(request, audit_logs_scope(requester_id))
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        rows = await get_repository().list_audit_logs(
+            filters, page, columns=columns, requester_id=requester_id
+        )
+        if not page.paged:
+            response = _ENCODER.list_response([_serialize_log(row) for row in rows])
         else:
-            # Only logs for requests owned by this user
-            requests_resp = (
-                admin_client.table("requests")
-                .select("id")
-                .eq("requester_id", current_user.id)
-                .execute()
-            )
-            request_ids = [r["id"] for r in (requests_resp.data or [])]
-            if not request_ids:
-                return []
-            resp = (
-                admin_client.table("audit_logs")
-                .select("*")
-                .in_("request_id", request_ids)
-                .order("created_at", desc=True)
-                .execute()
+            rows, next_cursor = page.split(rows)
+            response = _ENCODER.page_response(
+                [_serialize_log(row) for row in rows], next_cursor
             )
+        return with_etag(response, etag)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
 
-        return [
-            AuditLogResponse(
-                id=row["id"],
-                request_id=row["request_id"],
-                action=row["action"],
-                performed_by=row["performed_by"],
-                performed_by_role=row["performed_by_role"],
-                details=row.get("details"),
-                created_at=row.get("created_at"),
-            )
-            for row in (resp.data or [])
-        ]
+
+@router.get("/export")
+async def export_logs(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    created_from: Optional[datetime] = Query(None, alias="from"),
+    created_to: Optional[datetime] = Query(None, alias="to"),
+    action: Optional[List[str]] = Query(None),
+    request_id: Optional[UUID] = Query(None),
+    gzip: bool = False,
+    current_admin: UserProfile = Depends(rate_limit("export", get_admin_user)),
+):
+    """
+    Stream every matching audit log as NDJSON or CSV, newest first (admin only).
+
+    Rows are read in EXPORT_CHUNK_SIZE keyset pages and written as they
+    arrive, so memory stays flat however long the history is. ``from`` is
+    inclusive, ``to`` exclusive. With ``gzip=true`` the body is a .gz file
+    compressed on the fly.
+    """
+    filters = AuditLogFilters(action, request_id, created_from, created_to)
+    try:
+        # Fetch the first chunk up front so a storage error is still a 500
+        first = await _export_chunk(filters, None)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
+
+    encode = _ndjson_chunk if format == "ndjson" else _csv_chunk
+    body = _export_body(filters, first, encode, header=format == "csv")
+    filename = f"audit_logs-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.{format}"
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    if gzip:
+        body, filename, media_type = _gzipped(body), filename + ".gz", "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+_EXPORT_COLUMNS = list(AuditLogResponse.model_fields)
+
+
+async def _export_chunk(
+    filters: AuditLogFilters, after: Optional[tuple[str, str]]
+) -> tuple[list[dict], Optional[tuple[str, str]]]:
+    """One page of rows plus the key to continue after (None on the last page)."""
+    size = settings.EXPORT_CHUNK_SIZE
+    rows = await get_repository().list_audit_logs(filters, PageParams.chunk(size, after))
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, (rows[-1]["created_at"], rows[-1]["id"])
+
+
+async def _export_body(filters, first, encode, *, header: bool) -> AsyncIterator[bytes]:
+    if header:
+        yield _csv_line(_EXPORT_COLUMNS)
+    rows, after = first
+    while True:
+        if rows:
+            yield encode(rows)
+        if after is None:
+            return
+        try:
+            rows, after = await _export_chunk(filters, after)
+        except Exception:
+            # The 200 is already sent; aborting the connection makes the
+            # client see a failed download rather than a short file
+            logger.exception("Audit log export failed after %s", after)
+            raise
+
+
+def _ndjson_chunk(rows: list[dict]) -> bytes:
+    return "".join(
+        json.dumps({name: row.get(name) for name in _EXPORT_COLUMNS}, default=str) + "\n"
+        for row in rows
+    ).encode()
+
+
+def _csv_chunk(rows: list[dict]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_csv_value(name, row.get(name)) for name in _EXPORT_COLUMNS])
+    return buffer.getvalue().encode()
+
+
+def _csv_value(name: str, value):
+    if name == "details":
+        return json.dumps(value) if value is not None else ""
+    return value
+
+
+def _csv_line(values: list) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().encode()
+
+
+async def _gzipped(body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+    async for chunk in body:
+        # Sync flush per chunk so the client receives data as it is produced
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _serialize_log(row: dict) -> AuditLogResponse:
+    return AuditLogResponse(
+        id=row["id"],
+        request_id=row["request_id"],
+        action=row["action"],
+        performed_by=row["performed_by"],
+        performed_by_role=row["performed_by_role"],
+        details=row.get("details"),
+        created_at=row.get("created_at"),
+    )
@@ -1,20 +1,59 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from app.database import get_supabase_admin
+import csv
+import io
+import json
+import logging
+from typing import Optional, Union
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response, status
+from pydantic import ValidationError
+from starlette.datastructures import UploadFile
+from app.config import settings
 from app.models import (
+    BatchCreateResponse,
+    BatchItemOutcome,
+    BatchItemResult,
     RequestCreate,
     RequestResponse,
+    RequestPage,
+    RequestSummary,
     UserProfile,
     RequestStatus,
     RiskLevel,
     AuditAction,
+    RiskAnalysis,
 )
+from app.etags import list_etag, not_modified, requests_scope, with_etag
 from app.auth import get_current_user
-from app.risk_engine import classify_risk
+from app.events import publish_request
+from app.idempotency import IdempotencyKeyReused, fingerprint, idempotency_store
+from app.metrics import track
+from app.pagination import (
+    ListView,
+    PageParams,
+    RequestFilters,
+    SearchParams,
+    page_params,
+    request_filters,
+    search_params,
+)
+from app.precedents import precedent_index
+from app.repositories import get_repository
+from app.risk_engine import classify_many, classify_risk
+from app.serialization import ListEncoder
+from app.throttling import rate_limit
 from datetime import datetime, timezone
 import uuid
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+_SUMMARY_COLUMNS = ",".join(RequestSummary.model_fields)
+_CSV_COLUMNS = ("title", "description", "request_type")
+# Lists are returned pre-encoded, skipping FastAPI's response_model pass
+_FULL_ENCODER = ListEncoder(RequestResponse)
+_SUMMARY_ENCODER = ListEncoder(RequestSummary)
+
 
 def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -23,20 +62,235 @@ def _now() -> str:
 @router.post("/", response_model=RequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_request(
     payload: RequestCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255),
+    current_user: UserProfile = Depends(rate_limit("submit")),
+):
+    """
+    Submit a request. Retries that send the same ``Idempotency-Key`` get the
+    original response back (``Idempotent-Replayed: true``) instead of
+    creating a duplicate; see app/idempotency.py.
+    """
+    if idempotency_key is None:
+        return await _create_request(payload, current_user)
+
+    try:
+        created, replayed = await idempotency_store.run(
+            (current_user.id, idempotency_key),
+            fingerprint(payload.model_dump_json().encode()),
+            lambda: _create_request(payload, current_user),
+        )
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different request",
+        )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return created
+
+
+@router.post("/batch", response_model=BatchCreateResponse)
+async def create_requests_batch(
+    request: Request,
+    current_user: UserProfile = Depends(rate_limit("batch")),
+):
+    """
+    Submit up to BATCH_MAX_ITEMS requests at once, as a JSON array of
+    request objects or as CSV (a ``text/csv`` body or a multipart ``file``
+    upload) with ``title``, ``description`` and ``request_type`` columns.
+
+    Each item is validated on its own and the valid ones are classified in
+    one pass, then inserted BATCH_CHUNK_SIZE at a time, each chunk in one
+    transaction. Results are per item, in input order: ``invalid`` items
+    carry the validation error, and ``failed`` ones the error of the chunk
+    that could not be written.
+    """
+    items = await _read_batch(request)
+    if not items:
+        raise HTTPException(status_code=422, detail="Batch is empty")
+    if len(items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BATCH_MAX_ITEMS} requests per batch",
+        )
+
+    results: list[Optional[BatchItemResult]] = [None] * len(items)
+    valid: list[tuple[int, RequestCreate]] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, RequestCreate.model_validate(item)))
+        except ValidationError as exc:
+            results[index] = BatchItemResult(
+                index=index, outcome=BatchItemOutcome.invalid, error=_validation_error(exc)
+            )
+
+    with track("classify_risk"):
+        risks = classify_many(
+            [(p.title, p.description, p.request_type.value) for _, p in valid]
+        )
+
+    repository = get_repository()
+    created = 0
+    size = settings.BATCH_CHUNK_SIZE
+    for start in range(0, len(valid), size):
+        chunk = [
+            (index, *_build_request(payload, current_user, risk))
+            for (index, payload), risk in zip(valid[start:start + size], risks[start:start + size])
+        ]
+        try:
+            await repository.create_requests(
+                [row for _, row, _ in chunk],
+                [entry for _, _, entries in chunk for entry in entries],
+            )
+        except Exception as exc:
+            logger.warning("Batch chunk of %d requests failed: %s", len(chunk), exc)
+            for index, _, _ in chunk:
+                results[index] = BatchItemResult(
+                    index=index,
+                    outcome=BatchItemOutcome.failed,
+                    error=f"Failed to create request: {exc}",
+                )
+            continue
+
+        created += len(chunk)
+        for index, row, _ in chunk:
+            publish_request("request.created", row)
+            results[index] = BatchItemResult(
+                index=index,
+                outcome=BatchItemOutcome.created,
+                id=row["id"],
+                status=row["status"],
+                risk_level=row["risk_level"],
+                risk_score=row["risk_score"],
+            )
+
+    return BatchCreateResponse(created=created, results=results)
+
+
+@router.get("/", response_model=Union[list[RequestResponse], RequestPage])
+async def list_my_requests(
+    request: Request,
+    filters: RequestFilters = Depends(request_filters),
+    page: PageParams = Depends(page_params),
+    view: ListView = "full",
+    current_user: UserProfile = Depends(rate_limit("list")),
+):
+    """
+    List own requests, newest first.
+
+    Without ``limit``/``cursor`` the full list is returned as before; with
+    either, a capped page plus ``next_cursor`` is returned, and
+    ``view=summary`` leaves out the description. Answers 304 to an
+    ``If-None-Match`` holding the current ETag (see ``app.etags``).
+    """
+    try:
+        etag = await list_etag(request, requests_scope(current_user.id))
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        rows = await get_repository().list_requests(
+            filters,
+            page,
+            columns=_select_columns(page, view),
+            requester_id=current_user.id,
+        )
+        return with_etag(_list_response(rows, page, view), etag)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@router.get("/search", response_model=RequestPage)
+async def search_my_requests(
+    search: SearchParams = Depends(search_params),
+    filters: RequestFilters = Depends(request_filters),
+    view: ListView = "full",
+    current_user: UserProfile = Depends(rate_limit("search")),
+):
+    """
+    Full-text search of own requests' titles and descriptions, best match
+    first. Always paged; filters and ``view`` work as for ``GET /requests/``.
+    """
+    try:
+        rows = await get_repository().search_requests(
+            search,
+            filters,
+            summary=view == "summary",
+            requester_id=current_user.id,
+        )
+        return _list_response(rows, search, view)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@router.get("/{request_id}", response_model=RequestResponse)
+async def get_request(
+    request_id: str,
     current_user: UserProfile = Depends(get_current_user),
 ):
-    admin_client = get_supabase_admin()
-    risk = classify_risk(payload.title, payload.description)
+    try:
+        row = await get_repository().get_request(request_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Request not found")
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Request not found")
+
+    if current_user.role != "admin" and row["requester_id"] != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return _serialize(row)
+
 
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+async def _create_request(payload: RequestCreate, current_user: UserProfile) -> RequestResponse:
+    with track("classify_risk"):
+        risk = classify_risk(
+            payload.title, payload.description, payload.request_type.value
+        )
+    request_data, audit_entries = _build_request(payload, current_user, risk)
+
+    try:
+        # One transaction where the backend supports it (see repositories)
+        created = await get_repository().create_request(request_data, audit_entries)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to create request: {exc}")
+
+    publish_request("request.created", created)
+    return _serialize(created)
+
+
+def _build_request(
+    payload: RequestCreate, current_user: UserProfile, risk: RiskAnalysis
+) -> tuple[dict, list[dict]]:
+    """The new request row and its audit rows for a classified submission."""
     # Determine initial status based on risk level
+    match = None
     if risk.risk_level == RiskLevel.LOW:
         initial_status = RequestStatus.APPROVED
         audit_action = AuditAction.AUTO_APPROVED
     else:
         initial_status = RequestStatus.ESCALATED
         audit_action = AuditAction.ESCALATED
+        # A near-copy of a request an admin decided gets the same decision
+        match = precedent_index.match(
+            payload.title,
+            payload.description,
+            payload.request_type.value,
+            risk.risk_score,
+            requester_id=current_user.id,
+        )
+        if match is not None:
+            initial_status = RequestStatus(match.precedent.status)
+            audit_action = (
+                AuditAction.AUTO_APPROVED
+                if initial_status == RequestStatus.APPROVED
+                else AuditAction.AUTO_REJECTED
+            )
 
     request_id = str(uuid.uuid4())
+    now = _now()
     request_data = {
         "id": request_id,
         "title": payload.title,
@@ -48,94 +302,135 @@ async def create_request(
         "risk_level": risk.risk_level.value,
         "risk_score": risk.risk_score,
         "risk_factors": risk.risk_factors,
-        "created_at": _now(),
-        "updated_at": _now(),
+        # Always present, so batches of rows share one set of columns
+        "decided_by": None,
+        "decision_reason": None,
+        "created_at": now,
+        "updated_at": now,
     }
 
-    if initial_status == RequestStatus.APPROVED:
+    if match is not None:
+        request_data["decided_by"] = "system"
+        request_data["decision_reason"] = (
+            f"Auto-{initial_status.value.lower()}: same as request "
+            f"{match.precedent.id} ({match.precedent.decided_by})"
+        )
+    elif initial_status == RequestStatus.APPROVED:
         request_data["decided_by"] = "system"
         request_data["decision_reason"] = "Auto-approved: low risk classification"
 
-    try:
-        resp = admin_client.table("requests").insert(request_data).execute()
-        created = resp.data[0]
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Failed to create request: {exc}")
-
-    # Write audit log
     audit_details: dict = {
         "risk_level": risk.risk_level.value,
         "risk_score": risk.risk_score,
         "risk_factors": risk.risk_factors,
+        "ruleset_version": risk.ruleset_version,
     }
-    _write_audit_log(
-        admin_client,
-        request_id=request_id,
-        action=audit_action.value,
-        performed_by=current_user.email,
-        performed_by_role=current_user.role,
-        details=audit_details,
-    )
+    if match is not None:
+        audit_details["precedent_id"] = match.precedent.id
+        audit_details["precedent_similarity"] = round(match.similarity, 3)
+    audit_entries = [
+        _audit_entry(
+            request_id=request_id,
+            action=audit_action.value,
+            performed_by=current_user.email,
+            performed_by_role=current_user.role,
+            details=audit_details,
+        ),
+        # Also write SUBMITTED log
+        _audit_entry(
+            request_id=request_id,
+            action=AuditAction.SUBMITTED.value,
+            performed_by=current_user.email,
+            performed_by_role=current_user.role,
+            details={"request_type": payload.request_type.value},
+        ),
+    ]
+    return request_data, audit_entries
 
-    # Also write SUBMITTED log
-    _write_audit_log(
-        admin_client,
-        request_id=request_id,
-        action=AuditAction.SUBMITTED.value,
-        performed_by=current_user.email,
-        performed_by_role=current_user.role,
-        details={"request_type": payload.request_type.value},
-    )
 
-    return _serialize(created)
+async def _read_batch(request: Request) -> list:
+    """Raw batch items from a JSON array, a CSV body or a multipart CSV upload."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(status_code=422, detail="Upload the CSV as a 'file' field")
+        return _parse_csv(await upload.read())
 
+    body = await request.body()
+    if content_type == "text/csv":
+        return _parse_csv(body)
+    if content_type in ("application/json", ""):
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Body is not valid JSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=422, detail="Expected a JSON array of requests")
+        return items
+    raise HTTPException(
+        status_code=415,
+        detail="Send a JSON array, a text/csv body or a multipart CSV 'file'",
+    )
 
-@router.get("/", response_model=list[RequestResponse])
-async def list_my_requests(
-    current_user: UserProfile = Depends(get_current_user),
-):
-    admin_client = get_supabase_admin()
+
+def _parse_csv(data: bytes) -> list[dict]:
     try:
-        resp = (
-            admin_client.table("requests")
-            .select("*")
-            .eq("requester_id", current_user.id)
-            .order("created_at", desc=True)
-            .execute()
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=422, detail="CSV must be UTF-8")
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [name for name in _CSV_COLUMNS if name not in (reader.fieldnames or ())]
+    if missing:
+        raise HTTPException(
+            status_code=422, detail=f"CSV is missing columns: {', '.join(missing)}"
         )
-        return [_serialize(r) for r in (resp.data or [])]
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+    return [{name: row[name] for name in _CSV_COLUMNS} for row in reader]
 
 
-@router.get("/{request_id}", response_model=RequestResponse)
-async def get_request(
-    request_id: str,
-    current_user: UserProfile = Depends(get_current_user),
-):
-    admin_client = get_supabase_admin()
-    try:
-        resp = (
-            admin_client.table("requests")
-            .select("*")
-            .eq("id", request_id)
-            .single()
-            .execute()
-        )
-    except Exception:
-        raise HTTPException(status_code=404, detail="Request not found")
+def _validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}"
+        for err in exc.errors()
+    )
 
-    row = resp.data
-    if not row:
-        raise HTTPException(status_code=404, detail="Request not found")
 
-    if current_user.role != "admin" and row["requester_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
+def _select_columns(page: PageParams, view: ListView) -> str:
+    return _SUMMARY_COLUMNS if page.paged and view == "summary" else "*"
 
-    return _serialize(row)
 
+def _list_response(
+    rows: list[dict], page: Union[PageParams, SearchParams], view: ListView
+) -> Response:
+    """Encode listed rows as the legacy full list or as a page."""
+    if not page.paged:
+        return _FULL_ENCODER.list_response([_serialize(r) for r in rows])
+
+    rows, next_cursor = page.split(rows)
+    if view == "summary":
+        return _SUMMARY_ENCODER.page_response(
+            [_serialize_summary(r) for r in rows], next_cursor
+        )
+    return _FULL_ENCODER.page_response([_serialize(r) for r in rows], next_cursor)
+
+
+def _serialize_summary(row: dict) -> RequestSummary:
+    return RequestSummary(
+        id=row["id"],
+        title=row["title"],
+        request_type=row["request_type"],
+        requester_id=row["requester_id"],
+        requester_email=row["requester_email"],
+        status=row["status"],
+        risk_level=row["risk_level"],
+        risk_score=row["risk_score"],
+        risk_factors=row.get("risk_factors") or [],
+        decided_by=row.get("decided_by"),
+        created_at=row.get("created_at"),
+        updated_at=row.get("updated_at"),
+    )
 
-# ── Helpers ───────────────────────────────────────────────────────────────────
 
 def _serialize(row: dict) -> RequestResponse:
     return RequestResponse(
@@ -156,18 +451,13 @@ def _serialize(row: dict) -> RequestResponse:
     )
 
 
-def _write_audit_log(client, *, request_id, action, performed_by, performed_by_role, details=None):
-    try:
-        client.table("audit_logs").insert(
-            {
-                "id": str(uuid.uuid4()),
-                "request_id": request_id,
-                "action": action,
-                "performed_by": performed_by,
-                "performed_by_role": performed_by_role,
-                "details": details,
-                "created_at": _now(),
-            }
-        ).execute()
-    except Exception:
-        pass  # Audit failures should not block main flow
+def _audit_entry(*, request_id, action, performed_by, performed_by_role, details=None) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "request_id": request_id,
+        "action": action,
+        "performed_by": performed_by,
+        "performed_by_role": performed_by_role,
+        "details": details,
+        "created_at": _now(),
+    }
@@ -0,0 +1,33 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.auth import get_current_user
+from app.models import RequestStats, UserProfile
+from app.repositories import get_repository
+
+router = APIRouter()
+
+
+@router.get("/", response_model=RequestStats)
+async def get_stats(
+    scope: Literal["me", "global"] = "me",
+    days: int = Query(30, ge=1, le=366),
+    current_user: UserProfile = Depends(get_current_user),
+):
+    """
+    Request counts by status, risk level and type for the dashboard.
+
+    ``scope=me`` counts the caller's own requests; ``scope=global`` (admins
+    only) counts every request and adds a per-day series for the last
+    ``days`` days. Both are read from rollup counters, so the cost does not
+    grow with the number of requests.
+    """
+    if scope == "global" and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    requester_id = current_user.id if scope == "me" else None
+    try:
+        stats = await get_repository().request_stats(requester_id, days)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+    return RequestStats(scope=scope, **stats)
@@ -0,0 +1,182 @@
+"""
+Admission control: per-user rate limits and load shedding.
+
+- Rate limits: routes that a script can flood (submissions, lists, logs,
+  exports) take a token from the caller's bucket for that route via
+  ``Depends(rate_limit("submit"))`` in place of ``get_current_user``. A
+  bucket holds up to N tokens and refills at N per window (RATE_LIMITS,
+  e.g. ``submit=60/60``); an empty one answers 429 with ``Retry-After``
+  before any storage call.
+- Load shedding: ``LoadSheddingMiddleware`` caps the requests in progress at
+  MAX_CONCURRENT_REQUESTS and answers the excess 503 with ``Retry-After``
+  at once, before auth or storage. The last ADMIN_RESERVED_SLOTS are kept
+  for ``/admin`` routes, so the approval queue stays reachable while user
+  traffic saturates the worker. Event streams and health checks are not
+  counted.
+
+Counters are in ``throttle_stats()`` (diagnostics and /metrics). Buckets and
+slots are per worker process, like the caches, so the effective limits
+scale with the number of workers.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from fastapi import Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+
+from app.auth import get_current_user
+from app.config import settings
+from app.models import UserProfile
+
+# Long-lived or operational endpoints that must not take (or be refused) a slot
+_UNCOUNTED_PATHS = ("/health", "/metrics", "/events/stream")
+
+
+class RateLimiter:
+    """Token buckets keyed by (user id, limit name)."""
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[int, float]],
+        max_keys: int,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.limits = limits
+        self.max_keys = max_keys
+        self._timer = timer
+        # key -> [tokens, last refill]; least recently used first
+        self._buckets: "OrderedDict[tuple[str, str], list[float]]" = OrderedDict()
+        self.throttled: dict[str, int] = {name: 0 for name in limits}
+
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        return cls(settings.rate_limits, settings.RATE_LIMIT_MAX_KEYS)
+
+    def acquire(self, user_id: str, name: str) -> float:
+        """Take a token; 0 if allowed, else seconds until one is available."""
+        limit = self.limits.get(name)
+        if limit is None:
+            return 0.0
+        capacity, window = limit
+        rate = capacity / window
+        now = self._timer()
+        key = (user_id, name)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(capacity), now]
+            # The oldest entries are the idlest, so most likely full anyway
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        self.throttled[name] += 1
+        return (1 - bucket[0]) / rate
+
+    def stats(self) -> dict:
+        return {
+            "buckets": len(self._buckets),
+            "throttled": sum(self.throttled.values()),
+            **{f"throttled_{name}": n for name, n in self.throttled.items()},
+        }
+
+
+class LoadShedder:
+    """Counts requests in progress and refuses those over the cap."""
+
+    def __init__(self, max_concurrent: int, admin_reserved: int):
+        self.max_concurrent = max_concurrent
+        self.admin_reserved = min(admin_reserved, max_concurrent)
+        self.in_flight = 0
+        self.shed = 0
+        self.shed_admin = 0
+
+    @classmethod
+    def from_settings(cls) -> "LoadShedder":
+        return cls(settings.MAX_CONCURRENT_REQUESTS, settings.ADMIN_RESERVED_SLOTS)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    def admit(self, admin: bool) -> bool:
+        limit = self.max_concurrent if admin else self.max_concurrent - self.admin_reserved
+        if self.in_flight >= limit:
+            if admin:
+                self.shed_admin += 1
+            else:
+                self.shed += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "shed": self.shed,
+            "shed_admin": self.shed_admin,
+        }
+
+
+rate_limiter = RateLimiter.from_settings()
+load_shedder = LoadShedder.from_settings()
+
+
+def rate_limit(name: str, user_dependency=get_current_user):
+    """Dependency returning the current user after taking a ``name`` token."""
+
+    async def dependency(current_user: UserProfile = Depends(user_dependency)) -> UserProfile:
+        wait = rate_limiter.acquire(current_user.id, name)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, slow down",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+        return current_user
+
+    return dependency
+
+
+def throttle_stats() -> dict:
+    return {**load_shedder.stats(), **rate_limiter.stats()}
+
+
+# ── Middleware ────────────────────────────────────────────────────────────────
+
+class LoadSheddingMiddleware:
+    """Pure ASGI middleware applying ``load_shedder`` to HTTP requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not load_shedder.enabled or path in _UNCOUNTED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if not load_shedder.admit(path == "/admin" or path.startswith("/admin/")):
+            response = JSONResponse(
+                {"detail": "Server is busy, retry shortly"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(settings.SHED_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            load_shedder.release()
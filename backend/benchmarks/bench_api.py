@@ -0,0 +1,327 @@
+"""
+Load test: drive the FastAPI app with concurrent, mixed traffic.
+
+Runs ``main.app`` in-process (no sockets) against an in-memory SQLite
+repository seeded with realistic data, so results measure the API layer,
+risk engine and serialization rather than the network. Every repository call
+is counted and attributed to the API request that made it; audit rows are
+written by the background sink and reported separately.
+
+``--upstream-latency-ms`` adds a delay to each repository call to model the
+PostgREST round trip, which is where extra calls per request hurt.
+
+    cd backend
+    python -m benchmarks.bench_api --requests 5000 --concurrency 50 \\
+        --output benchmarks/results/api.json
+"""
+
+import argparse
+import asyncio
+import contextvars
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import httpx
+from jose import jwt
+
+from app.audit import audit_sink
+from app.auth import profile_cache
+from app.config import settings
+from app.repositories import set_repository
+from app.repositories.sqlite import SQLiteRepository
+from app.risk_engine import classify_risk
+from app.throttling import load_shedder, rate_limiter
+from benchmarks.common import save_results, summarize
+
+# Relative weight of each operation in the traffic mix
+MIX = {
+    "submit": 35,
+    "list_own": 15,
+    "admin_queue": 15,
+    "decide": 15,
+    "logs_user": 10,
+    "logs_admin": 10,
+    "dashboard": 10,
+}
+
+_SUBJECTS = ["room", "projector", "laptop", "lab access", "parking pass", "VPN account"]
+_EXTRAS = [
+    "for the team meeting", "for a customer demo", "over the weekend",
+    "temporary access for a contractor", "urgent fix for production",
+    "admin rights on the build server", "large training session",
+    "bulk export of confidential reports", "quarterly planning session",
+]
+_TYPES = ["room_booking", "access_permission", "equipment_checkout", "other"]
+
+_current_calls: contextvars.ContextVar = contextvars.ContextVar("calls", default=None)
+
+
+class CountingRepository:
+    """Wraps a repository, counting calls and optionally adding latency."""
+
+    def __init__(self, inner, latency_ms: float = 0.0):
+        self._inner = inner
+        self._latency = latency_ms / 1000
+        self.total_calls = 0
+        self.background_calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        async def call(*args, **kwargs):
+            self.total_calls += 1
+            counter = _current_calls.get()
+            if counter is None:
+                self.background_calls += 1
+            else:
+                counter[name] += 1
+            if self._latency:
+                await asyncio.sleep(self._latency)
+            return await attr(*args, **kwargs)
+
+        return call
+
+
+def _request_text(rng: random.Random) -> dict:
+    subject = rng.choice(_SUBJECTS)
+    return {
+        "title": f"Request for {subject}",
+        "description": f"Need the {subject} {rng.choice(_EXTRAS)}, thanks.",
+        "request_type": rng.choice(_TYPES),
+    }
+
+
+def _token(user_id: str, email: str) -> str:
+    claims = {
+        "sub": user_id,
+        "email": email,
+        "aud": settings.JWT_AUDIENCE,
+        "exp": int(time.time()) + 3600,
+    }
+    return jwt.encode(claims, settings.JWT_SECRET, algorithm=settings.jwt_algorithms_list[0])
+
+
+async def _seed(repo, users: int, requests: int, rng: random.Random) -> tuple[list, list]:
+    """Create one admin, ``users`` requesters and ``requests`` requests."""
+    admin = (str(uuid.uuid4()), "admin@bench")
+    await repo.upsert_profile({"id": admin[0], "email": admin[1], "role": "admin"})
+    people = []
+    for i in range(users):
+        user_id = str(uuid.uuid4())
+        await repo.upsert_profile({"id": user_id, "email": f"user{i}@bench", "role": "user"})
+        people.append((user_id, f"user{i}@bench"))
+
+    open_ids = []
+    for _ in range(requests):
+        user_id, email = rng.choice(people)
+        body = _request_text(rng)
+        risk = classify_risk(body["title"], body["description"], body["request_type"])
+        status = "APPROVED" if risk.risk_level.value == "LOW" else "ESCALATED"
+        created = await repo.create_request(
+            {
+                **body,
+                "requester_id": user_id,
+                "requester_email": email,
+                "status": status,
+                "risk_level": risk.risk_level.value,
+                "risk_score": risk.risk_score,
+                "risk_factors": risk.risk_factors,
+            },
+            [{"action": "SUBMITTED", "performed_by": email, "details": None}],
+        )
+        if status == "ESCALATED":
+            open_ids.append(created["id"])
+    return [admin] + people, open_ids
+
+
+async def run(
+    total: int,
+    concurrency: int,
+    users: int,
+    seed_requests: int,
+    latency_ms: float,
+    seed: int,
+) -> dict:
+    from main import app
+
+    rng = random.Random(seed)
+    repo = CountingRepository(SQLiteRepository(":memory:"), latency_ms)
+    set_repository(repo)
+    profile_cache.clear()
+    # Measure capacity, not the admission limits: a few simulated users send
+    # far more than any per-user limit allows
+    rate_limiter.limits = {}
+    load_shedder.max_concurrent = 0
+    # Tokens are minted locally, so they must be verified locally too
+    settings.JWT_SECRET = settings.JWT_SECRET or "bench-secret"
+    settings.JWT_VERIFY_LOCALLY = True
+
+    # Seed through the unwrapped repository so it doesn't count as traffic
+    people, open_ids = await _seed(repo._inner, users, seed_requests, rng)
+    admin, requesters = people[0], people[1:]
+    headers = {
+        user_id: {"Authorization": f"Bearer {_token(user_id, email)}"}
+        for user_id, email in people
+    }
+    admin_headers = headers[admin[0]]
+
+    latencies: dict = defaultdict(list)
+    calls: dict = defaultdict(Counter)
+    statuses: dict = defaultdict(Counter)
+    operations = list(MIX)
+    weights = [MIX[op] for op in operations]
+    plan = rng.choices(operations, weights=weights, k=total)
+
+    async def one(client: httpx.AsyncClient, op: str, op_rng: random.Random) -> None:
+        user_id, _ = op_rng.choice(requesters)
+        if op == "decide" and not open_ids:
+            op = "admin_queue"
+        if op == "submit":
+            request = client.post("/requests/", json=_request_text(op_rng), headers=headers[user_id])
+        elif op == "list_own":
+            request = client.get("/requests/", params={"limit": 50}, headers=headers[user_id])
+        elif op == "admin_queue":
+            request = client.get(
+                "/admin/requests", params={"limit": 50, "view": "summary"}, headers=admin_headers
+            )
+        elif op == "decide":
+            request_id = open_ids.pop(op_rng.randrange(len(open_ids)))
+            if op_rng.random() < 0.5:
+                request = client.put(
+                    f"/admin/requests/{request_id}/approve", json={}, headers=admin_headers
+                )
+            else:
+                request = client.put(
+                    f"/admin/requests/{request_id}/reject",
+                    json={"reason": "Not justified for this quarter"},
+                    headers=admin_headers,
+                )
+        elif op == "dashboard":
+            request = client.get("/stats/", headers=headers[user_id])
+        elif op == "logs_user":
+            request = client.get("/logs/", params={"limit": 50}, headers=headers[user_id])
+        else:
+            request = client.get("/logs/", params={"limit": 50}, headers=admin_headers)
+
+        counter: Counter = Counter()
+        token = _current_calls.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await request
+        finally:
+            _current_calls.reset(token)
+        latencies[op].append((time.perf_counter() - started) * 1000)
+        statuses[op][response.status_code] += 1
+        calls[op].update(counter)
+        calls[op]["_total"] += sum(counter.values())
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for op in plan:
+        queue.put_nowait(op)
+
+    async def worker(worker_id: int, client: httpx.AsyncClient) -> None:
+        op_rng = random.Random(seed * 1000 + worker_id)
+        while not queue.empty():
+            await one(client, queue.get_nowait(), op_rng)
+
+    await audit_sink.start()
+    transport = httpx.ASGITransport(app=app)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(*(worker(i, client) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await audit_sink.stop()
+    set_repository(None)
+
+    endpoints = {}
+    for op in operations:
+        count = len(latencies[op])
+        if not count:
+            continue
+        per_call = {
+            name: round(n / count, 3) for name, n in sorted(calls[op].items()) if name != "_total"
+        }
+        endpoints[op] = {
+            **summarize(latencies[op]),
+            "upstream_calls_per_request": round(calls[op]["_total"] / count, 3),
+            "upstream_calls_by_method": per_call,
+            "status_codes": {str(code): n for code, n in sorted(statuses[op].items())},
+        }
+
+    all_latencies = [ms for samples in latencies.values() for ms in samples]
+    attributed = sum(calls[op]["_total"] for op in operations)
+    return {
+        "overall": {
+            **summarize(all_latencies),
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_rps": round(len(all_latencies) / elapsed, 1),
+            "upstream_calls_per_request": round(attributed / len(all_latencies), 3),
+            "background_upstream_calls": repo.background_calls,
+        },
+        "endpoints": endpoints,
+        "audit_sink": audit_sink.stats(),
+    }
+
+
+def _print(results: dict) -> None:
+    header = f"{'endpoint':<12} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'calls/req':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in [*results["endpoints"].items(), ("overall", results["overall"])]:
+        print(
+            f"{name:<12} {stats['count']:>6} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f}"
+            f" {stats['p99_ms']:>8.2f} {stats['upstream_calls_per_request']:>9.2f}"
+        )
+    overall = results["overall"]
+    print(
+        f"\nthroughput: {overall['throughput_rps']:,.0f} req/s over "
+        f"{overall['elapsed_seconds']}s; background upstream calls: "
+        f"{overall['background_upstream_calls']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000, help="API requests to send")
+    parser.add_argument("--concurrency", type=int, default=25, help="Concurrent clients")
+    parser.add_argument("--users", type=int, default=200, help="Seeded requesters")
+    parser.add_argument("--seed-requests", type=int, default=5000, help="Seeded requests")
+    parser.add_argument(
+        "--upstream-latency-ms", type=float, default=0.0,
+        help="Delay added to every repository call (models the PostgREST round trip)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    config = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "seed_requests": args.seed_requests,
+        "upstream_latency_ms": args.upstream_latency_ms,
+        "seed": args.seed,
+        "mix": MIX,
+    }
+    print(f"Seeding {args.seed_requests} requests...", file=sys.stderr)
+    results = asyncio.run(
+        run(
+            total=args.requests,
+            concurrency=args.concurrency,
+            users=args.users,
+            seed_requests=args.seed_requests,
+            latency_ms=args.upstream_latency_ms,
+            seed=args.seed,
+        )
+    )
+    _print(results)
+    save_results(args.output, "api", config, results)
+
+
+if __name__ == "__main__":
+    main()
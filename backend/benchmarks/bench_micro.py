@@ -0,0 +1,238 @@
+"""
+Micro-benchmarks for per-request CPU work: risk classification (single and
+batch), precedent lookups, response serialization and event fan-out.
+
+``list_*_10k`` compare encoding a 10k-row list response through FastAPI's
+``response_model`` handling with the pre-encoded path the list routes use.
+
+    cd backend
+    python -m benchmarks.bench_micro [--output benchmarks/results/micro.json]
+"""
+
+import argparse
+import asyncio
+import timeit
+import uuid
+from datetime import datetime, timezone
+from typing import Union
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.events import EventBroker
+from app.models import AuditLogPage, AuditLogResponse, RequestPage, RequestResponse
+from app.pagination import PageParams
+from app.precedents import PrecedentIndex
+from app.risk_engine import BUILTIN_RULESET, classify_many, classify_risk
+from app.routers.logs import _ENCODER as _LOG_ENCODER
+from app.routers.logs import _serialize_log
+from app.routers.requests import _list_response, _serialize, _serialize_summary
+from benchmarks.common import save_results
+
+_TEXTS = {
+    "short": (
+        "Projector for demo",
+        "Need the projector for a customer demo on Friday.",
+    ),
+    "keywords": (
+        "Urgent admin access",
+        "Temporary admin rights to bypass the build approvals over the weekend, "
+        "for all users of the release pipeline.",
+    ),
+    "long": (
+        "Lab access for onboarding",
+        " ".join(
+            ["The new team needs badge access to the hardware lab for onboarding."] * 40
+        ),
+    ),
+}
+
+
+def _row(i: int) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "id": str(uuid.uuid4()),
+        "title": f"Request {i} for lab access",
+        "description": "Need badge access to the hardware lab for onboarding. " * 4,
+        "request_type": "access_permission",
+        "requester_id": str(uuid.uuid4()),
+        "requester_email": f"user{i}@example.com",
+        "status": "ESCALATED",
+        "risk_level": "HIGH",
+        "risk_score": 60,
+        "risk_factors": ["admin", "temporary"],
+        "decision_reason": None,
+        "decided_by": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _log_row(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "request_id": str(uuid.uuid4()),
+        "action": "AUTO_APPROVED",
+        "performed_by": "system",
+        "performed_by_role": "system",
+        "details": {
+            "risk_level": "LOW",
+            "risk_score": 10,
+            "risk_factors": [],
+            "ruleset_version": "builtin",
+            "precedent_similarity": 0.912,
+        },
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _via_response_model(loop, field, content) -> bytes:
+    """What FastAPI does with a returned model: dump, validate, encode."""
+    body = loop.run_until_complete(
+        serialize_response(field=field, response_content=content, is_coroutine=True)
+    )
+    return JSONResponse(body).body
+
+
+def _time(fn, min_seconds: float = 0.2) -> float:
+    """Best-of-5 microseconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_seconds / 0.2))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def run() -> dict:
+    results = {}
+    for name, (title, description) in _TEXTS.items():
+        results[f"classify_risk.{name}"] = _time(
+            lambda: classify_risk(title, description, "other", BUILTIN_RULESET)
+        )
+
+    # A facilities import: 1000 checkouts of 20 distinct items
+    batch = [
+        (f"Laptop checkout {i % 20}", "Loaner laptop for the onsite workshop.", "equipment_checkout")
+        for i in range(1000)
+    ]
+    results["classify_risk.batch_1000"] = _time(
+        lambda: [classify_risk(*item, ruleset=BUILTIN_RULESET) for item in batch]
+    )
+    results["classify_many.batch_1000"] = _time(
+        lambda: classify_many(batch, BUILTIN_RULESET)
+    )
+
+    index = _precedent_index(10000)
+    title, description = "Laptop checkout for the berlin office", (
+        "Need a loaner laptop for the teamaa workshop in berlin on 17 May, "
+        "returning it the following Monday."
+    )
+    results["precedents.match_hit_10k"] = _time(
+        lambda: index.match(title, description, "equipment_checkout", 20)
+    )
+    results["precedents.match_miss_10k"] = _time(
+        lambda: index.match(*_TEXTS["keywords"], "equipment_checkout", 20)
+    )
+
+    row = _row(0)
+    rows = [_row(i) for i in range(50)]
+    results["serialize.one"] = _time(lambda: _serialize(row))
+    results["serialize_summary.one"] = _time(lambda: _serialize_summary(row))
+    results["serialize.page_50"] = _time(lambda: [_serialize(r) for r in rows])
+    models = [_serialize(r) for r in rows]
+    results["dump_json.page_50"] = _time(
+        lambda: [m.model_dump_json() for m in models]
+    )
+    results["validate_and_dump.page_50"] = _time(
+        lambda: [RequestResponse.model_validate(r).model_dump_json() for r in rows]
+    )
+    results["events.publish_10k_idle"] = _time(_publish_fanout())
+
+    loop = asyncio.new_event_loop()
+    rows = [_row(i) for i in range(10000)]
+    page = PageParams.chunk(len(rows))
+    request_field = create_response_field(
+        name="response", type_=Union[list[RequestResponse], RequestPage]
+    )
+    results["list_requests_10k.response_model"] = _time(lambda: _via_response_model(
+        loop, request_field,
+        RequestPage(items=[_serialize(r) for r in rows], next_cursor=None),
+    ))
+    results["list_requests_10k.encoded"] = _time(lambda: _list_response(rows, page, "full"))
+
+    logs = [_log_row(i) for i in range(10000)]
+    log_field = create_response_field(
+        name="response", type_=Union[list[AuditLogResponse], AuditLogPage]
+    )
+    results["list_logs_10k.response_model"] = _time(lambda: _via_response_model(
+        loop, log_field,
+        AuditLogPage(items=[_serialize_log(r) for r in logs], next_cursor=None),
+    ))
+    results["list_logs_10k.encoded"] = _time(
+        lambda: _LOG_ENCODER.page_response([_serialize_log(r) for r in logs], None)
+    )
+    loop.close()
+    return {name: {"us_per_call": round(us, 3)} for name, us in results.items()}
+
+
+def _precedent_index(size: int) -> PrecedentIndex:
+    """A full index of admin decisions on checkouts that share one template."""
+    kinds = ("laptop", "projector", "camera", "monitor", "headset")
+    offices = ("berlin", "austin", "lagos", "osaka", "lima", "oslo", "pune", "perth",
+               "quito", "turin", "dakar", "porto", "cairo", "leeds", "split", "cork")
+    events = ("workshop", "demo", "training", "offsite", "onboarding", "audit",
+              "hackathon", "review", "launch", "interview", "retreat", "summit")
+    teams = [f"team{chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(size)]
+    index = PrecedentIndex(enabled=True, min_similarity=0.85, maxsize=size)
+    for i in range(size):
+        kind, office, event = kinds[i % 5], offices[i // 5 % 16], events[i // 80 % 12]
+        index.add({
+            "id": str(uuid.uuid4()),
+            "title": f"{kind.title()} checkout for the {office} office",
+            "description": f"Need a loaner {kind} for the {teams[i]} {event} in "
+                           f"{office} on 3 May, returning it the following Monday.",
+            "request_type": "equipment_checkout",
+            "status": "APPROVED",
+            "risk_score": 20,
+            "decided_by": "admin@example.com",
+            "updated_at": "2024-05-01T00:00:00+00:00",
+        })
+    return index
+
+
+def _publish_fanout():
+    """Publish to 50 admins + 2 tabs of the requester, with 10k idle streams."""
+    broker = EventBroker(
+        max_subscribers=20000, queue_size=100, replay_size=1000,
+        heartbeat=15.0, max_stream_seconds=300.0,
+    )
+    admins = [broker.subscribe(f"admin{i}", True) for i in range(50)]
+    for i in range(10000):
+        broker.subscribe(f"user{i}", False)
+    mine = [broker.subscribe("user0", False) for _ in range(2)]
+    recipients = admins + mine
+    payload = {k: v for k, v in _row(0).items() if k != "description"}
+
+    def publish():
+        broker.publish("request.updated", "user0", payload)
+        for subscriber in recipients:
+            subscriber.pending.clear()
+
+    return publish
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run()
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}} {'µs/call':>10}")
+    for name, stats in results.items():
+        print(f"{name:<{width}} {stats['us_per_call']:>10.2f}")
+    save_results(args.output, "micro", {}, results)
+
+
+if __name__ == "__main__":
+    main()
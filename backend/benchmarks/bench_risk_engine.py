@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: per-request keyword matching cost vs. keyword count.
+
+Compares the previous per-keyword substring scan with the single-pass
+KeywordMatcher used by app.risk_engine.
+
+    cd backend
+    python -m benchmarks.bench_risk_engine
+"""
+
+import random
+import string
+import timeit
+
+from app.risk_engine import (
+    HIGH_RISK_KEYWORDS,
+    MEDIUM_RISK_KEYWORDS,
+    KeywordMatcher,
+)
+
+KEYWORD_COUNTS = [28, 100, 250, 500, 1000]
+DESCRIPTION_WORDS = [20, 200, 2000]
+
+
+def _synthetic_keywords(n: int, rng: random.Random) -> list[str]:
+    base = HIGH_RISK_KEYWORDS + MEDIUM_RISK_KEYWORDS
+    extra = {
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        for _ in range(max(n - len(base), 0) * 2)
+    }
+    return (base + sorted(extra))[:n]
+
+
+def _synthetic_text(words: int, keywords: list[str], rng: random.Random) -> str:
+    filler = ["please", "book", "the", "room", "for", "our", "team", "meeting"]
+    tokens = [rng.choice(filler) for _ in range(words)]
+    for i in rng.sample(range(words), k=min(3, words)):
+        tokens[i] = rng.choice(keywords)
+    return " ".join(tokens)
+
+
+def _naive(keywords: list[str], text: str) -> list[str]:
+    return [kw for kw in keywords if kw in text]
+
+
+def main() -> None:
+    rng = random.Random(42)
+    print(f"{'keywords':>9} {'words':>6} {'naive µs':>10} {'matcher µs':>11} {'speedup':>8}")
+    for n in KEYWORD_COUNTS:
+        keywords = _synthetic_keywords(n, rng)
+        matcher = KeywordMatcher(keywords)
+        for words in DESCRIPTION_WORDS:
+            text = _synthetic_text(words, keywords, rng)
+            number = max(10, 20000 // words)
+            naive = min(timeit.repeat(lambda: _naive(keywords, text), number=number, repeat=3))
+            matched = min(timeit.repeat(lambda: matcher.findall(text), number=number, repeat=3))
+            naive_us = naive / number * 1e6
+            matcher_us = matched / number * 1e6
+            print(
+                f"{n:>9} {words:>6} {naive_us:>10.1f} {matcher_us:>11.1f}"
+                f" {naive_us / matcher_us:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
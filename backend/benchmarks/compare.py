@@ -0,0 +1,73 @@
+"""
+Compare two benchmark result files (e.g. from two commits).
+
+Prints every numeric metric present in both files with the relative change;
+``--threshold`` flags latency/time metrics that got slower by more than the
+given percentage and makes the command exit non-zero.
+
+    cd backend
+    python -m benchmarks.compare old.json new.json [--threshold 10]
+"""
+
+import argparse
+import json
+import sys
+
+# Metrics where a higher value is better; everything else is a cost
+_HIGHER_IS_BETTER = ("throughput_rps", "rows_per_second", "hit_rate")
+# Only these are checked against --threshold
+_TIMING_SUFFIXES = ("_ms", "us_per_call")
+
+
+def _flatten(data, prefix: str = "") -> dict:
+    out = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            out.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = value
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold", type=float, default=None,
+        help="Fail if a timing metric regresses by more than this many percent",
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        old_doc = json.load(fh)
+    with open(args.candidate, encoding="utf-8") as fh:
+        new_doc = json.load(fh)
+    if old_doc.get("benchmark") != new_doc.get("benchmark"):
+        sys.exit("Result files are from different benchmarks")
+
+    old, new = _flatten(old_doc["results"]), _flatten(new_doc["results"])
+    print(f"baseline {old_doc.get('commit')} -> candidate {new_doc.get('commit')}")
+    width = max((len(name) for name in old), default=10)
+    regressions = []
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name], new[name]
+        change = (after - before) / before * 100 if before else 0.0
+        marker = ""
+        worse = -change if name.endswith(_HIGHER_IS_BETTER) else change
+        if (
+            args.threshold is not None
+            and name.endswith(_TIMING_SUFFIXES)
+            and worse > args.threshold
+        ):
+            marker = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<{width}} {before:>12.3f} {after:>12.3f} {change:>+8.1f}%{marker}")
+
+    if regressions:
+        sys.exit(f"{len(regressions)} metric(s) regressed by more than {args.threshold}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,85 @@
-from fastapi import FastAPI
+import hmac
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app import metrics
+from app.audit import audit_sink
+from app.auth import profile_cache
+from app.events import event_broker
+from app.idempotency import idempotency_store
+from app.precedents import precedent_index
+from app.throttling import LoadSheddingMiddleware, throttle_stats
 from app.config import settings
-from app.routers import auth, requests, approvals, logs
+from app.database import close_supabase_clients
+from app.repositories import close_repository, get_repository
+from app.routers import auth, requests, approvals, logs, stats, events
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await audit_sink.start()
+    await precedent_index.start(get_repository())
+    yield
+    await precedent_index.stop()
+    await audit_sink.stop()
+    await close_repository()
+    await close_supabase_clients()
+
 
 app = FastAPI(
     title="Intelligent Approval Automation System",
     description="A full-stack approval workflow system with AI-powered risk classification.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Inside CORS, so 503s from shedding still carry the CORS headers
+app.add_middleware(LoadSheddingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Content-Disposition", "Idempotent-Replayed", "Retry-After", "ETag"],
 )
+if settings.METRICS_ENABLED:
+    # Added last so it is outermost and times the whole stack
+    app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(requests.router, prefix="/requests", tags=["requests"])
 app.include_router(approvals.router, prefix="/admin", tags=["admin"])
 app.include_router(logs.router, prefix="/logs", tags=["logs"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
+app.include_router(events.router, prefix="/events", tags=["events"])
 
 
 @app.get("/health", tags=["health"])
 async def health_check():
     return {"status": "ok", "environment": settings.ENVIRONMENT}
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def prometheus_metrics(request: Request):
+    """Prometheus text exposition for this worker."""
+    if not settings.METRICS_TOKEN:
+        # Not served without a token: it exposes routes and internal counters
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not hmac.compare_digest(request.headers.get("authorization", "").encode(), expected):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(
+        metrics.render({
+            "profile_cache": profile_cache.stats(),
+            "audit_sink": audit_sink.stats(),
+            "events": event_broker.stats(),
+            "idempotency": idempotency_store.stats(),
+            "precedents": precedent_index.stats(),
+            "throttling": throttle_stats(),
+        }),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.idempotency import IdempotencyKeyReused, IdempotencyStore
+
+
+def _store() -> IdempotencyStore:
+    return IdempotencyStore(maxsize=100, ttl=60)
+
+
+def test_replays_a_completed_result():
+    store = _store()
+    calls = []
+
+    async def create():
+        calls.append(1)
+        return {"id": "r1"}
+
+    async def scenario():
+        first = await store.run("k", "fp", create)
+        second = await store.run("k", "fp", create)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == ({"id": "r1"}, False)
+    assert second == ({"id": "r1"}, True)
+    assert len(calls) == 1
+    assert store.replayed == 1
+
+
+def test_coalesces_concurrent_duplicates():
+    store = _store()
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def create():
+            calls.append(1)
+            await release.wait()
+            return {"id": "r1"}
+
+        first = asyncio.create_task(store.run("k", "fp", create))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(store.run("k", "fp", create))
+        await asyncio.sleep(0)
+        release.set()
+        return await first, await second
+
+    first, second = asyncio.run(scenario())
+    assert first == ({"id": "r1"}, False)
+    assert second == ({"id": "r1"}, True)
+    assert len(calls) == 1
+    assert store.coalesced == 1
+
+
+def test_rejects_a_reused_key_with_another_payload():
+    store = _store()
+
+    async def create():
+        return {"id": "r1"}
+
+    async def scenario():
+        await store.run("k", "fp-1", create)
+        await store.run("k", "fp-2", create)
+
+    with pytest.raises(IdempotencyKeyReused):
+        asyncio.run(scenario())
+    assert store.conflicts == 1
+
+
+def test_rejects_a_reused_key_while_in_flight():
+    store = _store()
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def create():
+            await release.wait()
+            return {"id": "r1"}
+
+        first = asyncio.create_task(store.run("k", "fp-1", create))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(IdempotencyKeyReused):
+                await store.run("k", "fp-2", create)
+        finally:
+            release.set()
+            await first
+
+    asyncio.run(scenario())
+
+
+def test_does_not_remember_failures():
+    store = _store()
+    attempts = []
+
+    async def create():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("storage down")
+        return {"id": "r1"}
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run("k", "fp", create)
+        return await store.run("k", "fp", create)
+
+    assert asyncio.run(scenario()) == ({"id": "r1"}, False)
+    assert len(attempts) == 2
@@ -0,0 +1,73 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.pagination import (
+    decode_cursor,
+    decode_search_cursor,
+    encode_cursor,
+    encode_search_cursor,
+)
+
+ROW = {
+    "id": "8ee83e67-85cc-4d6c-8d8b-71f183f218dc",
+    "created_at": "2026-01-02T03:04:05.123456+00:00",
+}
+
+
+def _token(value) -> str:
+    raw = json.dumps(value).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(ROW)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (ROW["created_at"], ROW["id"])
+
+
+def test_search_cursor_round_trip():
+    cursor = encode_search_cursor({**ROW, "search_rank": 0.25})
+
+    assert decode_search_cursor(cursor) == (0.25, ROW["created_at"], ROW["id"])
+
+
+def test_cursor_id_is_normalized():
+    cursor = _token([ROW["created_at"], ROW["id"].upper()])
+
+    assert decode_cursor(cursor)[1] == ROW["id"]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        _token("just a string"),
+        _token([ROW["created_at"]]),
+        _token(["yesterday", ROW["id"]]),
+        _token([ROW["created_at"], "8ee83e67"]),
+        _token([ROW["created_at"], 'x",id.gt."0']),
+        _token([ROW["created_at"], 42]),
+    ],
+)
+def test_rejects_tampered_cursors(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        _token(["high", ROW["created_at"], ROW["id"]]),
+        _token([0.5, ROW["created_at"], "' OR 1=1"]),
+        encode_cursor(ROW),
+    ],
+)
+def test_rejects_tampered_search_cursors(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_search_cursor(cursor)
+    assert exc.value.status_code == 400
@@ -0,0 +1,79 @@
+import pytest
+
+from app.models import RiskLevel
+from app.risk_engine import BUILTIN_RULESET, KeywordMatcher, RuleSet, classify_risk
+
+DEFAULT = {"default": (60, 20)}
+
+
+def test_matches_whole_words_only():
+    matcher = KeywordMatcher(["admin", "root"])
+
+    assert matcher.findall("need admin access") == {"admin"}
+    assert matcher.findall("administration and rooted devices") == set()
+
+
+def test_matches_phrases_on_word_boundaries():
+    matcher = KeywordMatcher(["all users", "system-wide"])
+
+    assert matcher.findall("notify all users system-wide") == {"all users", "system-wide"}
+    assert matcher.findall("install users and a subsystem-wide fix") == set()
+
+
+def test_classification_is_case_insensitive():
+    risk = classify_risk("URGENT Override", "Need it", ruleset=BUILTIN_RULESET)
+
+    assert risk.risk_level == RiskLevel.HIGH
+    assert risk.risk_factors == ["urgent", "override"]
+
+
+def test_rules_file_keywords_are_lowercased():
+    rules = RuleSet.build("t", high={"Urgent": 60}, medium={}, thresholds=DEFAULT)
+
+    assert classify_risk("urgent", "", ruleset=rules).risk_factors == ["urgent"]
+
+
+def test_low_risk_without_keywords():
+    risk = classify_risk("Book room 4", "Team sync on Tuesday", ruleset=BUILTIN_RULESET)
+
+    assert (risk.risk_level, risk.risk_score, risk.risk_factors) == (RiskLevel.LOW, 0, [])
+
+
+def test_thresholds_per_request_type():
+    rules = RuleSet.build(
+        "t",
+        high={},
+        medium={"weekend": 30},
+        thresholds={"default": (60, 20), "room_booking": (90, 40)},
+    )
+
+    assert classify_risk("weekend", "", "other", rules).risk_level == RiskLevel.MEDIUM
+    assert classify_risk("weekend", "", "room_booking", rules).risk_score == 40
+
+
+@pytest.mark.parametrize(
+    "high, medium, thresholds",
+    [
+        ({"urgent": 20}, {}, {"room_booking": (60, 20)}),
+        ({"urgent": 20}, {}, {"default": (60, 0)}),
+        ({"urgent": 20}, {}, {"default": (20, 60)}),
+        ({"urgent": 20}, {}, {"default": (101, 20)}),
+        ({"Urgent": 20}, {"urgent": 10}, DEFAULT),
+        ({"Root": 20, "root": 30}, {}, DEFAULT),
+    ],
+)
+def test_rejects_invalid_rulesets(high, medium, thresholds):
+    with pytest.raises(ValueError):
+        RuleSet.build("t", high=high, medium=medium, thresholds=thresholds)
+
+
+def test_from_dict_reads_the_rules_file_format():
+    rules = RuleSet.from_dict({
+        "version": "v2",
+        "keywords": {"high": {"bypass": 25}, "medium": {"overnight": 5}},
+        "thresholds": {"default": {"high": 50, "medium": 10}},
+    })
+
+    assert rules.version == "v2"
+    assert rules.thresholds_for(None) == (50, 10)
+    assert classify_risk("bypass overnight", "", ruleset=rules).risk_score == 50
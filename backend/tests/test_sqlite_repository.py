@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.models import RequestStatus
+from app.pagination import PageParams, RequestFilters
+from app.repositories.sqlite import SQLiteRepository
+
+USER = "11111111-1111-1111-1111-111111111111"
+
+
+@pytest.fixture
+def repo():
+    repository = SQLiteRepository()
+    asyncio.run(repository.upsert_profile({"id": USER, "email": "user@example.com"}))
+    yield repository
+    asyncio.run(repository.close())
+
+
+def _create(repo, status="ESCALATED", created_at="2026-01-01T00:00:00+00:00", **fields):
+    request = {
+        "id": str(uuid.uuid4()),
+        "title": "Projector for the offsite",
+        "description": "Need one projector for two days",
+        "request_type": "equipment_checkout",
+        "requester_id": USER,
+        "requester_email": "user@example.com",
+        "status": status,
+        "created_at": created_at,
+        **fields,
+    }
+    return asyncio.run(repo.create_request(request, [{"action": "SUBMITTED", "performed_by": USER}]))
+
+
+def _audit_actions(repo, request_id):
+    rows = repo._all("SELECT action FROM audit_logs WHERE request_id = ?", [request_id])
+    return sorted(row["action"] for row in rows)
+
+
+def test_decide_request_applies_once(repo):
+    request = _create(repo)
+
+    first = asyncio.run(repo.decide_request(request["id"], "APPROVED", "admin@x", "ok", {}))
+    again = asyncio.run(repo.decide_request(request["id"], "REJECTED", "admin@x", "no", {}))
+
+    assert first["outcome"] == "applied"
+    assert first["request"]["status"] == "APPROVED"
+    assert again == {"outcome": "wrong_state", "status": "APPROVED"}
+    assert _audit_actions(repo, request["id"]) == ["APPROVED", "SUBMITTED"]
+
+
+def test_decide_request_unknown_id(repo):
+    result = asyncio.run(repo.decide_request(str(uuid.uuid4()), "APPROVED", "a", None, {}))
+
+    assert result == {"outcome": "not_found"}
+
+
+def test_decide_requests_reports_per_id_outcomes(repo):
+    open_request = _create(repo, status="PENDING")
+    decided = _create(repo, status="REJECTED")
+    missing = str(uuid.uuid4())
+
+    applied, current = asyncio.run(repo.decide_requests(
+        [open_request["id"], decided["id"], missing],
+        "APPROVED", "admin@x", "bulk", {"bulk": True},
+    ))
+
+    assert list(applied) == [open_request["id"]]
+    assert current == {decided["id"]: "REJECTED"}
+    assert _audit_actions(repo, open_request["id"]) == ["APPROVED", "SUBMITTED"]
+    assert _audit_actions(repo, decided["id"]) == ["SUBMITTED"]
+
+
+def test_keyset_pages_cover_every_row_once(repo):
+    # Two rows share each timestamp, so the id tiebreak matters
+    ids = {
+        _create(repo, created_at=f"2026-01-0{day}T00:00:00+00:00")["id"]
+        for day in (1, 1, 2, 2, 3)
+    }
+    seen, cursor = [], None
+    while True:
+        page = PageParams(limit=2, cursor=cursor)
+        rows, cursor = page.split(asyncio.run(repo.list_requests(RequestFilters(), page)))
+        seen.extend(rows)
+        if cursor is None:
+            break
+
+    assert {row["id"] for row in seen} == ids
+    assert len(seen) == len(ids)
+    keys = [(row["created_at"], row["id"]) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_unpaged_list_applies_filters(repo):
+    _create(repo, status="APPROVED")
+    escalated = _create(repo, status="ESCALATED")
+
+    rows = asyncio.run(repo.list_requests(
+        RequestFilters(status=[RequestStatus.ESCALATED]), PageParams()
+    ))
+
+    assert [row["id"] for row in rows] == [escalated["id"]]
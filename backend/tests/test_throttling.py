@@ -0,0 +1,65 @@
+import pytest
+
+from app.throttling import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _limiter(clock, max_keys=100) -> RateLimiter:
+    # 2 requests per 10 seconds: one token back every 5 seconds
+    return RateLimiter({"submit": (2, 10.0)}, max_keys=max_keys, timer=clock)
+
+
+def test_allows_a_burst_up_to_capacity_then_throttles():
+    limiter = _limiter(FakeClock())
+
+    assert limiter.acquire("u1", "submit") == 0
+    assert limiter.acquire("u1", "submit") == 0
+    assert limiter.acquire("u1", "submit") == pytest.approx(5.0)
+    assert limiter.throttled["submit"] == 1
+
+
+def test_refills_at_the_configured_rate():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    limiter.acquire("u1", "submit")
+    limiter.acquire("u1", "submit")
+
+    clock.now = 2.5
+    assert limiter.acquire("u1", "submit") == pytest.approx(2.5)
+    clock.now = 5.0
+    assert limiter.acquire("u1", "submit") == 0
+
+
+def test_refill_is_capped_at_capacity():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    limiter.acquire("u1", "submit")
+
+    clock.now = 1000
+    assert limiter.acquire("u1", "submit") == 0
+    assert limiter.acquire("u1", "submit") == 0
+    assert limiter.acquire("u1", "submit") > 0
+
+
+def test_buckets_are_per_user_and_unknown_limits_are_free():
+    limiter = _limiter(FakeClock())
+    limiter.acquire("u1", "submit")
+    limiter.acquire("u1", "submit")
+
+    assert limiter.acquire("u2", "submit") == 0
+    assert limiter.acquire("u1", "unlisted") == 0
+
+
+def test_drops_the_idlest_buckets_beyond_max_keys():
+    limiter = _limiter(FakeClock(), max_keys=2)
+    for user in ("u1", "u2", "u3"):
+        limiter.acquire(user, "submit")
+
+    assert limiter.stats()["buckets"] == 2
@@ -0,0 +1,101 @@
+-- EXPLAIN ANALYZE of the API's hot queries, as issued through PostgREST.
+-- Run after seed.sql; see run.sh for the before/after comparison.
+
+-- Keep going on errors: the pre-migration RLS policies on profiles recurse
+-- into themselves, and that failure is part of the "before" picture.
+\set ON_ERROR_STOP off
+\pset pager off
+
+\echo '== GET /requests/ (power user, first page) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM requests
+WHERE requester_id = md5('user1')::uuid
+ORDER BY created_at DESC, id DESC
+LIMIT 51;
+
+\echo '== GET /admin/requests (open queue, full list) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM requests
+WHERE status IN ('PENDING', 'ESCALATED')
+ORDER BY created_at DESC;
+
+\echo '== GET /admin/requests (open queue, first page) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM requests
+WHERE status IN ('PENDING', 'ESCALATED')
+ORDER BY created_at DESC, id DESC
+LIMIT 51;
+
+\echo '== GET /logs/ (admin, first page) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM audit_logs
+ORDER BY created_at DESC, id DESC
+LIMIT 51;
+
+-- user1 owns ~4% of requests (20k at the default volume). Before migration
+-- 005 the API fetched all of their request ids and sent them back as an
+-- IN (...) list; the sub-select here is the best case of that shape.
+\echo '== GET /logs/ (admin, page from a year back) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM audit_logs
+WHERE created_at <= NOW() - interval '1 year'
+  AND (created_at < NOW() - interval '1 year'
+       OR (created_at = NOW() - interval '1 year' AND id < 'ffffffff-ffff-ffff-ffff-ffffffffffff'))
+ORDER BY created_at DESC, id DESC
+LIMIT 51;
+
+\echo '== GET /logs/ (power user, request-id list, first page) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM audit_logs
+WHERE request_id IN (SELECT id FROM requests WHERE requester_id = md5('user1')::uuid)
+ORDER BY created_at DESC, id DESC
+LIMIT 51;
+
+\echo '== GET /logs/ (power user, requester_id, first page) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM audit_logs
+WHERE requester_id = md5('user1')::uuid
+ORDER BY created_at DESC, id DESC
+LIMIT 51;
+
+\echo '== GET /logs/ (power user, requester_id, page from a year back) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM audit_logs
+WHERE requester_id = md5('user1')::uuid
+  AND created_at <= NOW() - interval '1 year'
+  AND (created_at < NOW() - interval '1 year'
+       OR (created_at = NOW() - interval '1 year' AND id < 'ffffffff-ffff-ffff-ffff-ffffffffffff'))
+ORDER BY created_at DESC, id DESC
+LIMIT 51;
+
+\echo '== RLS: authenticated user counting visible requests =='
+BEGIN;
+SET LOCAL ROLE authenticated;
+SELECT set_config('request.jwt.claim.sub', md5('user2')::uuid::text, true);
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT count(*) FROM requests;
+ROLLBACK;
+
+\echo '== RLS: admin reading the open queue =='
+BEGIN;
+SET LOCAL ROLE authenticated;
+SELECT set_config('request.jwt.claim.sub', md5('user0')::uuid::text, true);
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM requests
+WHERE status IN ('PENDING', 'ESCALATED')
+ORDER BY created_at DESC
+LIMIT 51;
+ROLLBACK;
+
+\echo '== GET /admin/requests/search (term in every request, first page) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM search_requests('meeting', p_limit => 51, p_summary => TRUE);
+
+\echo '== GET /admin/requests/search (term in one request) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM search_requests('12345', p_limit => 51, p_summary => TRUE);
+
+\echo '== GET /requests/search (power user, term in every request) =='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM search_requests('meeting', p_requester_id => md5('user1')::uuid,
+                              p_limit => 51, p_summary => TRUE);
@@ -0,0 +1,38 @@
+#!/usr/bin/env bash
+# Reproducible query-plan benchmark against a throwaway local Postgres.
+#
+#   database/bench/run.sh [psql connection options, e.g. -h localhost -U postgres]
+#
+# Creates $BENCH_DB (dropped first), loads Supabase stubs + schema.sql, seeds
+# $USERS users / $REQUESTS requests, and records EXPLAIN ANALYZE output before
+# and after applying database/migrations/ into $OUT_DIR.
+set -euo pipefail
+
+here="$(cd "$(dirname "$0")" && pwd)"
+db="${BENCH_DB:-approvals_bench}"
+out="${OUT_DIR:-$here/results}"
+mkdir -p "$out"
+
+dropdb --if-exists "$@" "$db"
+createdb "$@" "$db"
+run() { psql -X -q -v ON_ERROR_STOP=1 "$@"; }
+
+run "$@" -d "$db" -f "$here/supabase_stubs.sql"
+run "$@" -d "$db" -f "$here/../schema.sql"
+echo "Seeding ${REQUESTS:-500000} requests..."
+run "$@" -d "$db" -v users="${USERS:-5000}" -v requests="${REQUESTS:-500000}" -f "$here/seed.sql"
+
+explain() { psql -X -q "$@" -f "$here/explain_hot_paths.sql" 2>&1; }
+
+explain "$@" -d "$db" > "$out/before.txt"
+for migration in "$here"/../migrations/*.sql; do
+  run "$@" -d "$db" -f "$migration"
+done
+explain "$@" -d "$db" > "$out/after.txt"
+
+echo "Execution times (before -> after):"
+paste -d' ' \
+  <(grep -E '^== |Execution Time|ERROR' "$out/before.txt") \
+  <(grep -E '^== |Execution Time|ERROR' "$out/after.txt" | sed 's/^== .*//') \
+  | sed 's/  */ /g'
+echo "Full plans in $out/before.txt and $out/after.txt"
@@ -0,0 +1,86 @@
+-- Seed realistic volumes for query-plan benchmarks (local Postgres only).
+--
+--   psql -v users=5000 -v requests=500000 -f seed.sql
+--
+-- Ids are derived from md5() so benchmark queries can name them:
+--   md5('user0')::uuid  an admin
+--   md5('user1')::uuid  a power user owning ~4% of all requests
+
+\set ON_ERROR_STOP on
+\if :{?users}
+\else
+  \set users 5000
+\endif
+\if :{?requests}
+\else
+  \set requests 500000
+\endif
+
+-- The on_auth_user_created trigger creates the matching profiles rows
+INSERT INTO auth.users (id, email, raw_user_meta_data)
+SELECT md5('user' || g)::uuid,
+       'user' || g || '@example.com',
+       jsonb_build_object('full_name', 'User ' || g)
+FROM generate_series(0, :users - 1) AS g
+ON CONFLICT (id) DO NOTHING;
+
+UPDATE profiles SET role = 'admin'
+WHERE id IN (SELECT md5('user' || g)::uuid FROM generate_series(0, 4) AS g);
+
+-- ~3% ESCALATED, ~1% PENDING, the rest decided; two years of history
+INSERT INTO requests (
+  id, title, description, request_type, requester_id, requester_email,
+  status, risk_level, risk_score, risk_factors, decision_reason, decided_by,
+  created_at, updated_at
+)
+SELECT md5('req' || g)::uuid,
+       'Request ' || g,
+       repeat('Please book the room for our weekly team meeting. ', 1 + g % 20),
+       (ARRAY['room_booking', 'access_permission', 'equipment_checkout', 'other'])[1 + g % 4],
+       owner.id,
+       'user' || owner.n || '@example.com',
+       CASE WHEN g % 33 = 0 THEN 'ESCALATED'
+            WHEN g % 97 = 0 THEN 'PENDING'
+            WHEN g % 11 = 0 THEN 'REJECTED'
+            ELSE 'APPROVED' END,
+       CASE WHEN g % 33 = 0 THEN 'HIGH' WHEN g % 5 = 0 THEN 'MEDIUM' ELSE 'LOW' END,
+       CASE WHEN g % 33 = 0 THEN 60 WHEN g % 5 = 0 THEN 20 ELSE 0 END,
+       CASE WHEN g % 33 = 0 THEN '["urgent"]'::jsonb ELSE '[]'::jsonb END,
+       CASE WHEN g % 33 = 0 OR g % 97 = 0 THEN NULL ELSE 'Seeded decision' END,
+       CASE WHEN g % 33 = 0 OR g % 97 = 0 THEN NULL ELSE 'system' END,
+       ts.created_at,
+       ts.created_at
+FROM generate_series(1, :requests) AS g
+CROSS JOIN LATERAL (
+  SELECT CASE WHEN g % 25 = 0 THEN 1 ELSE 2 + g % (:users - 2) END AS n
+) AS owner_n
+CROSS JOIN LATERAL (
+  SELECT md5('user' || owner_n.n)::uuid AS id, owner_n.n AS n
+) AS owner
+CROSS JOIN LATERAL (
+  SELECT NOW() - (interval '2 years') * ((:requests - g)::float / :requests) AS created_at
+) AS ts
+ON CONFLICT (id) DO NOTHING;
+
+-- Two audit rows per request: SUBMITTED plus the decision or escalation
+INSERT INTO audit_logs (request_id, action, performed_by, performed_by_role, details, created_at)
+SELECT r.id, 'SUBMITTED', r.requester_email, 'user',
+       jsonb_build_object('request_type', r.request_type), r.created_at
+FROM requests r
+UNION ALL
+SELECT r.id,
+       CASE r.status WHEN 'APPROVED' THEN 'AUTO_APPROVED'
+                     WHEN 'REJECTED' THEN 'REJECTED'
+                     ELSE 'ESCALATED' END,
+       r.requester_email, 'user',
+       jsonb_build_object('risk_level', r.risk_level, 'risk_score', r.risk_score),
+       r.created_at + interval '1 second'
+FROM requests r;
+
+-- Supabase grants these to the API roles by default
+GRANT USAGE ON SCHEMA public TO anon, authenticated, service_role;
+GRANT SELECT ON ALL TABLES IN SCHEMA public TO authenticated, service_role;
+
+VACUUM ANALYZE profiles;
+VACUUM ANALYZE requests;
+VACUUM ANALYZE audit_logs;
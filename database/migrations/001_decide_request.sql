@@ -0,0 +1,48 @@
+-- Atomic approve/reject: one conditional UPDATE plus its audit row, in a
+-- single transaction and a single PostgREST round trip.
+--
+-- Returns {"outcome": "applied", "request": {...}} when the request was open,
+-- otherwise {"outcome": "not_found"} or {"outcome": "wrong_state", "status": ...}.
+CREATE OR REPLACE FUNCTION decide_request(
+  p_request_id UUID,
+  p_status TEXT,
+  p_decided_by TEXT,
+  p_reason TEXT,
+  p_audit_details JSONB DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_row requests;
+  v_current TEXT;
+BEGIN
+  IF p_status NOT IN ('APPROVED', 'REJECTED') THEN
+    RAISE EXCEPTION 'invalid decision status: %', p_status;
+  END IF;
+
+  UPDATE requests
+     SET status = p_status,
+         decided_by = p_decided_by,
+         decision_reason = p_reason,
+         updated_at = NOW()
+   WHERE id = p_request_id
+     AND status IN ('PENDING', 'ESCALATED')
+  RETURNING * INTO v_row;
+
+  IF NOT FOUND THEN
+    SELECT status INTO v_current FROM requests WHERE id = p_request_id;
+    IF v_current IS NULL THEN
+      RETURN jsonb_build_object('outcome', 'not_found');
+    END IF;
+    RETURN jsonb_build_object('outcome', 'wrong_state', 'status', v_current);
+  END IF;
+
+  INSERT INTO audit_logs (request_id, action, performed_by, performed_by_role, details)
+  VALUES (p_request_id, p_status, p_decided_by, 'admin', p_audit_details);
+
+  RETURN jsonb_build_object('outcome', 'applied', 'request', to_jsonb(v_row));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may call it through the API
+REVOKE EXECUTE ON FUNCTION decide_request(UUID, TEXT, TEXT, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION decide_request(UUID, TEXT, TEXT, TEXT, JSONB) TO service_role;
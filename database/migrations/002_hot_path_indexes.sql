@@ -0,0 +1,76 @@
+-- Indexes for the API's hot access paths, plus a cached admin check for RLS.
+--
+-- On a large live table, run each CREATE INDEX as CREATE INDEX CONCURRENTLY
+-- (outside a transaction) to avoid blocking writes while it builds.
+
+-- GET /requests/ : own requests, newest first (keyset on created_at, id)
+CREATE INDEX IF NOT EXISTS idx_requests_requester_created
+  ON requests (requester_id, created_at DESC, id DESC);
+
+-- GET /admin/requests : the open queue is a small slice of the table, so a
+-- partial index keeps it tiny and avoids scanning decided rows
+CREATE INDEX IF NOT EXISTS idx_requests_open_created
+  ON requests (created_at DESC, id DESC)
+  WHERE status IN ('PENDING', 'ESCALATED');
+
+-- GET /logs/ (non-admin) : logs of a given set of requests, newest first
+CREATE INDEX IF NOT EXISTS idx_audit_logs_request_created
+  ON audit_logs (request_id, created_at DESC);
+
+-- GET /logs/ (admin) : whole table, newest first (keyset on created_at, id)
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created
+  ON audit_logs (created_at DESC, id DESC);
+
+-- RLS: the previous policies ran EXISTS (SELECT 1 FROM profiles ...) for
+-- every candidate row. is_admin() is STABLE and wrapped in a scalar
+-- sub-select below, so the planner evaluates it once per statement (an
+-- InitPlan). SECURITY DEFINER also stops the profiles policy from
+-- recursing into itself.
+CREATE OR REPLACE FUNCTION public.is_admin()
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT EXISTS (SELECT 1 FROM profiles WHERE id = auth.uid() AND role = 'admin');
+$$;
+
+DROP POLICY IF EXISTS "Admins can view all profiles" ON profiles;
+CREATE POLICY "Admins can view all profiles" ON profiles FOR SELECT
+  USING ((SELECT public.is_admin()));
+
+DROP POLICY IF EXISTS "Users can view own requests" ON requests;
+CREATE POLICY "Users can view own requests" ON requests FOR SELECT
+  USING ((SELECT auth.uid()) = requester_id);
+
+DROP POLICY IF EXISTS "Admins can view all requests" ON requests;
+CREATE POLICY "Admins can view all requests" ON requests FOR SELECT
+  USING ((SELECT public.is_admin()));
+
+DROP POLICY IF EXISTS "Admins can update requests" ON requests;
+CREATE POLICY "Admins can update requests" ON requests FOR UPDATE
+  USING ((SELECT public.is_admin()));
+
+-- This policy had no role, so USING (true) applied to everyone and was
+-- OR-ed into every request query (defeating both RLS and the indexes above).
+-- The service role already bypasses RLS; keep the policy scoped to it.
+DROP POLICY IF EXISTS "Service role can manage requests" ON requests;
+CREATE POLICY "Service role can manage requests" ON requests TO service_role
+  USING (true);
+
+DROP POLICY IF EXISTS "Users can view own audit logs" ON audit_logs;
+CREATE POLICY "Users can view own audit logs" ON audit_logs FOR SELECT USING (
+  EXISTS (
+    SELECT 1 FROM requests
+    WHERE requests.id = audit_logs.request_id
+      AND requests.requester_id = (SELECT auth.uid())
+  )
+);
+
+DROP POLICY IF EXISTS "Admins can view all audit logs" ON audit_logs;
+CREATE POLICY "Admins can view all audit logs" ON audit_logs FOR SELECT
+  USING ((SELECT public.is_admin()));
+
+ANALYZE requests;
+ANALYZE audit_logs;
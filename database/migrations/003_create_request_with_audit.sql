@@ -0,0 +1,43 @@
+-- Atomic submission: the request row and its audit rows (AUTO_APPROVED or
+-- ESCALATED, plus SUBMITTED) in a single transaction and a single PostgREST
+-- round trip. Either everything is written or nothing is.
+--
+-- p_request is a requests row as JSON; p_audit_logs is a JSON array of
+-- audit_logs rows. Returns the created request row.
+CREATE OR REPLACE FUNCTION create_request_with_audit(
+  p_request JSONB,
+  p_audit_logs JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_new requests;
+  v_row requests;
+BEGIN
+  v_new := jsonb_populate_record(NULL::requests, p_request);
+
+  INSERT INTO requests (
+    id, title, description, request_type, requester_id, requester_email,
+    status, risk_level, risk_score, risk_factors, decision_reason, decided_by,
+    created_at, updated_at
+  )
+  VALUES (
+    COALESCE(v_new.id, uuid_generate_v4()), v_new.title, v_new.description,
+    v_new.request_type, v_new.requester_id, v_new.requester_email,
+    v_new.status, v_new.risk_level, v_new.risk_score,
+    COALESCE(v_new.risk_factors, '[]'), v_new.decision_reason, v_new.decided_by,
+    COALESCE(v_new.created_at, NOW()), COALESCE(v_new.updated_at, NOW())
+  )
+  RETURNING * INTO v_row;
+
+  INSERT INTO audit_logs (id, request_id, action, performed_by, performed_by_role, details, created_at)
+  SELECT COALESCE(a.id, uuid_generate_v4()), v_row.id, a.action, a.performed_by,
+         COALESCE(a.performed_by_role, 'user'), a.details, COALESCE(a.created_at, NOW())
+    FROM jsonb_populate_recordset(NULL::audit_logs, p_audit_logs) AS a;
+
+  RETURN to_jsonb(v_row);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may call it through the API
+REVOKE EXECUTE ON FUNCTION create_request_with_audit(JSONB, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION create_request_with_audit(JSONB, JSONB) TO service_role;
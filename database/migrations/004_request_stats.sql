@@ -0,0 +1,207 @@
+-- Rollup counters for GET /stats, kept current by a trigger on requests.
+--
+-- request_stats_totals   global counts per status x risk x type
+-- request_stats_by_user  per-requester counts per status x risk x type
+-- request_stats_daily    global counts per UTC day x status x risk x type
+--
+-- Reading totals or one user's rows costs the same however large requests
+-- grows; the daily series is only read for a bounded window. Statement-level
+-- triggers fold each insert, delete or change to a counted column into the
+-- counters inside the writing transaction, so counts never drift.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS request_stats_totals (
+  status TEXT NOT NULL,
+  risk_level TEXT NOT NULL,
+  request_type TEXT NOT NULL,
+  count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (status, risk_level, request_type)
+);
+
+CREATE TABLE IF NOT EXISTS request_stats_daily (
+  day DATE NOT NULL,
+  status TEXT NOT NULL,
+  risk_level TEXT NOT NULL,
+  request_type TEXT NOT NULL,
+  count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, status, risk_level, request_type)
+);
+
+-- No foreign key to profiles: deleting a profile cascades to its requests,
+-- and the delete trigger then decrements this user's rows after the profile
+-- is gone. Their counts drop to zero instead.
+CREATE TABLE IF NOT EXISTS request_stats_by_user (
+  requester_id UUID NOT NULL,
+  status TEXT NOT NULL,
+  risk_level TEXT NOT NULL,
+  request_type TEXT NOT NULL,
+  count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (requester_id, status, risk_level, request_type)
+);
+
+-- Databases that ran an earlier version of this migration have the key
+ALTER TABLE request_stats_by_user
+  DROP CONSTRAINT IF EXISTS request_stats_by_user_requester_id_fkey;
+
+-- Only the backend (service role) reads these
+ALTER TABLE request_stats_totals ENABLE ROW LEVEL SECURITY;
+ALTER TABLE request_stats_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE request_stats_by_user ENABLE ROW LEVEL SECURITY;
+
+-- Apply +/- p_delta for each row in p_rows, one grouped upsert per table
+CREATE OR REPLACE FUNCTION request_stats_apply(p_rows requests[], p_delta INTEGER)
+RETURNS VOID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  INSERT INTO request_stats_totals AS s (status, risk_level, request_type, count)
+  SELECT status, risk_level, request_type, COUNT(*) * p_delta
+    FROM unnest(p_rows)
+   GROUP BY 1, 2, 3
+  ON CONFLICT (status, risk_level, request_type)
+  DO UPDATE SET count = s.count + EXCLUDED.count;
+
+  INSERT INTO request_stats_daily AS s (day, status, risk_level, request_type, count)
+  SELECT (created_at AT TIME ZONE 'UTC')::date, status, risk_level, request_type, COUNT(*) * p_delta
+    FROM unnest(p_rows)
+   GROUP BY 1, 2, 3, 4
+  ON CONFLICT (day, status, risk_level, request_type)
+  DO UPDATE SET count = s.count + EXCLUDED.count;
+
+  INSERT INTO request_stats_by_user AS s (requester_id, status, risk_level, request_type, count)
+  SELECT requester_id, status, risk_level, request_type, COUNT(*) * p_delta
+    FROM unnest(p_rows)
+   GROUP BY 1, 2, 3, 4
+  ON CONFLICT (requester_id, status, risk_level, request_type)
+  DO UPDATE SET count = s.count + EXCLUDED.count;
+$$;
+
+-- Statement-level, so a bulk write touches each counter row once rather
+-- than once per request. SECURITY DEFINER: users inserting through RLS
+-- can't write the stats tables themselves.
+CREATE OR REPLACE FUNCTION request_stats_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_old requests[];
+  v_new requests[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    v_new := ARRAY(SELECT n FROM new_rows n);
+  ELSIF TG_OP = 'DELETE' THEN
+    v_old := ARRAY(SELECT o FROM old_rows o);
+  ELSE
+    -- Only rows whose counted columns changed (not e.g. updated_at)
+    v_old := ARRAY(
+      SELECT o FROM old_rows o JOIN new_rows n USING (id)
+       WHERE (o.status, o.risk_level, o.request_type, o.requester_id,
+              (o.created_at AT TIME ZONE 'UTC')::date)
+             IS DISTINCT FROM
+             (n.status, n.risk_level, n.request_type, n.requester_id,
+              (n.created_at AT TIME ZONE 'UTC')::date)
+    );
+    v_new := ARRAY(
+      SELECT n FROM new_rows n
+       WHERE n.id = ANY (SELECT (o).id FROM unnest(v_old) o)
+    );
+  END IF;
+
+  IF cardinality(v_old) > 0 THEN
+    PERFORM request_stats_apply(v_old, -1);
+  END IF;
+  IF cardinality(v_new) > 0 THEN
+    PERFORM request_stats_apply(v_new, 1);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION request_stats_apply(requests[], INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- One-round-trip summary for the API. With p_requester_id, counts for that
+-- requester; otherwise global counts plus a per-day series for the last
+-- p_days days.
+CREATE OR REPLACE FUNCTION request_stats_summary(
+  p_requester_id UUID DEFAULT NULL,
+  p_days INTEGER DEFAULT 30
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  WITH counts AS (
+    SELECT status, risk_level, request_type, count
+      FROM request_stats_by_user
+     WHERE p_requester_id IS NOT NULL AND requester_id = p_requester_id
+    UNION ALL
+    SELECT status, risk_level, request_type, count
+      FROM request_stats_totals
+     WHERE p_requester_id IS NULL
+  )
+  SELECT jsonb_build_object(
+    'total', (SELECT COALESCE(SUM(count), 0) FROM counts),
+    'by_status', (SELECT COALESCE(jsonb_object_agg(status, n), '{}')
+                    FROM (SELECT status, SUM(count) n FROM counts GROUP BY 1 HAVING SUM(count) > 0) x),
+    'by_risk_level', (SELECT COALESCE(jsonb_object_agg(risk_level, n), '{}')
+                        FROM (SELECT risk_level, SUM(count) n FROM counts GROUP BY 1 HAVING SUM(count) > 0) x),
+    'by_request_type', (SELECT COALESCE(jsonb_object_agg(request_type, n), '{}')
+                          FROM (SELECT request_type, SUM(count) n FROM counts GROUP BY 1 HAVING SUM(count) > 0) x),
+    'daily', CASE WHEN p_requester_id IS NULL THEN (
+      SELECT COALESCE(jsonb_agg(jsonb_build_object('day', day, 'count', n) ORDER BY day), '[]')
+        FROM (SELECT day, SUM(count) n
+                FROM request_stats_daily
+               WHERE day > (NOW() AT TIME ZONE 'UTC')::date - p_days
+               GROUP BY day
+              HAVING SUM(count) > 0) d
+    ) ELSE '[]'::jsonb END
+  );
+$$;
+
+REVOKE EXECUTE ON FUNCTION request_stats_summary(UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION request_stats_summary(UUID, INTEGER) TO service_role;
+
+-- Block writes while the trigger is installed and the backfill runs, so no
+-- row is counted twice or missed
+LOCK TABLE requests IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS request_stats_inserted ON requests;
+CREATE TRIGGER request_stats_inserted
+  AFTER INSERT ON requests
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION request_stats_trigger();
+
+DROP TRIGGER IF EXISTS request_stats_updated ON requests;
+CREATE TRIGGER request_stats_updated
+  AFTER UPDATE ON requests
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION request_stats_trigger();
+
+DROP TRIGGER IF EXISTS request_stats_deleted ON requests;
+CREATE TRIGGER request_stats_deleted
+  AFTER DELETE ON requests
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION request_stats_trigger();
+
+TRUNCATE request_stats_totals, request_stats_daily, request_stats_by_user;
+
+INSERT INTO request_stats_totals (status, risk_level, request_type, count)
+SELECT status, risk_level, request_type, COUNT(*)
+  FROM requests
+ GROUP BY 1, 2, 3;
+
+INSERT INTO request_stats_daily (day, status, risk_level, request_type, count)
+SELECT (created_at AT TIME ZONE 'UTC')::date, status, risk_level, request_type, COUNT(*)
+  FROM requests
+ GROUP BY 1, 2, 3, 4;
+
+INSERT INTO request_stats_by_user (requester_id, status, risk_level, request_type, count)
+SELECT requester_id, status, risk_level, request_type, COUNT(*)
+  FROM requests
+ GROUP BY 1, 2, 3, 4;
+
+COMMIT;
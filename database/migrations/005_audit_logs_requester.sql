@@ -0,0 +1,58 @@
+-- Key audit logs by the owning requester, so GET /logs/ for a non-admin is
+-- one index range scan instead of "fetch every request id, then send them
+-- all back in an IN (...) list".
+--
+-- Audit logs never change owner (requests.requester_id is never updated),
+-- so the column is filled once on insert and needs no maintenance after.
+--
+-- The backfill rewrites every existing row; on a very large table run it
+-- during a quiet period.
+
+BEGIN;
+
+ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS requester_id UUID;
+
+-- Writers keep sending rows without requester_id; look it up on insert
+CREATE OR REPLACE FUNCTION audit_logs_set_requester()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF NEW.requester_id IS NULL THEN
+    SELECT requester_id INTO NEW.requester_id FROM requests WHERE id = NEW.request_id;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+-- Block inserts while the trigger is installed and the backfill runs
+LOCK TABLE audit_logs IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS audit_logs_set_requester ON audit_logs;
+CREATE TRIGGER audit_logs_set_requester
+  BEFORE INSERT ON audit_logs
+  FOR EACH ROW EXECUTE FUNCTION audit_logs_set_requester();
+
+UPDATE audit_logs a
+   SET requester_id = r.requester_id
+  FROM requests r
+ WHERE r.id = a.request_id
+   AND a.requester_id IS NULL;
+
+-- request_id is NOT NULL with a foreign key, so every row has an owner
+ALTER TABLE audit_logs ALTER COLUMN requester_id SET NOT NULL;
+
+-- GET /logs/ (non-admin) : one requester's logs, newest first (keyset)
+CREATE INDEX IF NOT EXISTS idx_audit_logs_requester_created
+  ON audit_logs (requester_id, created_at DESC, id DESC);
+
+-- Same simplification for direct (RLS) reads: no per-row join to requests
+DROP POLICY IF EXISTS "Users can view own audit logs" ON audit_logs;
+CREATE POLICY "Users can view own audit logs" ON audit_logs FOR SELECT
+  USING ((SELECT auth.uid()) = requester_id);
+
+COMMIT;
+
+ANALYZE audit_logs;
@@ -0,0 +1,41 @@
+-- Batch submission (POST /requests/batch): many requests and their audit
+-- rows in one transaction and one PostgREST round trip, as two multi-row
+-- INSERTs. The statement-level triggers (stats rollups) fire once per batch
+-- instead of once per request.
+--
+-- p_requests is a JSON array of complete requests rows; p_audit_logs is a
+-- JSON array of audit_logs rows for them. Returns the number of requests
+-- inserted.
+CREATE OR REPLACE FUNCTION create_requests_with_audit(
+  p_requests JSONB,
+  p_audit_logs JSONB
+)
+RETURNS INTEGER AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  INSERT INTO requests (
+    id, title, description, request_type, requester_id, requester_email,
+    status, risk_level, risk_score, risk_factors, decision_reason, decided_by,
+    created_at, updated_at
+  )
+  SELECT COALESCE(r.id, uuid_generate_v4()), r.title, r.description,
+         r.request_type, r.requester_id, r.requester_email,
+         r.status, r.risk_level, r.risk_score,
+         COALESCE(r.risk_factors, '[]'), r.decision_reason, r.decided_by,
+         COALESCE(r.created_at, NOW()), COALESCE(r.updated_at, NOW())
+    FROM jsonb_populate_recordset(NULL::requests, p_requests) AS r;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+
+  INSERT INTO audit_logs (id, request_id, action, performed_by, performed_by_role, details, created_at)
+  SELECT COALESCE(a.id, uuid_generate_v4()), a.request_id, a.action, a.performed_by,
+         COALESCE(a.performed_by_role, 'user'), a.details, COALESCE(a.created_at, NOW())
+    FROM jsonb_populate_recordset(NULL::audit_logs, p_audit_logs) AS a;
+
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may call it through the API
+REVOKE EXECUTE ON FUNCTION create_requests_with_audit(JSONB, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION create_requests_with_audit(JSONB, JSONB) TO service_role;
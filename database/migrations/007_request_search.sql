@@ -0,0 +1,196 @@
+-- Full-text search over request titles and descriptions, for
+-- GET /requests/search and GET /admin/requests/search.
+--
+-- request_search holds one weighted tsvector per request (title A,
+-- description B) with a GIN index, kept current by triggers on requests.
+-- It is a side table rather than a requests column so that select=* reads
+-- and the functions returning requests rows don't carry the vector to the
+-- API. created_at is copied alongside (it never changes) so the newest
+-- matches can be found by walking an index instead of sorting them all.
+--
+-- search_requests ranks at most p_window matches: the newest ones. A rare
+-- term ranks all of its matches via the GIN index; a common one stops after
+-- p_window rows in created_at order. Either way a search touches a bounded
+-- number of rows however large requests grows. Filters on requests columns
+-- walk that table's indexes (requester, open queue); risk_level and
+-- request_type have none, so filtering on them alone reads the whole table.
+--
+-- The backfill and index builds block writes to requests while they run.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS request_search (
+  request_id UUID PRIMARY KEY REFERENCES requests(id) ON DELETE CASCADE,
+  created_at TIMESTAMPTZ,
+  document TSVECTOR NOT NULL
+);
+
+-- Only the backend (service role) reads it
+ALTER TABLE request_search ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION request_search_document(p_title TEXT, p_description TEXT)
+RETURNS TSVECTOR
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT setweight(to_tsvector('english', COALESCE(p_title, '')), 'A')
+      || setweight(to_tsvector('english', COALESCE(p_description, '')), 'B');
+$$;
+
+-- Statement-level for inserts, so a batch import indexes its rows with one
+-- INSERT; row-level for the (rare) edits of title or description.
+CREATE OR REPLACE FUNCTION request_search_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_LEVEL = 'STATEMENT' THEN
+    INSERT INTO request_search (request_id, created_at, document)
+    SELECT id, created_at, request_search_document(title, description)
+      FROM new_rows;
+  ELSE
+    UPDATE request_search
+       SET document = request_search_document(NEW.title, NEW.description)
+     WHERE request_id = NEW.id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- Ranked search. Filters left NULL are not applied; the query is built per
+-- call so each one gets a plan for the filters it actually uses. Returns
+-- requests rows as JSON with a "search_rank" key (without "description"
+-- when p_summary), best first, after the (rank, created_at, id) keyset.
+CREATE OR REPLACE FUNCTION search_requests(
+  p_query TEXT,
+  p_requester_id UUID DEFAULT NULL,
+  p_status TEXT[] DEFAULT NULL,
+  p_risk_level TEXT[] DEFAULT NULL,
+  p_request_type TEXT[] DEFAULT NULL,
+  p_created_from TIMESTAMPTZ DEFAULT NULL,
+  p_created_to TIMESTAMPTZ DEFAULT NULL,
+  p_after_rank REAL DEFAULT NULL,
+  p_after_created_at TIMESTAMPTZ DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 51,
+  p_window INTEGER DEFAULT 1000,
+  p_summary BOOLEAN DEFAULT FALSE
+)
+RETURNS SETOF JSONB
+LANGUAGE plpgsql
+STABLE
+-- Each search reads a few hundred rows; starting parallel workers would
+-- cost more than the scan itself
+SET max_parallel_workers_per_gather = 0
+AS $$
+DECLARE
+  v_query TSQUERY := websearch_to_tsquery('english', p_query);
+  v_where TEXT := 's.document @@ $1';
+  -- requests is only joined to filter on its columns; then the newest
+  -- matches come from a requests index (per requester, open queue) instead
+  -- of the side table's
+  v_join TEXT := '';
+  v_order TEXT := 's.created_at DESC, s.request_id DESC';
+BEGIN
+  -- Nothing searchable (e.g. only stop words)
+  IF numnode(v_query) = 0 THEN
+    RETURN;
+  END IF;
+
+  IF p_requester_id IS NOT NULL THEN
+    v_where := v_where || ' AND r.requester_id = $2';
+  END IF;
+  IF p_status IS NOT NULL THEN
+    v_where := v_where || ' AND r.status = ANY ($3)';
+  END IF;
+  IF p_risk_level IS NOT NULL THEN
+    v_where := v_where || ' AND r.risk_level = ANY ($4)';
+  END IF;
+  IF p_request_type IS NOT NULL THEN
+    v_where := v_where || ' AND r.request_type = ANY ($5)';
+  END IF;
+  IF p_created_from IS NOT NULL THEN
+    v_where := v_where || ' AND s.created_at >= $6';
+  END IF;
+  IF p_created_to IS NOT NULL THEN
+    v_where := v_where || ' AND s.created_at < $7';
+  END IF;
+  IF p_requester_id IS NOT NULL OR p_status IS NOT NULL
+     OR p_risk_level IS NOT NULL OR p_request_type IS NOT NULL THEN
+    v_join := 'JOIN requests r ON r.id = s.request_id';
+    v_order := 'r.created_at DESC, r.id DESC';
+  END IF;
+
+  RETURN QUERY EXECUTE format($query$
+    WITH candidates AS (
+      SELECT s.request_id, s.created_at, s.document
+        FROM request_search s
+        %s
+       WHERE %s
+       ORDER BY %s
+       LIMIT $12
+    ), ranked AS (
+      SELECT request_id, created_at, ts_rank(document, $1) AS rank
+        FROM candidates
+    ), page AS (
+      SELECT request_id, rank
+        FROM ranked
+       WHERE $8 IS NULL OR (rank, created_at, request_id) < ($8, $9, $10)
+       ORDER BY rank DESC, created_at DESC, request_id DESC
+       LIMIT $11
+    )
+    SELECT CASE WHEN $13 THEN to_jsonb(r) - 'description' ELSE to_jsonb(r) END
+           || jsonb_build_object('search_rank', p.rank)
+      FROM page p
+      JOIN requests r ON r.id = p.request_id
+     ORDER BY p.rank DESC, r.created_at DESC, r.id DESC
+  $query$, v_join, v_where, v_order)
+  USING v_query, p_requester_id, p_status, p_risk_level, p_request_type,
+        p_created_from, p_created_to, p_after_rank, p_after_created_at,
+        p_after_id, p_limit, p_window, p_summary;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION search_requests(
+  TEXT, UUID, TEXT[], TEXT[], TEXT[], TIMESTAMPTZ, TIMESTAMPTZ, REAL, TIMESTAMPTZ,
+  UUID, INTEGER, INTEGER, BOOLEAN
+) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION search_requests(
+  TEXT, UUID, TEXT[], TEXT[], TEXT[], TIMESTAMPTZ, TIMESTAMPTZ, REAL, TIMESTAMPTZ,
+  UUID, INTEGER, INTEGER, BOOLEAN
+) TO service_role;
+
+-- Block writes while the triggers are installed and the backfill runs, so
+-- no request is indexed twice or missed
+LOCK TABLE requests IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS request_search_inserted ON requests;
+CREATE TRIGGER request_search_inserted
+  AFTER INSERT ON requests
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION request_search_trigger();
+
+DROP TRIGGER IF EXISTS request_search_updated ON requests;
+CREATE TRIGGER request_search_updated
+  AFTER UPDATE OF title, description ON requests
+  FOR EACH ROW
+  WHEN (OLD.title IS DISTINCT FROM NEW.title OR OLD.description IS DISTINCT FROM NEW.description)
+  EXECUTE FUNCTION request_search_trigger();
+
+INSERT INTO request_search (request_id, created_at, document)
+SELECT id, created_at, request_search_document(title, description)
+  FROM requests
+ON CONFLICT (request_id) DO NOTHING;
+
+-- Built after the backfill, which is much faster than maintaining them row
+-- by row during it
+CREATE INDEX IF NOT EXISTS idx_request_search_document
+  ON request_search USING GIN (document);
+CREATE INDEX IF NOT EXISTS idx_request_search_created
+  ON request_search (created_at DESC, request_id DESC);
+
+COMMIT;
+
+ANALYZE request_search;
@@ -0,0 +1,80 @@
+-- Change counters for conditional GETs (ETag / If-None-Match) on
+-- GET /requests/, GET /admin/requests and GET /logs/.
+--
+-- change_versions holds one counter per listing scope, bumped in the same
+-- transaction as the write:
+--
+--   requests              any request inserted, updated or deleted
+--   requests:<user id>    one of that user's requests
+--   audit_logs            any audit log inserted
+--   audit_logs:<user id>  a log of one of that user's requests
+--
+-- The API reads the counter of the scope it lists (a primary-key lookup)
+-- before the rows and answers 304 while it is unchanged, so an unchanged
+-- list costs that one query. Triggers are statement-level: a batch import
+-- or bulk decision bumps each scope once. Every write to requests also
+-- updates the "requests" row, so concurrent writers queue on it until they
+-- commit; the API's writes are single short statements or functions.
+--
+-- Needs migration 005 (audit_logs.requester_id).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS change_versions (
+  scope TEXT PRIMARY KEY,
+  version BIGINT NOT NULL
+);
+
+-- Only the backend (service role) reads it
+ALTER TABLE change_versions ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION bump_change_versions()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  -- In scope order, so two writers lock the rows in the same order
+  INSERT INTO change_versions AS v (scope, version)
+  SELECT scope, 1
+    FROM (
+      SELECT TG_TABLE_NAME AS scope
+       WHERE EXISTS (SELECT 1 FROM changed_rows)
+      UNION
+      SELECT DISTINCT TG_TABLE_NAME || ':' || requester_id
+        FROM changed_rows
+       WHERE requester_id IS NOT NULL
+    ) scopes
+   ORDER BY scope
+  ON CONFLICT (scope) DO UPDATE SET version = v.version + 1;
+  RETURN NULL;
+END;
+$$;
+
+-- A trigger with a transition table handles a single event, hence one each
+DROP TRIGGER IF EXISTS requests_version_inserted ON requests;
+CREATE TRIGGER requests_version_inserted
+  AFTER INSERT ON requests
+  REFERENCING NEW TABLE AS changed_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_change_versions();
+
+DROP TRIGGER IF EXISTS requests_version_updated ON requests;
+CREATE TRIGGER requests_version_updated
+  AFTER UPDATE ON requests
+  REFERENCING NEW TABLE AS changed_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_change_versions();
+
+DROP TRIGGER IF EXISTS requests_version_deleted ON requests;
+CREATE TRIGGER requests_version_deleted
+  AFTER DELETE ON requests
+  REFERENCING OLD TABLE AS changed_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_change_versions();
+
+DROP TRIGGER IF EXISTS audit_logs_version_inserted ON audit_logs;
+CREATE TRIGGER audit_logs_version_inserted
+  AFTER INSERT ON audit_logs
+  REFERENCING NEW TABLE AS changed_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_change_versions();
+
+COMMIT;
@@ -0,0 +1,57 @@
+-- Atomic bulk approve/reject for PUT /admin/requests/bulk: one conditional
+-- UPDATE of every still-open request plus an audit row for each, in a
+-- single transaction. The ids travel in the RPC body, so up to 500 of them
+-- don't make an oversized query string as an id=in.(...) filter would.
+--
+-- Returns {"applied": [request rows], "current": {id: status}}, where
+-- "current" has the status of the other ids that exist.
+CREATE OR REPLACE FUNCTION decide_requests(
+  p_request_ids UUID[],
+  p_status TEXT,
+  p_decided_by TEXT,
+  p_reason TEXT,
+  p_audit_details JSONB DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_applied JSONB;
+  v_current JSONB;
+BEGIN
+  IF p_status NOT IN ('APPROVED', 'REJECTED') THEN
+    RAISE EXCEPTION 'invalid decision status: %', p_status;
+  END IF;
+
+  WITH updated AS (
+    UPDATE requests
+       SET status = p_status,
+           decided_by = p_decided_by,
+           decision_reason = p_reason,
+           updated_at = NOW()
+     WHERE id = ANY (p_request_ids)
+       AND status IN ('PENDING', 'ESCALATED')
+    RETURNING *
+  ), audited AS (
+    INSERT INTO audit_logs (request_id, action, performed_by, performed_by_role, details)
+    SELECT id, p_status, p_decided_by, 'admin', p_audit_details
+      FROM updated
+  )
+  SELECT COALESCE(jsonb_agg(to_jsonb(updated)), '[]'::jsonb)
+    INTO v_applied
+    FROM updated;
+
+  -- The ids that were not applied: already decided, withdrawn, ...
+  SELECT COALESCE(jsonb_object_agg(r.id, r.status), '{}'::jsonb)
+    INTO v_current
+    FROM requests r
+   WHERE r.id = ANY (p_request_ids)
+     AND r.id NOT IN (
+       SELECT (a->>'id')::uuid FROM jsonb_array_elements(v_applied) a
+     );
+
+  RETURN jsonb_build_object('applied', v_applied, 'current', v_current);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may call it through the API
+REVOKE EXECUTE ON FUNCTION decide_requests(UUID[], TEXT, TEXT, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION decide_requests(UUID[], TEXT, TEXT, TEXT, JSONB) TO service_role;
@@ -0,0 +1,29 @@
+-- Bulk write-back of re-scored risk fields for the reclassify job
+-- (backend/app/jobs/reclassify.py --write).
+--
+-- p_rows is a JSON array of {id, risk_level, risk_score, risk_factors}. One
+-- UPDATE sets those three columns on the requests that still exist: a
+-- request deleted since it was scanned stays deleted, and columns edited
+-- meanwhile (title, status, ...) keep their new values.
+--
+-- Returns the number of requests updated.
+CREATE OR REPLACE FUNCTION update_request_risk(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  UPDATE requests r
+     SET risk_level = x.risk_level,
+         risk_score = x.risk_score,
+         risk_factors = x.risk_factors
+    FROM jsonb_to_recordset(p_rows)
+         AS x(id UUID, risk_level TEXT, risk_score INTEGER, risk_factors JSONB)
+   WHERE r.id = x.id;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may call it through the API
+REVOKE EXECUTE ON FUNCTION update_request_risk(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION update_request_risk(JSONB) TO service_role;
@@ -6,20 +6,50 @@ const api = axios.create({
   headers: { 'Content-Type': 'application/json' },
 })
 
+// Last ETag and body per GET URL (list endpoints send ETags). Requests
+// repeat the ETag in If-None-Match and a 304 is answered from the stored
+// body, so refetching an unchanged list transfers no rows.
+const ETAG_CACHE_SIZE = 50
+const etagCache = new Map()
+
 // Attach Supabase JWT to every request
 api.interceptors.request.use(async (config) => {
   const { data: { session } } = await supabase.auth.getSession()
   if (session?.access_token) {
     config.headers.Authorization = `Bearer ${session.access_token}`
   }
+  if (config.method === 'get') {
+    const cached = etagCache.get(api.getUri(config))
+    if (cached) {
+      config.etagCached = cached
+      config.headers['If-None-Match'] = cached.etag
+      config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304
+    }
+  }
   return config
 })
 
-// Redirect to login on 401
+// Serve 304s from the ETag cache; redirect to login on 401
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if (response.config.method !== 'get') return response
+    const key = api.getUri(response.config)
+    const cached = response.status === 304
+      ? response.config.etagCached
+      : response.headers.etag && { etag: response.headers.etag, data: response.data }
+    // Re-inserted so the least recently used URL is dropped first
+    etagCache.delete(key)
+    if (cached) {
+      etagCache.set(key, cached)
+      if (etagCache.size > ETAG_CACHE_SIZE) {
+        etagCache.delete(etagCache.keys().next().value)
+      }
+    }
+    return response.status === 304 ? { ...response, status: 200, data: cached.data } : response
+  },
   (error) => {
     if (error.response?.status === 401) {
+      etagCache.clear()
       supabase.auth.signOut()
       window.location.href = '/login'
     }
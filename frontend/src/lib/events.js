@@ -0,0 +1,46 @@
+import { supabase } from './supabase'
+
+const baseURL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000'
+const RECONNECT_MS = 3000
+
+// Subscribe to request change events from GET /events/stream.
+//   onChange(type, request)  type is 'created' or 'updated'; request has no description
+//   onResync()               events were missed, reload the list
+// Returns an unsubscribe function.
+export function subscribeToRequests({ onChange, onResync }) {
+  let source = null
+  let lastEventId = ''
+  let timer = null
+  let closed = false
+
+  async function connect() {
+    const { data: { session } } = await supabase.auth.getSession()
+    if (closed || !session?.access_token) return
+    // EventSource can't send headers, so the token goes in the query string
+    const params = new URLSearchParams({ token: session.access_token })
+    if (lastEventId) params.set('since', lastEventId)
+    source = new EventSource(`${baseURL}/events/stream?${params}`)
+
+    const handle = (type) => (e) => {
+      lastEventId = e.lastEventId || lastEventId
+      onChange(type, JSON.parse(e.data))
+    }
+    source.addEventListener('request.created', handle('created'))
+    source.addEventListener('request.updated', handle('updated'))
+    source.addEventListener('resync', () => onResync())
+    source.onerror = () => {
+      // The browser retries dropped streams itself; a refused one (e.g. an
+      // expired token) is closed for good, so reconnect with a fresh token
+      if (source.readyState === EventSource.CLOSED && !closed) {
+        timer = setTimeout(connect, RECONNECT_MS)
+      }
+    }
+  }
+
+  connect()
+  return () => {
+    closed = true
+    clearTimeout(timer)
+    source?.close()
+  }
+}
@@ -1,15 +1,19 @@
 import { useEffect, useState } from 'react'
+import { useAuth } from '../contexts/AuthContext'
 import api from '../lib/api'
 
 const ACTION_STYLES = {
   SUBMITTED: 'bg-blue-100 text-blue-700',
   AUTO_APPROVED: 'bg-green-100 text-green-700',
+  AUTO_REJECTED: 'bg-red-100 text-red-700',
   ESCALATED: 'bg-yellow-100 text-yellow-700',
   APPROVED: 'bg-green-100 text-green-700',
   REJECTED: 'bg-red-100 text-red-700',
 }
 
 export default function ActivityLogs() {
+  const { profile } = useAuth()
+  const [exporting, setExporting] = useState(false)
   const [logs, setLogs] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -21,11 +25,40 @@ export default function ActivityLogs() {
       .finally(() => setLoading(false))
   }, [])
 
+  async function exportCsv() {
+    setExporting(true)
+    try {
+      // The server streams the file; gzip keeps the transfer small
+      const { data, headers } = await api.get('/logs/export', {
+        params: { format: 'csv', gzip: true },
+        responseType: 'blob',
+      })
+      const name = /filename="([^"]+)"/.exec(headers['content-disposition'] || '')?.[1] || 'audit_logs.csv.gz'
+      const url = URL.createObjectURL(data)
+      const link = document.createElement('a')
+      link.href = url
+      link.download = name
+      link.click()
+      URL.revokeObjectURL(url)
+    } catch {
+      alert('Export failed. Please try again.')
+    } finally {
+      setExporting(false)
+    }
+  }
+
   return (
     <div>
-      <div className="mb-6">
-        <h1 className="text-2xl font-bold text-gray-900">Activity Logs</h1>
-        <p className="text-gray-500 text-sm mt-1">Audit trail of all actions in the system.</p>
+      <div className="mb-6 flex items-center justify-between">
+        <div>
+          <h1 className="text-2xl font-bold text-gray-900">Activity Logs</h1>
+          <p className="text-gray-500 text-sm mt-1">Audit trail of all actions in the system.</p>
+        </div>
+        {profile?.role === 'admin' && (
+          <button onClick={exportCsv} disabled={exporting} className="btn-secondary text-sm">
+            {exporting ? 'Exporting…' : '⤓ Export CSV'}
+          </button>
+        )}
       </div>
 
       {loading && (
@@ -1,16 +1,48 @@
 import { useEffect, useState } from 'react'
 import api from '../lib/api'
+import { subscribeToRequests } from '../lib/events'
 import RiskBadge from '../components/RiskBadge'
 import StatusBadge from '../components/StatusBadge'
 
+const OPEN_STATUSES = ['PENDING', 'ESCALATED']
+
 export default function ApprovalQueue() {
   const [requests, setRequests] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [actionState, setActionState] = useState({}) // { [id]: { loading, reason, showReject } }
+  const [selected, setSelected] = useState(new Set())
+  const [bulk, setBulk] = useState({ loading: false, reason: '', showReject: false })
 
   useEffect(() => {
     fetchRequests()
+    // Other admins' decisions and new submissions arrive as events
+    return subscribeToRequests({
+      onChange: async (type, change) => {
+        if (!OPEN_STATUSES.includes(change.status)) {
+          setRequests((prev) => prev.filter((r) => r.id !== change.id))
+          setSelected((prev) => {
+            if (!prev.has(change.id)) return prev
+            const next = new Set(prev)
+            next.delete(change.id)
+            return next
+          })
+          return
+        }
+        if (type === 'updated') {
+          setRequests((prev) => prev.map((r) => (r.id === change.id ? { ...r, ...change } : r)))
+          return
+        }
+        // Events leave out the description; fetch just the new request
+        try {
+          const { data } = await api.get(`/requests/${change.id}`)
+          setRequests((prev) => (prev.some((r) => r.id === data.id) ? prev : [data, ...prev]))
+        } catch {
+          // It shows up on the next refresh
+        }
+      },
+      onResync: fetchRequests,
+    })
   }, [])
 
   async function fetchRequests() {
@@ -18,6 +50,7 @@ export default function ApprovalQueue() {
     try {
       const { data } = await api.get('/admin/requests')
       setRequests(data)
+      setSelected(new Set())
     } catch {
       setError('Failed to load the approval queue.')
     } finally {
@@ -60,6 +93,43 @@ export default function ApprovalQueue() {
     }
   }
 
+  function toggleSelected(id) {
+    setSelected((prev) => {
+      const next = new Set(prev)
+      next.has(id) ? next.delete(id) : next.add(id)
+      return next
+    })
+  }
+
+  function toggleAll() {
+    setSelected((prev) => (prev.size === requests.length ? new Set() : new Set(requests.map((r) => r.id))))
+  }
+
+  async function bulkDecide(action) {
+    if (action === 'reject' && bulk.reason.trim().length < 5) {
+      alert('Please enter a rejection reason (at least 5 characters).')
+      return
+    }
+    setBulk((prev) => ({ ...prev, loading: true }))
+    try {
+      const { data } = await api.put('/admin/requests/bulk', {
+        ids: [...selected],
+        action,
+        reason: action === 'reject' ? bulk.reason : '',
+      })
+      // Applied, already-decided and missing rows all leave the queue
+      const done = new Set(data.results.map((r) => r.id))
+      setRequests((prev) => prev.filter((r) => !done.has(r.id)))
+      setSelected(new Set())
+      setBulk({ loading: false, reason: '', showReject: false })
+      const skipped = data.results.length - data.applied
+      if (skipped > 0) alert(`${data.applied} applied, ${skipped} skipped (already decided or not found).`)
+    } catch {
+      setBulk((prev) => ({ ...prev, loading: false }))
+      alert('Bulk action failed. Please try again.')
+    }
+  }
+
   const typeLabels = {
     room_booking: 'Room Booking',
     access_permission: 'Access Permission',
@@ -104,6 +174,53 @@ export default function ApprovalQueue() {
         </div>
       )}
 
+      {!loading && requests.length > 0 && (
+        <div className="card mb-4 flex items-center gap-3 flex-wrap">
+          <label className="flex items-center gap-2 text-sm text-gray-700">
+            <input type="checkbox" checked={selected.size === requests.length} onChange={toggleAll} />
+            {selected.size} selected
+          </label>
+          {selected.size > 0 && (
+            <>
+              <button onClick={() => bulkDecide('approve')} disabled={bulk.loading} className="btn-primary text-sm">
+                {bulk.loading ? '…' : `✓ Approve ${selected.size}`}
+              </button>
+              {!bulk.showReject ? (
+                <button
+                  onClick={() => setBulk((prev) => ({ ...prev, showReject: true }))}
+                  disabled={bulk.loading}
+                  className="btn-danger text-sm"
+                >
+                  ✗ Reject {selected.size}
+                </button>
+              ) : (
+                <div className="flex items-center gap-2 flex-1 min-w-[16rem]">
+                  <input
+                    className="input-field text-sm"
+                    value={bulk.reason}
+                    onChange={(e) => setBulk((prev) => ({ ...prev, reason: e.target.value }))}
+                    placeholder="Rejection reason for all selected…"
+                  />
+                  <button
+                    onClick={() => bulkDecide('reject')}
+                    disabled={bulk.loading || bulk.reason.trim().length < 5}
+                    className="btn-danger text-sm whitespace-nowrap"
+                  >
+                    {bulk.loading ? '…' : 'Confirm Reject'}
+                  </button>
+                  <button
+                    onClick={() => setBulk({ loading: false, reason: '', showReject: false })}
+                    className="btn-secondary text-sm"
+                  >
+                    Cancel
+                  </button>
+                </div>
+              )}
+            </>
+          )}
+        </div>
+      )}
+
       {!loading && requests.length > 0 && (
         <div className="space-y-4">
           {requests.map((r) => {
@@ -111,6 +228,12 @@ export default function ApprovalQueue() {
             return (
               <div key={r.id} className="card">
                 <div className="flex items-start justify-between gap-4 flex-wrap">
+                  <input
+                    type="checkbox"
+                    className="mt-1"
+                    checked={selected.has(r.id)}
+                    onChange={() => toggleSelected(r.id)}
+                  />
                   <div className="flex-1 min-w-0">
                     <h3 className="font-semibold text-gray-900">{r.title}</h3>
                     <p className="text-xs text-gray-500 mt-0.5">{typeLabels[r.request_type] || r.request_type} · {r.requester_email}</p>
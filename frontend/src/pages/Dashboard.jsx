@@ -3,31 +3,46 @@ import { Link } from 'react-router-dom'
 import { useAuth } from '../contexts/AuthContext'
 import api from '../lib/api'
 
+const statCards = (byStatus = {}) => [
+  { label: 'Pending', value: byStatus.PENDING || 0, color: 'bg-yellow-50 border-yellow-200 text-yellow-700' },
+  { label: 'Approved', value: byStatus.APPROVED || 0, color: 'bg-green-50 border-green-200 text-green-700' },
+  { label: 'Rejected', value: byStatus.REJECTED || 0, color: 'bg-red-50 border-red-200 text-red-700' },
+  { label: 'Escalated', value: byStatus.ESCALATED || 0, color: 'bg-purple-50 border-purple-200 text-purple-700' },
+]
+
+function StatGrid({ cards }) {
+  return (
+    <div className="grid grid-cols-2 sm:grid-cols-4 gap-4 mb-8">
+      {cards.map((s) => (
+        <div key={s.label} className={`rounded-xl border p-4 ${s.color}`}>
+          <p className="text-3xl font-bold">{s.value}</p>
+          <p className="text-sm font-medium mt-1">{s.label}</p>
+        </div>
+      ))}
+    </div>
+  )
+}
+
 export default function Dashboard() {
   const { profile } = useAuth()
-  const [stats, setStats] = useState({ pending: 0, approved: 0, rejected: 0, escalated: 0 })
+  const isAdmin = profile?.role === 'admin'
+  const [stats, setStats] = useState(null)
+  const [globalStats, setGlobalStats] = useState(null)
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    api.get('/requests/')
-      .then(({ data }) => {
-        const counts = { pending: 0, approved: 0, rejected: 0, escalated: 0 }
-        data.forEach((r) => {
-          const key = r.status.toLowerCase()
-          if (key in counts) counts[key]++
-        })
-        setStats(counts)
-      })
+    // Counts come pre-aggregated from the server, so this stays cheap
+    // however many requests exist
+    const loads = [api.get('/stats/').then(({ data }) => setStats(data))]
+    if (isAdmin) {
+      loads.push(
+        api.get('/stats/', { params: { scope: 'global' } }).then(({ data }) => setGlobalStats(data))
+      )
+    }
+    Promise.all(loads)
       .catch(() => {})
       .finally(() => setLoading(false))
-  }, [])
-
-  const statCards = [
-    { label: 'Pending', value: stats.pending, color: 'bg-yellow-50 border-yellow-200 text-yellow-700' },
-    { label: 'Approved', value: stats.approved, color: 'bg-green-50 border-green-200 text-green-700' },
-    { label: 'Rejected', value: stats.rejected, color: 'bg-red-50 border-red-200 text-red-700' },
-    { label: 'Escalated', value: stats.escalated, color: 'bg-purple-50 border-purple-200 text-purple-700' },
-  ]
+  }, [isAdmin])
 
   return (
     <div>
@@ -47,14 +62,17 @@ export default function Dashboard() {
           ))}
         </div>
       ) : (
-        <div className="grid grid-cols-2 sm:grid-cols-4 gap-4 mb-8">
-          {statCards.map((s) => (
-            <div key={s.label} className={`rounded-xl border p-4 ${s.color}`}>
-              <p className="text-3xl font-bold">{s.value}</p>
-              <p className="text-sm font-medium mt-1">{s.label}</p>
-            </div>
-          ))}
-        </div>
+        <>
+          <StatGrid cards={statCards(stats?.by_status)} />
+          {globalStats && (
+            <>
+              <h2 className="font-semibold text-gray-700 mb-3">
+                All requests ({globalStats.total})
+              </h2>
+              <StatGrid cards={statCards(globalStats.by_status)} />
+            </>
+          )}
+        </>
       )}
 
       {/* Quick actions */}
@@ -79,7 +97,7 @@ export default function Dashboard() {
           <p className="text-sm text-gray-500 mt-1">Track the status of your submitted requests.</p>
         </Link>
 
-        {profile?.role === 'admin' && (
+        {isAdmin && (
           <Link to="/approvals" className="card hover:shadow-md transition-shadow group">
             <div className="w-10 h-10 bg-purple-100 rounded-lg flex items-center justify-center mb-3 group-hover:bg-purple-200 transition-colors">
               <svg className="w-5 h-5 text-purple-600" fill="none" viewBox="0 0 24 24" stroke="currentColor">
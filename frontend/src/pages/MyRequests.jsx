@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react'
 import api from '../lib/api'
+import { subscribeToRequests } from '../lib/events'
 import RequestCard from '../components/RequestCard'
 
 export default function MyRequests() {
@@ -7,11 +8,32 @@ export default function MyRequests() {
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
 
-  useEffect(() => {
-    api.get('/requests/')
+  function loadRequests() {
+    return api.get('/requests/')
       .then(({ data }) => setRequests(data))
       .catch(() => setError('Failed to load requests.'))
       .finally(() => setLoading(false))
+  }
+
+  useEffect(() => {
+    loadRequests()
+    // Apply pushed changes instead of refetching the whole list
+    return subscribeToRequests({
+      onChange: async (type, change) => {
+        if (type === 'updated') {
+          setRequests((prev) => prev.map((r) => (r.id === change.id ? { ...r, ...change } : r)))
+          return
+        }
+        // Events leave out the description; fetch just the new request
+        try {
+          const { data } = await api.get(`/requests/${change.id}`)
+          setRequests((prev) => (prev.some((r) => r.id === data.id) ? prev : [data, ...prev]))
+        } catch {
+          // It shows up on the next reload
+        }
+      },
+      onResync: loadRequests,
+    })
   }, [])
 
   return (
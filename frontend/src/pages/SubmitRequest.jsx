@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useRef, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import api from '../lib/api'
 import RiskBadge from '../components/RiskBadge'
@@ -19,17 +19,24 @@ export default function SubmitRequest() {
   const [submitting, setSubmitting] = useState(false)
   const [error, setError] = useState('')
   const [result, setResult] = useState(null)
+  // Reused when a failed submit is retried, so a request that did go through
+  // isn't created twice; replaced once the form changes
+  const idempotencyKey = useRef(null)
 
   async function handleSubmit(e) {
     e.preventDefault()
     setError('')
     setSubmitting(true)
+    const body = { title, request_type: requestType, description }
+    const fingerprint = JSON.stringify(body)
+    if (idempotencyKey.current?.fingerprint !== fingerprint) {
+      idempotencyKey.current = { key: crypto.randomUUID(), fingerprint }
+    }
     try {
-      const { data } = await api.post('/requests/', {
-        title,
-        request_type: requestType,
-        description,
+      const { data } = await api.post('/requests/', body, {
+        headers: { 'Idempotency-Key': idempotencyKey.current.key },
       })
+      idempotencyKey.current = null
       setResult(data)
     } catch (err) {
       const detail = err.response?.data?.detail